@@ -1,21 +1,125 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from dotenv import load_dotenv
 import os
+import time
+import threading
 from urllib.parse import quote_plus
 
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = quote_plus(os.getenv("DB_PASSWORD"))  # FIX HERE ✔
+DB_PASSWORD = quote_plus(os.getenv("DB_PASSWORD", ""))  # FIX HERE ✔
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL replaces the DB_* settings with a full SQLAlchemy URL, e.g.
+# sqlite:////tmp/isotank-bench.db for the benchmark suite (benchmarks/api_load.py)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
+# --- CONNECTION POOL ---
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+# Recycle before MySQL's wait_timeout closes idle connections ("server has gone away")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# --- OPTIONAL READ REPLICA ---
+# When DB_READ_HOST is set, GET endpoints using get_read_db query the replica.
+DB_READ_HOST = os.getenv("DB_READ_HOST")
+DB_READ_PORT = os.getenv("DB_READ_PORT", DB_PORT)
+DB_READ_USER = os.getenv("DB_READ_USER", DB_USER)
+DB_READ_PASSWORD = quote_plus(os.getenv("DB_READ_PASSWORD")) if os.getenv("DB_READ_PASSWORD") else DB_PASSWORD
+
+READ_DATABASE_URL = (
+    f"mysql+pymysql://{DB_READ_USER}:{DB_READ_PASSWORD}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME}"
+    if DB_READ_HOST else None
+)
+
+
+class _WaitStatsMixin:
+    """Records how long requests wait for a pooled connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.total_checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.total_checkouts += 1
+                self.total_wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "pool_size": self.size(),
+                "checked_out": self.checkedout(),
+                "checked_in": self.checkedin(),
+                "overflow": self.overflow(),
+                "max_overflow": self._max_overflow,
+                "total_checkouts": self.total_checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_seconds / self.total_checkouts * 1000, 3) if self.total_checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(_WaitStatsMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitStatsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_args() -> dict:
+    return dict(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def build_engine(url: str):
+    if is_sqlite(url):
+        # Stand-in database for benchmarks: file-based, nothing to pool
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        **_pool_args()
+    )
+
+
+engine = build_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+read_engine = build_engine(READ_DATABASE_URL) if READ_DATABASE_URL else engine
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
+
 Base = declarative_base()
 
 def init_db():
@@ -35,3 +139,89 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session for read-only endpoints; uses the replica when DB_READ_HOST is set."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# --- ASYNC ENGINE ---
+# Same database through an asyncio driver, so async handlers await MySQL
+# instead of holding a threadpool worker for the whole round trip.
+# Created on first use: the driver is only needed once an async route is hit.
+DB_ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "aiomysql")
+
+_async_engines = {}
+_async_sessionmakers = {}
+
+
+def _async_url(url: str) -> str:
+    if is_sqlite(url):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url.replace("mysql+pymysql://", f"mysql+{DB_ASYNC_DRIVER}://", 1)
+
+
+def get_async_engine(read: bool = False):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    key = "read" if read and READ_DATABASE_URL else "primary"
+    if key not in _async_engines:
+        url = READ_DATABASE_URL if key == "read" else DATABASE_URL
+        if is_sqlite(url):
+            _async_engines[key] = create_async_engine(_async_url(url))
+        else:
+            _async_engines[key] = create_async_engine(
+                _async_url(url),
+                poolclass=InstrumentedAsyncQueuePool,
+                **_pool_args()
+            )
+    return _async_engines[key]
+
+
+def _async_sessionmaker(read: bool = False):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+    key = "read" if read and READ_DATABASE_URL else "primary"
+    if key not in _async_sessionmakers:
+        _async_sessionmakers[key] = async_sessionmaker(
+            bind=get_async_engine(read), class_=AsyncSession,
+            autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmakers[key]
+
+
+def async_session(read: bool = False):
+    """New AsyncSession outside a request, e.g. `async with async_session() as db:`."""
+    return _async_sessionmaker(read)()
+
+
+async def get_async_db():
+    async with _async_sessionmaker()() as db:
+        yield db
+
+async def get_async_read_db():
+    """AsyncSession for read-only endpoints; uses the replica when DB_READ_HOST is set."""
+    async with _async_sessionmaker(read=True)() as db:
+        yield db
+
+async def dispose_async_engines():
+    for async_engine in _async_engines.values():
+        await async_engine.dispose()
+    _async_engines.clear()
+    _async_sessionmakers.clear()
+
+
+def _pool_stats(pool) -> dict:
+    # SQLite engines use SQLAlchemy's default pool, which keeps no wait statistics
+    return pool.stats() if hasattr(pool, "stats") else {"pool": type(pool).__name__}
+
+
+def pool_stats() -> dict:
+    stats = {"primary": _pool_stats(engine.pool)}
+    if read_engine is not engine:
+        stats["replica"] = _pool_stats(read_engine.pool)
+    for key, async_engine in _async_engines.items():
+        stats[f"async_{key}"] = _pool_stats(async_engine.pool)
+    return stats
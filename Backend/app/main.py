@@ -1,19 +1,31 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware 
-from sqlalchemy import text
-from app.database import init_db, get_db, engine, SessionLocal # <--- Added SessionLocal
+from sqlalchemy import inspect, text
+from app.database import init_db, get_db, engine, SessionLocal, dispose_async_engines # <--- Added SessionLocal
 from app.seed import init_seed_data # <--- Import the seeding function
+from app.services import ppt_jobs
+from app.utils.metrics import MetricsMiddleware, metrics_endpoint
+from app.utils.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.utils import query_profiler
+from app.models.tank_details import TankDetails
 
 from app.routers import (
     auth, users, 
     tank_details, tank_inspection, 
     tank_regulations, regulations_master,
     cargo_master, cargo_tank,
-    upload, tank_certificate, tank_drawings,
+    upload, upload_sessions, tank_certificate, tank_drawings,
     valve_test_report,
-    ppt_router
+    ppt_router,
+    admin,
+    lookups
 )
 
+# JSON logs written by a background thread; see app/utils/logging_config.py
+setup_logging()
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="ISO-TANK API")
 
 # --- CORS MIDDLEWARE ---
@@ -24,9 +36,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"]
+    expose_headers=["Content-Disposition", "X-Request-ID", "Server-Timing"]
 )
 
+# --- METRICS MIDDLEWARE ---
+# Per-route latency, in-flight requests and DB queries per request; scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# --- QUERY PROFILER ---
+# Off unless QUERY_PROFILER is set: per-request statements, N+1 warnings, Server-Timing
+if query_profiler.enabled():
+    query_profiler.install()
+    app.add_middleware(query_profiler.QueryProfilerMiddleware)
+
+# --- REQUEST ID MIDDLEWARE ---
+# Added last so it wraps everything: every log line of a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
 # --- ROUTERS ---
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
@@ -38,9 +65,12 @@ app.include_router(regulations_master.router, prefix="/api/regulations-master",
 app.include_router(cargo_master.router, prefix="/api/cargo-master", tags=["Cargo Master"])
 app.include_router(cargo_tank.router, prefix="/api/cargo-tank", tags=["Cargo Tank"])
 app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
+app.include_router(upload_sessions.router, prefix="/api/upload-sessions", tags=["Upload Sessions"])
 app.include_router(tank_drawings.router, prefix="/api/tank-drawings", tags=["Tank Drawings"])
 app.include_router(valve_test_report.router, prefix="/api/valve-test-reports", tags=["Valve Test Reports"])
 app.include_router(ppt_router.router, prefix="/api/ppt", tags=["PPT Generation"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(lookups.router, prefix="/api/lookups", tags=["Lookups"])
 
 # --- STARTUP EVENT ---
 @app.on_event("startup")
@@ -51,28 +81,68 @@ def on_startup():
     # 2. AUTO-FIX: Add 'inspection_agency' column if it's missing
     with engine.connect() as conn:
         try:
-            print("Checking database schema for missing columns...")
+            logger.info("Checking database schema for missing columns...")
             conn.execute(text("ALTER TABLE tank_certificate ADD COLUMN inspection_agency VARCHAR(10) NULL;"))
             conn.commit()
-            print("SUCCESS: Added missing column 'inspection_agency' to table 'tank_certificate'.")
+            logger.info("Added missing column 'inspection_agency' to table 'tank_certificate'")
             
         except Exception as e:
             # This is expected if the column already exists
-            print(f"Schema check passed (or column exists): {e}")
+            logger.info(f"Schema check passed (or column exists): {e}")
+
+    # AUTO-FIX: Add 'sha256' column to tank_images (digest of the stored file)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("ALTER TABLE tank_images ADD COLUMN sha256 VARCHAR(64) NULL;"))
+            conn.commit()
+            logger.info("Added missing column 'sha256' to table 'tank_images'")
+        except Exception as e:
+            logger.info(f"Schema check passed (or column exists): {e}")
+
+    # AUTO-FIX: Create model indexes missing from existing databases
+    # (create_all skips tables that already exist)
+    with engine.connect() as conn:
+        for table in (TankDetails.__table__,):
+            existing = {ix["name"] for ix in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                try:
+                    index.create(conn)
+                    conn.commit()
+                    logger.info(f"Created missing index '{index.name}' on table '{table.name}'")
+                except Exception as e:
+                    conn.rollback()
+                    logger.warning(f"Could not create index '{index.name}' on table '{table.name}': {e}")
 
     # 3. SEEDING: Insert initial values for Master tables
     # We use a separate SessionLocal just for this operation
     db = SessionLocal()
     try:
-        print("Checking for seed data...")
+        logger.info("Checking for seed data...")
         init_seed_data(db)
-        print("Seeding check completed.")
+        logger.info("Seeding check completed")
     except Exception as e:
-        print(f"Error during seeding: {e}")
+        logger.exception(f"Error during seeding: {e}")
     finally:
         db.close()
 
 
+@app.on_event("startup")
+async def start_background_tasks():
+    # Periodic removal of stale temp files, upload sessions and unreferenced blobs
+    upload_sessions.start_cleanup()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    upload_sessions.stop_cleanup()
+    # Stop the PPT worker processes (queued jobs are dropped)
+    ppt_jobs.shutdown()
+    await dispose_async_engines()
+    shutdown_logging()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
\ No newline at end of file
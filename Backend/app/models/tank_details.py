@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, Boolean, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, ForeignKey, Date, Index
 from app.database import Base
 
 class TankDetails(Base):
@@ -31,4 +31,17 @@ class TankDetails(Base):
     remark = Column(Text, nullable=True)
     lease = Column(Boolean, default=False)
     created_by = Column(String(255), nullable=True)
-    updated_by = Column(String(255), nullable=True)
\ No newline at end of file
+    updated_by = Column(String(255), nullable=True)
+
+    # Indexes for the paginated tank listing: each filter column is paired with
+    # tank_id so a filtered page can be read in tank_id order from the index.
+    # (The unfiltered listing uses the foreign key index on tank_id.)
+    # Created on existing databases by the startup schema check in main.py.
+    __table_args__ = (
+        Index('idx_tank_details_status', 'status', 'tank_id'),
+        Index('idx_tank_details_mfgr', 'mfgr', 'tank_id'),
+        Index('idx_tank_details_lease', 'lease', 'tank_id'),
+        Index('idx_tank_details_size', 'size', 'tank_id'),
+        Index('idx_tank_details_pump_type', 'pump_type', 'tank_id'),
+        Index('idx_tank_details_date_mfg', 'date_mfg'),
+    )
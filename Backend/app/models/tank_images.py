@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, TIMESTAMP, func, ForeignKey, Date, Index, UniqueConstraint, DECIMAL
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload
 from app.database import Base
 
 class TankImage(Base):
@@ -10,6 +10,8 @@ class TankImage(Base):
     tank_number = Column(String(50), ForeignKey("tank_header.tank_number", ondelete="CASCADE"), nullable=False)
     image_type = Column(String(50), nullable=False)
     image_path = Column(String(255), nullable=False)
+    # SHA-256 of the file: names its blob in the dedup store (see upload_utils)
+    sha256 = Column(String(64), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
     created_date = Column(Date, nullable=False)
@@ -23,5 +25,13 @@ class TankImage(Base):
     )
 
     # Relationships
-    user = relationship("User", foreign_keys=[emp_id], lazy="joined")
-    tank = relationship("Tank", foreign_keys=[tank_number], lazy="joined")
+    # Loaded on access only: image listings never read them, and a joined
+    # default added two LEFT JOINs to every TankImage query.
+    # Queries that do need them opt in with .options(*with_relations()).
+    user = relationship("User", foreign_keys=[emp_id], lazy="select")
+    tank = relationship("Tank", foreign_keys=[tank_number], lazy="select")
+
+
+def with_relations(entity=TankImage):
+    """Loader options that fetch the uploader and the tank in the same query."""
+    return (joinedload(entity.user), joinedload(entity.tank))
@@ -51,6 +51,8 @@ class TankInspectionDetails(Base):
 
     @property
     def as_dict(self):
+        # Lookup names (status_name, location_name, ...) are added by the API
+        # layer with app.services.lookups.resolve_inspection
         return {
             "inspection_id": self.inspection_id,
             "inspection_date": self.inspection_date.isoformat() if self.inspection_date else None,
@@ -76,7 +78,6 @@ class TankInspectionDetails(Base):
             "created_by": self.created_by,
             "updated_by": self.updated_by,
             "operator_id": self.operator_id,
-            "operator_name": self.operator_name,
             "ownership": self.ownership,
         }
 
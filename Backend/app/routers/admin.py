@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.database import pool_stats
+from app.utils import query_profiler
+
+router = APIRouter()
+
+@router.get("/db-pool")
+def get_db_pool_stats():
+    """Connection pool usage: checked-out connections, overflow and checkout wait times."""
+    return pool_stats()
+
+@router.get("/query-profiles")
+def get_query_profiles(
+    limit: int = Query(20, ge=1, le=200),
+    n_plus_one: bool = Query(False, description="Only requests with repeated statement shapes")
+):
+    """Recently profiled requests, most DB time first, with their statements and N+1 findings."""
+    if not query_profiler.enabled():
+        raise HTTPException(status_code=404, detail="Query profiler is off. Set QUERY_PROFILER=on or header.")
+    return query_profiler.recent_profiles(limit, n_plus_one)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.cargo_master import CargoTankMaster
+from app.services import master_cache
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -30,12 +33,16 @@ def create_cargo_tank(data: CargoTankCreate, db: Session = Depends(get_db)):
     db.add(new_record)
     db.commit()
     db.refresh(new_record)
+    master_cache.invalidate(master_cache.CARGO)
     return new_record
 
+async def load_cargo_tanks(db: AsyncSession) -> list:
+    records = (await db.execute(select(CargoTankMaster))).scalars().all()
+    return [CargoTankResponse.model_validate(r, from_attributes=True) for r in records]
+
 @router.get("/", response_model=List[CargoTankResponse])
-def get_all_cargo_tanks(db: Session = Depends(get_db)):
-    records = db.query(CargoTankMaster).all()
-    return records
+async def get_all_cargo_tanks(request: Request):
+    return master_cache.json_response(request, await master_cache.get_or_load(master_cache.CARGO, load_cargo_tanks))
 
 @router.put("/{cargo_id}", response_model=CargoTankResponse)
 def update_cargo_tank(cargo_id: int, data: CargoTankUpdate, db: Session = Depends(get_db)):
@@ -48,6 +55,7 @@ def update_cargo_tank(cargo_id: int, data: CargoTankUpdate, db: Session = Depend
 
     db.commit()
     db.refresh(record)
+    master_cache.invalidate(master_cache.CARGO)
     return record
 
 @router.delete("/{cargo_id}")
@@ -58,4 +66,5 @@ def delete_cargo_tank(cargo_id: int, db: Session = Depends(get_db)):
 
     db.delete(record)
     db.commit()
+    master_cache.invalidate(master_cache.CARGO)
     return {"message": f"Cargo tank with id {cargo_id} deleted successfully"}
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.cargo_tank import CargoTankTransaction
-from app.database import get_db
+from app.database import get_db, get_async_read_db
+from app.services import ppt_cache
 
 router = APIRouter()
 
@@ -22,6 +25,7 @@ def create_transaction(request: dict, db: Session = Depends(get_db)):
         db.add(new_txn)
         db.commit()
         db.refresh(new_txn)
+        ppt_cache.invalidate_tank(new_txn.tank_id)
         return {"message": "Transaction created successfully", "data": new_txn}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -29,8 +33,8 @@ def create_transaction(request: dict, db: Session = Depends(get_db)):
 
 # ✅ GET ALL
 @router.get("/")
-def get_all_transactions(db: Session = Depends(get_db)):
-    transactions = db.query(CargoTankTransaction).all()
+async def get_all_transactions(db: AsyncSession = Depends(get_async_read_db)):
+    transactions = (await db.execute(select(CargoTankTransaction))).scalars().all()
     return {"count": len(transactions), "data": transactions}
 
 
@@ -53,16 +57,19 @@ def update_transaction(transaction_id: int, request: dict, db: Session = Depends
 
     db.commit()
     db.refresh(txn)
+    ppt_cache.invalidate_tank(txn.tank_id)
     return {"message": "Transaction updated successfully", "data": txn}
 
 
 # ✅ GET BY TANK ID
 @router.get("/tank/{tank_id}")
-def get_transactions_by_tank(tank_id: int, db: Session = Depends(get_db)):
+async def get_transactions_by_tank(tank_id: int, db: AsyncSession = Depends(get_async_read_db)):
     from app.models.cargo_master import CargoTankMaster
-    transactions = db.query(CargoTankTransaction, CargoTankMaster).join(
-        CargoTankMaster, CargoTankTransaction.cargo_reference == CargoTankMaster.id
-    ).filter(CargoTankTransaction.tank_id == tank_id).all()
+    transactions = (await db.execute(
+        select(CargoTankTransaction, CargoTankMaster).join(
+            CargoTankMaster, CargoTankTransaction.cargo_reference == CargoTankMaster.id
+        ).filter(CargoTankTransaction.tank_id == tank_id)
+    )).all()
 
     return [
         {
@@ -90,4 +97,5 @@ def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
 
     db.delete(txn)
     db.commit()
+    ppt_cache.invalidate_tank(txn.tank_id)
     return {"message": "Transaction deleted successfully"}
\ No newline at end of file
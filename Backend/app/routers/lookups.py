@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app.services import lookups, master_cache
+
+router = APIRouter()
+
+
+def as_options(values: dict) -> list:
+    return [{"id": value_id, "name": name} for value_id, name in sorted(values.items())]
+
+
+# Served from the in-memory lookup tables, so dropdowns cost no query
+@router.get("/")
+def get_all_lookups(request: Request):
+    tables = lookups.get_tables()
+    data = {kind: as_options(values) for kind, values in tables.items()}
+    return master_cache.json_response(request, master_cache.encode_value(data))
+
+
+@router.get("/{kind}")
+def get_lookup(kind: str, request: Request):
+    if kind not in lookups.LOOKUP_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown lookup. Use one of: {', '.join(lookups.LOOKUP_TABLES)}")
+    values = lookups.get_tables()[kind]
+    return master_cache.json_response(request, master_cache.encode_value(as_options(values)))
+
+
+@router.post("/refresh")
+def refresh_lookups():
+    """Reloads the lookup tables now instead of after LOOKUP_REFRESH_SECONDS (call after editing them)."""
+    lookups.refresh()
+    return {"message": "Lookup tables will be reloaded on next use"}
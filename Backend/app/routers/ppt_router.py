@@ -1,31 +1,53 @@
 import os
-import traceback
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+import time
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.tank_header import Tank
-from app.services.ppt_generator import create_presentation
+from app.models.tank_details import TankDetails
+from app.services.ppt_generator import load_report_data, build_presentation
+from app.services import ppt_jobs, ppt_cache
+from app.utils.metrics import timed_phase, observe_ppt_phases
 from pydantic import BaseModel
-from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION (DYNAMIC PATHS) ---
-# Get the absolute path of the current file's directory (app/routers)
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-# Go up two levels to get the Project Root (Backend folder)
-BASE_DIR = os.path.dirname(os.path.dirname(CURRENT_DIR))
+# Project Root (Backend folder) and <UPLOAD_ROOT>/ppt, shared with the deck cache
+BASE_DIR = ppt_cache.BASE_DIR
+SAVE_DIRECTORY = ppt_cache.SAVE_DIRECTORY
 
-# Define save directory relative to project root
-SAVE_DIRECTORY = os.path.join(BASE_DIR, "uploads", "ppt")
+# Zips of batch jobs; removed with the job after PPT_JOB_TTL_MINUTES
+BATCH_DIRECTORY = os.path.join(SAVE_DIRECTORY, "batches")
 
-# Ensure the folder exists
-os.makedirs(SAVE_DIRECTORY, exist_ok=True)
+# Ensure the folders exist
+os.makedirs(BATCH_DIRECTORY, exist_ok=True)
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
 
 class GenerateRequest(BaseModel):
     tank_id: int
 
+class BatchGenerateRequest(BaseModel):
+    # Either an explicit list of tank ids, or filters on TankDetails
+    tank_ids: Optional[List[int]] = None
+    status: Optional[str] = None
+    lease: Optional[bool] = None
+    mfgr: Optional[str] = None
+
+def iter_file(file_obj, chunk_size: int = 1024 * 1024):
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
 @router.post("/generate")
 def generate_ppt(payload: GenerateRequest, db: Session = Depends(get_db)):
     """
@@ -33,41 +55,32 @@ def generate_ppt(payload: GenerateRequest, db: Session = Depends(get_db)):
     Returns a JSON success message with the file path.
     """
     try:
-        # --- DEBUG LOGGING ---
-        print(f"DEBUG: Generating for Tank ID: {payload.tank_id}")
-        print(f"DEBUG: BASE_DIR is: {BASE_DIR}")
-        print(f"DEBUG: SAVE_DIRECTORY is: {SAVE_DIRECTORY}")
+        logger.debug("Generating PPT", extra={"tank_id": payload.tank_id, "save_directory": SAVE_DIRECTORY})
 
         # 1. Verify tank exists
         tank = db.query(Tank).filter(Tank.id == payload.tank_id).first()
         if not tank:
             raise HTTPException(status_code=404, detail=f"Tank with ID {payload.tank_id} not found")
 
-        # 2. Generate the PPT (Returns BytesIO buffer)
+        # 2. Reuse the cached deck if nothing changed, otherwise generate and save it
         # We pass BASE_DIR so the generator knows where to look for images
-        ppt_buffer = create_presentation(db, payload.tank_id, BASE_DIR)
-        
-        # 3. Create Filename and Path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"Tank_Report_{tank.tank_number}_{timestamp}.pptx"
-        full_save_path = os.path.join(SAVE_DIRECTORY, filename)
-
-        # 4. Save to Server Disk
+        timings = {}
         try:
-            with open(full_save_path, "wb") as f:
-                f.write(ppt_buffer.getbuffer())
+            filename, full_save_path, cached = ppt_cache.get_or_create_report(db, payload.tank_id, BASE_DIR, SAVE_DIRECTORY, timings)
+            observe_ppt_phases(timings)
         except IOError as e:
-            print(f"ERROR: Disk Write Failed: {e}")
+            logger.error(f"Disk write failed: {e}", extra={"tank_id": payload.tank_id})
             # This specific error usually means folder permissions are missing
             raise HTTPException(status_code=500, detail=f"Permission denied or path missing: {SAVE_DIRECTORY}")
 
-        # 5. Return JSON Success
+        # 3. Return JSON Success
         return JSONResponse(
             status_code=200,
             content={
                 "message": "PPT generated and saved successfully.",
                 "file_path": full_save_path,
-                "filename": filename
+                "filename": filename,
+                "cached": cached
             }
         )
 
@@ -78,8 +91,149 @@ def generate_ppt(payload: GenerateRequest, db: Session = Depends(get_db)):
         # Catch value errors from the generator
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        # CRITICAL: Print the real error to logs
-        print("CRITICAL SERVER ERROR:")
-        traceback.print_exc()
+        # CRITICAL: Log the real error with its traceback
+        logger.exception(f"PPT generation failed: {e}", extra={"tank_id": payload.tank_id})
         # CRITICAL: Send the real error to Frontend for debugging
-        raise HTTPException(status_code=500, detail=f"Debug Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Debug Error: {str(e)}")
+
+
+
+@router.get("/download/{tank_id}")
+def download_ppt(tank_id: int, persist: bool = Query(False), db: Session = Depends(get_read_db)):
+    """
+    Generates the PPT and returns the file itself in the response.
+    persist=false (default): the deck is streamed from memory, nothing is written to disk.
+    persist=true: the deck is stored in (or served from) the /Backend/uploads/ppt cache.
+    """
+    tank = db.query(Tank).filter(Tank.id == tank_id).first()
+    if not tank:
+        raise HTTPException(status_code=404, detail=f"Tank with ID {tank_id} not found")
+
+    timings = {}
+    try:
+        if persist:
+            filename, full_save_path, _cached = ppt_cache.get_or_create_report(db, tank_id, BASE_DIR, SAVE_DIRECTORY, timings)
+            observe_ppt_phases(timings)
+            return FileResponse(full_save_path, media_type=PPTX_MEDIA_TYPE, filename=filename)
+
+        with timed_phase(timings, "load"):
+            data = load_report_data(db, tank_id)
+        with timed_phase(timings, "render"):
+            ppt_buffer = build_presentation(data, BASE_DIR)
+        observe_ppt_phases(timings)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    return StreamingResponse(
+        iter_file(ppt_buffer),
+        media_type=PPTX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f"attachment; filename=Tank_Report_{tank.tank_number}_{timestamp}.pptx",
+            "Content-Length": str(ppt_buffer.getbuffer().nbytes),
+        },
+        background=BackgroundTask(ppt_buffer.close)
+    )
+
+# ==============================================================================
+# BACKGROUND JOBS
+# ==============================================================================
+# Reports are rendered by a process pool (see services/ppt_jobs.py). Job state
+# lives in the API process, so polling must reach the same worker that accepted
+# the job.
+
+def get_job_or_404(job_id: str) -> ppt_jobs.PPTJob:
+    job = ppt_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+
+@router.post("/jobs", status_code=202)
+def submit_ppt_job(payload: GenerateRequest, db: Session = Depends(get_db)):
+    """
+    Queues a PPT for background generation and returns the job id immediately.
+    Poll GET /jobs/{job_id} for status, then download from /jobs/{job_id}/download.
+    """
+    tank = db.query(Tank).filter(Tank.id == payload.tank_id).first()
+    if not tank:
+        raise HTTPException(status_code=404, detail=f"Tank with ID {payload.tank_id} not found")
+
+    try:
+        job = ppt_jobs.submit_job(payload.tank_id, BASE_DIR, SAVE_DIRECTORY)
+    except ppt_jobs.JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Report queue is full, retry later ({e})")
+
+    return job.as_dict()
+
+
+@router.get("/jobs/{job_id}")
+def get_ppt_job(job_id: str):
+    return get_job_or_404(job_id).as_dict()
+
+
+@router.get("/jobs/{job_id}/download")
+def download_ppt_job(job_id: str):
+    job = get_job_or_404(job_id)
+    if job.status != ppt_jobs.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, no file available")
+
+    result = job.result
+    if not os.path.exists(result["file_path"]):
+        raise HTTPException(status_code=410, detail="Generated file no longer exists")
+
+    return FileResponse(
+        result["file_path"],
+        media_type="application/zip" if job.kind == ppt_jobs.BATCH else PPTX_MEDIA_TYPE,
+        filename=result["filename"]
+    )
+
+
+@router.delete("/jobs/{job_id}")
+def cancel_ppt_job(job_id: str):
+    job = get_job_or_404(job_id)
+    if not ppt_jobs.cancel_job(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} and cannot be cancelled")
+    return {"message": "Job cancelled", "job_id": job_id}
+
+
+# ==============================================================================
+# BATCH (FLEET) GENERATION
+# ==============================================================================
+
+@router.post("/generate-batch", status_code=202)
+def generate_ppt_batch(payload: BatchGenerateRequest, db: Session = Depends(get_read_db)):
+    """
+    Queues decks for many tanks as one background job and returns the job id.
+    Report data is prefetched with a few set-based queries, the decks are
+    rendered across the PPT process pool and zipped. Poll GET /jobs/{job_id},
+    then download the zip from /jobs/{job_id}/download.
+    Requested ids that match no tank are listed in the job's not_found;
+    tanks without details count as failed decks (see errors.txt in the zip).
+    """
+    query = db.query(Tank.id)
+    if payload.tank_ids is not None:
+        query = query.filter(Tank.id.in_(payload.tank_ids))
+    if payload.status or payload.lease is not None or payload.mfgr:
+        query = query.outerjoin(TankDetails, TankDetails.tank_id == Tank.id)
+        if payload.status:
+            query = query.filter(TankDetails.status == payload.status)
+        if payload.lease is not None:
+            query = query.filter(TankDetails.lease == payload.lease)
+        if payload.mfgr:
+            query = query.filter(TankDetails.mfgr == payload.mfgr)
+    tank_ids = [row[0] for row in query.all()]
+    # Requested ids with no tank (or not matching the filters), listed in the job
+    not_found = sorted(set(payload.tank_ids or ()) - set(tank_ids))
+
+    if not tank_ids:
+        raise HTTPException(status_code=404, detail="No tanks match the given ids/filters")
+    if len(tank_ids) > ppt_jobs.PPT_BATCH_MAX_TANKS:
+        raise HTTPException(status_code=400, detail=f"Batch too large: {len(tank_ids)} tanks (max {ppt_jobs.PPT_BATCH_MAX_TANKS})")
+
+    try:
+        job = ppt_jobs.submit_batch(tank_ids, BASE_DIR, BATCH_DIRECTORY, not_found)
+    except ppt_jobs.JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Report queue is full, retry later ({e})")
+
+    return job.as_dict()
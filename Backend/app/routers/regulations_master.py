@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_read_db
 from app.models.regulations_master import RegulationsMaster
+from app.services import master_cache
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -45,17 +48,23 @@ def create_regulation(data: RegulationCreate, db: Session = Depends(get_db)):
     db.add(new_reg)
     db.commit()
     db.refresh(new_reg)
+    master_cache.invalidate(master_cache.REGULATIONS, master_cache.REGULATION_NAMES)
     return new_reg
 
 
+async def load_regulations(db: AsyncSession) -> list:
+    rows = (await db.execute(select(RegulationsMaster).order_by(RegulationsMaster.id))).scalars().all()
+    return [RegulationOut.model_validate(r) for r in rows]
+
+
 @router.get("/", response_model=List[RegulationOut])
-def get_all_regulations(db: Session = Depends(get_db)):
-    return db.query(RegulationsMaster).order_by(RegulationsMaster.id).all()
+async def get_all_regulations(request: Request):
+    return master_cache.json_response(request, await master_cache.get_or_load(master_cache.REGULATIONS, load_regulations))
 
 
 @router.get("/{reg_id}", response_model=RegulationOut)
-def get_regulation(reg_id: int, db: Session = Depends(get_db)):
-    reg = db.query(RegulationsMaster).filter_by(id=reg_id).first()
+async def get_regulation(reg_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    reg = await db.scalar(select(RegulationsMaster).filter_by(id=reg_id).limit(1))
     if not reg:
         raise HTTPException(status_code=404, detail="Regulation not found")
     return reg
@@ -74,6 +83,7 @@ def update_regulation(reg_id: int, data: RegulationUpdate, db: Session = Depends
 
     db.commit()
     db.refresh(reg)
+    master_cache.invalidate(master_cache.REGULATIONS, master_cache.REGULATION_NAMES)
     return reg
 
 
@@ -85,4 +95,5 @@ def delete_regulation(reg_id: int, db: Session = Depends(get_db)):
 
     db.delete(reg)
     db.commit()
+    master_cache.invalidate(master_cache.REGULATIONS, master_cache.REGULATION_NAMES)
     return {"message": "Regulation deleted successfully"}
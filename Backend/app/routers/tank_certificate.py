@@ -1,17 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import OperationalError
-from app.database import get_db
+from app.database import get_db, get_async_db, get_async_read_db
 from app.models.tank_certificate import TankCertificate
 from app.models.tank_header import Tank
 import os
 from typing import Optional, Union
 from datetime import date as date_type, datetime
-import traceback
 import logging
 
 # Import your shared utility functions
-from app.utils.upload_utils import save_uploaded_file, delete_file_if_exists
+from app.utils.upload_utils import store_upload, delete_file_if_exists, run_io
+from app.utils.file_serving import resolve_upload_path, serve_file
+from app.services import ppt_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -66,37 +70,42 @@ def map_form_to_payload(
 
 # -------- CREATE --------
 @router.post("/")
-def create_tank_certificate(
+async def create_tank_certificate(
     tank_id: int = Form(...),
     certificate_number: str = Form(...),
     insp_2_5y_date: Optional[str] = Form(None),
     next_insp_date: Optional[str] = Form(None),
     inspection_agency: Optional[str] = Form(None),
     certificate_file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    upload_id: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
     created_by: str = Form("Admin")
 ):
     if not certificate_number:
         raise HTTPException(status_code=400, detail="Missing required field: certificate_number")
 
     # 1. Fetch Tank FIRST to get the tank_number for folder structure
-    tank_record = db.query(Tank).filter(Tank.id == tank_id).first()
+    tank_record = await db.scalar(select(Tank).filter(Tank.id == tank_id).limit(1))
     if not tank_record:
         raise HTTPException(status_code=404, detail="Tank not found")
     
     tank_number = tank_record.tank_number
 
     # 2. Handle File Upload using shared utility
+    # (either the file itself or the upload_id of a completed chunked upload session)
     file_path_db = None
-    if certificate_file:
+    file_sha256 = None
+    if certificate_file or upload_id:
         try:
             # This handles: validation, temp file, folder creation, naming (tank_cert.pdf)
-            file_path_db = save_uploaded_file(
+            stored = await store_upload(
                 upload_file=certificate_file,
+                upload_id=upload_id,
                 tank_number=tank_number,
                 image_type=CERTIFICATE_TYPE,
                 upload_root=UPLOAD_ROOT
             )
+            file_path_db, file_sha256 = stored.rel_path, stored.sha256
         except HTTPException as e:
             raise e
         except Exception as e:
@@ -121,31 +130,34 @@ def create_tank_certificate(
     try:
         certificate = TankCertificate(**cleaned_payload)
         db.add(certificate)
-        db.commit()
-        db.refresh(certificate)
+        await db.commit()
+        await db.refresh(certificate)
     except OperationalError as op_err:
-        db.rollback()
+        await db.rollback()
         if file_path_db:
-            delete_file_if_exists(UPLOAD_ROOT, file_path_db)
-        print(f"DB SCHEMA ERROR: {op_err}")
+            await run_io(delete_file_if_exists, UPLOAD_ROOT, file_path_db, file_sha256)
+        logger.error(f"DB schema error: {op_err}")
         raise HTTPException(status_code=500, detail="Database mismatch: A column might be missing.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         if file_path_db:
-            delete_file_if_exists(UPLOAD_ROOT, file_path_db)
-        print(f"INSERT ERROR: {e}")
+            await run_io(delete_file_if_exists, UPLOAD_ROOT, file_path_db, file_sha256)
+        logger.error(f"Insert error: {e}")
         raise HTTPException(status_code=400, detail=f"Database Insertion Failed: {str(e)}")
 
-    return {"message": "Tank certificate added successfully", "id": certificate.id, "file_path": file_path_db}
+    await run_io(ppt_cache.invalidate_tank, tank_id)
+    return {"message": "Tank certificate added successfully", "id": certificate.id, "file_path": file_path_db, "sha256": file_sha256}
 
 
 # -------- READ BY TANK ID --------
 @router.get("/tank/{tank_id}")
-def get_tank_certificates_by_tank(tank_id: int, db: Session = Depends(get_db)):
+async def get_tank_certificates_by_tank(tank_id: int, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        certificates = db.query(TankCertificate).filter(
-            TankCertificate.tank_id == tank_id
-        ).order_by(TankCertificate.created_at.desc()).all()
+        certificates = (await db.execute(
+            select(TankCertificate).filter(
+                TankCertificate.tank_id == tank_id
+            ).order_by(TankCertificate.created_at.desc())
+        )).scalars().all()
 
         def serialize_certificate(cert):
             return {
@@ -163,20 +175,18 @@ def get_tank_certificates_by_tank(tank_id: int, db: Session = Depends(get_db)):
         return [serialize_certificate(cert) for cert in certificates]
 
     except OperationalError as e:
-        print(f"DATABASE OPERATIONAL ERROR: {e}")
-        traceback.print_exc()
+        logger.exception(f"Database operational error: {e}")
         raise HTTPException(status_code=500, detail="Database schema error.")
     except Exception as e:
-        print(f"CRITICAL ERROR in get_tank_certificates_by_tank: {str(e)}")
-        traceback.print_exc() 
+        logger.exception(f"Error in get_tank_certificates_by_tank: {str(e)}")
         raise HTTPException(status_code=500, detail="Error retrieving certificates")
 
 
 # -------- READ BY ID --------
 @router.get("/{cert_id}")
-def get_tank_certificate_by_id(cert_id: int, db: Session = Depends(get_db)):
+async def get_tank_certificate_by_id(cert_id: int, db: AsyncSession = Depends(get_async_read_db)):
     try:
-        cert = db.query(TankCertificate).filter(TankCertificate.id == cert_id).first()
+        cert = await db.scalar(select(TankCertificate).filter(TankCertificate.id == cert_id).limit(1))
         if not cert:
             raise HTTPException(status_code=404, detail="Tank certificate not found")
         
@@ -192,28 +202,48 @@ def get_tank_certificate_by_id(cert_id: int, db: Session = Depends(get_db)):
             "created_at": safe_serialize_date(cert.created_at),
         }
     except Exception as e:
-        print(f"Fetch error: {e}")
+        logger.error(f"Fetch error: {e}")
         raise HTTPException(status_code=500, detail="Error processing certificate data")
 
 
+# -------- FILE --------
+@router.get("/{cert_id}/file")
+async def get_tank_certificate_file(
+    cert_id: int,
+    request: Request,
+    download: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Certificate document; supports Range requests and ETag / If-Modified-Since revalidation."""
+    cert = await db.scalar(select(TankCertificate).filter(TankCertificate.id == cert_id).limit(1))
+    if not cert or not cert.certificate_file:
+        raise HTTPException(status_code=404, detail="Certificate file not found")
+
+    path = await run_in_threadpool(resolve_upload_path, UPLOAD_ROOT, cert.certificate_file, cert.tank_number)
+    if not path:
+        raise HTTPException(status_code=404, detail="Certificate file missing on disk")
+    return await serve_file(request, path, filename=os.path.basename(path), download=download)
+
+
 # -------- UPDATE --------
 @router.put("/{cert_id}")
-def update_tank_certificate(
+async def update_tank_certificate(
     cert_id: int,
     certificate_number: Optional[str] = Form(None),
     insp_2_5y_date: Optional[str] = Form(None),
     next_insp_date: Optional[str] = Form(None),
     inspection_agency: Optional[str] = Form(None),
     certificate_file: Optional[UploadFile] = File(None),
-    db: Session = Depends(get_db),
+    upload_id: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
     updated_by: str = Form("Admin")
 ):
-    cert = db.query(TankCertificate).filter(TankCertificate.id == cert_id).first()
+    cert = await db.scalar(select(TankCertificate).filter(TankCertificate.id == cert_id).limit(1))
     if not cert:
         raise HTTPException(status_code=404, detail="Tank certificate not found")
 
     # Get Tank Number for file saving
-    tank_record = db.query(Tank).filter(Tank.id == cert.tank_id).first()
+    tank_record = await db.scalar(select(Tank).filter(Tank.id == cert.tank_id).limit(1))
     if not tank_record:
          raise HTTPException(status_code=404, detail="Associated Tank not found")
     tank_number = tank_record.tank_number
@@ -237,20 +267,25 @@ def update_tank_certificate(
     payload["updated_by"] = clean_form_data(updated_by)
 
     # File Update Logic
-    if certificate_file:
+    file_sha256 = None
+    if certificate_file or upload_id:
         # 1. Delete old file if exists
         if cert.certificate_file:
-            delete_file_if_exists(UPLOAD_ROOT, cert.certificate_file)
+            await run_io(delete_file_if_exists, UPLOAD_ROOT, cert.certificate_file)
             
         # 2. Save new file using utility
         try:
-            new_file_path = save_uploaded_file(
+            stored = await store_upload(
                 upload_file=certificate_file,
+                upload_id=upload_id,
                 tank_number=tank_number,
                 image_type=CERTIFICATE_TYPE,
                 upload_root=UPLOAD_ROOT
             )
-            payload["certificate_file"] = new_file_path
+            payload["certificate_file"] = stored.rel_path
+            file_sha256 = stored.sha256
+        except HTTPException:
+            raise
         except Exception as e:
              raise HTTPException(status_code=500, detail=f"New file upload failed: {str(e)}")
 
@@ -259,17 +294,18 @@ def update_tank_certificate(
             if hasattr(cert, key):
                 setattr(cert, key, value)
                 
-        db.commit()
-        db.refresh(cert)
+        await db.commit()
+        await db.refresh(cert)
     except OperationalError as e:
-        db.rollback()
-        print(f"DB SCHEMA UPDATE ERROR: {e}")
+        await db.rollback()
+        logger.error(f"DB schema update error: {e}")
         raise HTTPException(status_code=500, detail="Database schema mismatch during update.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=f"Database Update Failed: {str(e)}")
-        
-    return {"message": "Tank certificate updated successfully", "data": cert}
+
+    await run_io(ppt_cache.invalidate_tank, cert.tank_id)
+    return {"message": "Tank certificate updated successfully", "data": cert, "sha256": file_sha256}
 
 
 # -------- DELETE --------
@@ -285,4 +321,5 @@ def delete_tank_certificate(cert_id: int, db: Session = Depends(get_db)):
 
     db.delete(cert)
     db.commit()
+    ppt_cache.invalidate_tank(cert.tank_id)
     return {"message": "Tank certificate deleted successfully"}
\ No newline at end of file
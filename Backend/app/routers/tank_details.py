@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_read_db
 from app.models.tank_header import Tank
 from app.models.tank_details import TankDetails
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from io import BytesIO
-from datetime import datetime
+from app.services import ppt_cache
+from app.utils.export_utils import export_rows
+from datetime import date
+from typing import Optional
+import base64
+import json
 
 router = APIRouter()
 
@@ -105,8 +108,10 @@ def create_tank(data: dict, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def get_all_tanks(db: Session = Depends(get_db)):
-    results = db.query(Tank, TankDetails).join(TankDetails, Tank.id == TankDetails.tank_id).all()
+async def get_all_tanks(db: AsyncSession = Depends(get_async_read_db)):
+    results = (await db.execute(
+        select(Tank, TankDetails).join(TankDetails, Tank.id == TankDetails.tank_id)
+    )).all()
     
     return [
         {
@@ -141,18 +146,140 @@ def get_all_tanks(db: Session = Depends(get_db)):
         for r in results
     ]
 
+# --- Keyset-paginated listing ---
+# Columns a page can project, in the same shape as GET /
+TANK_LIST_FIELDS = {
+    "id": TankDetails.tank_id,
+    "tank_number": Tank.tank_number,
+    "status": TankDetails.status,
+    "mfgr": TankDetails.mfgr,
+    "date_mfg": TankDetails.date_mfg,
+    "pv_code": TankDetails.pv_code,
+    "un_iso_code": TankDetails.un_iso_code,
+    "capacity_l": TankDetails.capacity_l,
+    "mawp": TankDetails.mawp,
+    "design_temperature": TankDetails.design_temperature,
+    "tare_weight_kg": TankDetails.tare_weight_kg,
+    "mgw_kg": TankDetails.mgw_kg,
+    "mpl_kg": TankDetails.mpl_kg,
+    "size": TankDetails.size,
+    "pump_type": TankDetails.pump_type,
+    "vesmat": TankDetails.vesmat,
+    "gross_kg": TankDetails.gross_kg,
+    "net_kg": TankDetails.net_kg,
+    "color_body_frame": TankDetails.color_body_frame,
+    "working_pressure": TankDetails.working_pressure,
+    "cabinet_type": TankDetails.cabinet_type,
+    "frame_type": TankDetails.frame_type,
+    "remark": TankDetails.remark,
+    "lease": TankDetails.lease,
+    "created_by": Tank.created_by,
+}
+
+# Sort keys must be unique and non-null for keyset pagination to be exact
+TANK_SORT_FIELDS = {
+    "id": TankDetails.tank_id,
+    "tank_number": Tank.tank_number,
+}
+
+def encode_cursor(sort_value, tank_id: int) -> str:
+    raw = json.dumps({"v": sort_value, "id": tank_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return data["v"], int(data["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/page")
+async def get_tanks_page(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("id"),
+    order: str = Query("asc"),
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    status: Optional[str] = Query(None),
+    mfgr: Optional[str] = Query(None),
+    lease: Optional[bool] = Query(None),
+    size: Optional[str] = Query(None),
+    pump_type: Optional[str] = Query(None),
+    date_mfg_from: Optional[date] = Query(None),
+    date_mfg_to: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Cursor-paginated tank listing. Pass the returned next_cursor to get the
+    following page; a page costs the same regardless of how deep it is.
+    """
+    if sort not in TANK_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(TANK_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in TANK_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        selected = list(TANK_LIST_FIELDS)
+
+    sort_col = TANK_SORT_FIELDS[sort]
+    # Always fetch the keys needed to build the next cursor
+    columns = [TANK_LIST_FIELDS[f].label(f) for f in selected]
+    columns += [sort_col.label("_sort_value"), TankDetails.tank_id.label("_tank_id")]
+
+    query = select(*columns).select_from(Tank).join(TankDetails, Tank.id == TankDetails.tank_id)
+
+    if status is not None:
+        query = query.filter(TankDetails.status == status)
+    if mfgr is not None:
+        query = query.filter(TankDetails.mfgr == mfgr)
+    if lease is not None:
+        query = query.filter(TankDetails.lease == lease)
+    if size is not None:
+        query = query.filter(TankDetails.size == size)
+    if pump_type is not None:
+        query = query.filter(TankDetails.pump_type == pump_type)
+    if date_mfg_from is not None:
+        query = query.filter(TankDetails.date_mfg >= date_mfg_from)
+    if date_mfg_to is not None:
+        query = query.filter(TankDetails.date_mfg <= date_mfg_to)
+
+    if cursor:
+        last_value, last_id = decode_cursor(cursor)
+        if order == "asc":
+            query = query.filter(or_(sort_col > last_value, and_(sort_col == last_value, TankDetails.tank_id > last_id)))
+        else:
+            query = query.filter(or_(sort_col < last_value, and_(sort_col == last_value, TankDetails.tank_id < last_id)))
+
+    if order == "asc":
+        query = query.order_by(sort_col.asc(), TankDetails.tank_id.asc())
+    else:
+        query = query.order_by(sort_col.desc(), TankDetails.tank_id.desc())
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = []
+    for row in rows:
+        item = {f: getattr(row, f) for f in selected}
+        if "lease" in item and item["lease"] is not None:
+            item["lease"] = int(item["lease"])
+        items.append(item)
+
+    next_cursor = encode_cursor(rows[-1]._sort_value, rows[-1]._tank_id) if has_more else None
+    return {"items": items, "next_cursor": next_cursor, "limit": limit}
+
 @router.get("/export-to-excel")
-def export_to_excel(db: Session = Depends(get_db)):
-    # ... (This function is unchanged) ...
-    results = db.query(Tank, TankDetails).join(TankDetails, Tank.id == TankDetails.tank_id).all()
-    
-    if not results:
-        raise HTTPException(status_code=404, detail="No tank details found to export")
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Tank Details"
-    
+def export_to_excel(format: str = Query("xlsx", description="xlsx | csv | parquet"), db: Session = Depends(get_read_db)):
+    # Rows are streamed from a server-side cursor into the shared export engine
+    results = db.query(Tank, TankDetails).join(TankDetails, Tank.id == TankDetails.tank_id).order_by(TankDetails.id).yield_per(1000)
+
     headers = [
         "ID", "Tank ID", "Tank Number", "Status", "Manufacturer (MFGR)",
         "Date of Manufacture", "PV Code", "UN ISO Code", "Capacity (L)", "MAWP",
@@ -160,64 +287,42 @@ def export_to_excel(db: Session = Depends(get_db)):
         "Pump Type", "VESMAT", "Gross (kg)", "Net (kg)", "Color Body Frame",
         "Remark", "Lease", "Created By", "Updated By"
     ]
-    
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    for row_num, (tank, tank_detail) in enumerate(results, 2):
-        ws.cell(row=row_num, column=1, value=tank_detail.id)
-        ws.cell(row=row_num, column=2, value=tank_detail.tank_id)
-        ws.cell(row=row_num, column=3, value=tank_detail.tank_number or tank.tank_number)
-        ws.cell(row=row_num, column=4, value=tank_detail.status)
-        ws.cell(row=row_num, column=5, value=tank_detail.mfgr)
-        ws.cell(row=row_num, column=6, value=tank_detail.date_mfg.strftime("%Y-%m-%d") if tank_detail.date_mfg else None)
-        ws.cell(row=row_num, column=7, value=tank_detail.pv_code)
-        ws.cell(row=row_num, column=8, value=tank_detail.un_iso_code)
-        ws.cell(row=row_num, column=9, value=tank_detail.capacity_l)
-        ws.cell(row=row_num, column=10, value=tank_detail.mawp)
-        ws.cell(row=row_num, column=11, value=tank_detail.design_temperature)
-        ws.cell(row=row_num, column=12, value=tank_detail.tare_weight_kg)
-        ws.cell(row=row_num, column=13, value=tank_detail.mgw_kg)
-        ws.cell(row=row_num, column=14, value=tank_detail.mpl_kg)
-        ws.cell(row=row_num, column=15, value=tank_detail.size)
-        ws.cell(row=row_num, column=16, value=tank_detail.pump_type)
-        ws.cell(row=row_num, column=17, value=tank_detail.vesmat)
-        ws.cell(row=row_num, column=18, value=tank_detail.gross_kg)
-        ws.cell(row=row_num, column=19, value=tank_detail.net_kg)
-        ws.cell(row=row_num, column=20, value=tank_detail.color_body_frame)
-        ws.cell(row=row_num, column=21, value=tank_detail.remark)
-        ws.cell(row=row_num, column=22, value="Yes" if tank_detail.lease else "No")
-        ws.cell(row=row_num, column=23, value=tank_detail.created_by)
-        ws.cell(row=row_num, column=24, value=tank_detail.updated_by)
-    
-    for col_num, header in enumerate(headers, 1):
-        column_letter = ws.cell(row=1, column=col_num).column_letter
-        max_length = len(str(header))
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=col_num, max_col=col_num):
-            if row[0].value:
-                max_length = max(max_length, len(str(row[0].value)))
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-    
-    ws.row_dimensions[1].height = 25
-    
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"tank_details_export_{timestamp}.xlsx"
-    
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+
+    rows = (
+        (
+            tank_detail.id,
+            tank_detail.tank_id,
+            tank_detail.tank_number or tank.tank_number,
+            tank_detail.status,
+            tank_detail.mfgr,
+            tank_detail.date_mfg.strftime("%Y-%m-%d") if tank_detail.date_mfg else None,
+            tank_detail.pv_code,
+            tank_detail.un_iso_code,
+            tank_detail.capacity_l,
+            tank_detail.mawp,
+            tank_detail.design_temperature,
+            tank_detail.tare_weight_kg,
+            tank_detail.mgw_kg,
+            tank_detail.mpl_kg,
+            tank_detail.size,
+            tank_detail.pump_type,
+            tank_detail.vesmat,
+            tank_detail.gross_kg,
+            tank_detail.net_kg,
+            tank_detail.color_body_frame,
+            tank_detail.remark,
+            "Yes" if tank_detail.lease else "No",
+            tank_detail.created_by,
+            tank_detail.updated_by,
+        )
+        for tank, tank_detail in results
+    )
+
+    return export_rows(
+        headers, rows, format,
+        filename_prefix="tank_details_export",
+        sheet_title="Tank Details",
+        empty_detail="No tank details found to export"
     )
 
 @router.put("/{tank_id}")
@@ -292,7 +397,8 @@ def update_tank(tank_id: int, data: dict, db: Session = Depends(get_db)):
         # If the final commit fails, roll back everything
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update tank details: {str(e)}")
-    
+
+    ppt_cache.invalidate_tank(tank_id)
     return {"message": "Tank updated successfully"}
 
 
@@ -308,13 +414,14 @@ def delete_tank(tank_id: int, db: Session = Depends(get_db)):
         db.delete(tank_detail)
     db.delete(tank)
     db.commit()
+    ppt_cache.invalidate_tank(tank_id)
 
     return {"message": "Tank deleted successfully"}
 
 @router.get("/{tank_id}")
-def get_tank_by_id(tank_id: int, db: Session = Depends(get_db)):
-    tank = db.query(Tank).filter(Tank.id == tank_id).first()
-    tank_detail = db.query(TankDetails).filter(TankDetails.tank_id == tank_id).first()
+async def get_tank_by_id(tank_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    tank = await db.scalar(select(Tank).filter(Tank.id == tank_id).limit(1))
+    tank_detail = await db.scalar(select(TankDetails).filter(TankDetails.tank_id == tank_id).limit(1))
 
     if not tank or not tank_detail:
         raise HTTPException(status_code=404, detail="Tank not found")
@@ -351,12 +458,12 @@ def get_tank_by_id(tank_id: int, db: Session = Depends(get_db)):
     }
 
 @router.get("/by-number/{tank_number}")
-def get_tank_by_number(tank_number: str, db: Session = Depends(get_db)):
-    tank = db.query(Tank).filter(Tank.tank_number == tank_number).first()
+async def get_tank_by_number(tank_number: str, db: AsyncSession = Depends(get_async_read_db)):
+    tank = await db.scalar(select(Tank).filter(Tank.tank_number == tank_number).limit(1))
     if not tank:
         raise HTTPException(status_code=404, detail="Tank not found")
 
-    tank_detail = db.query(TankDetails).filter(TankDetails.tank_id == tank.id).first()
+    tank_detail = await db.scalar(select(TankDetails).filter(TankDetails.tank_id == tank.id).limit(1))
     if not tank_detail:
         raise HTTPException(status_code=404, detail="Tank details not found")
 
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_db, get_async_read_db
 # Ensure this matches your actual model filename
 from app.models.tank_drawings import TankDrawing
 from app.models.tank_header import Tank
@@ -9,7 +12,9 @@ from typing import Optional
 import logging
 
 # Import shared utility functions
-from app.utils.upload_utils import save_uploaded_file, delete_file_if_exists
+from app.utils.upload_utils import store_upload, delete_file_if_exists, run_io
+from app.utils.file_serving import resolve_upload_path, serve_file
+from app.services import ppt_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -23,16 +28,21 @@ DRAWING_TYPE = "drawings"
 
 # --- CREATE (Upload) ---
 @router.post("/")
-def upload_drawing(
+async def upload_drawing(
     tank_id: int = Form(...),
     drawing_type: str = Form(...),
     description: Optional[str] = Form(None),
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     created_by: str = Form("Admin"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
+    # Either the file itself or the upload_id of a completed chunked upload session
+    if not file and not upload_id:
+        raise HTTPException(status_code=400, detail="Provide either file or upload_id")
+
     # 1. Fetch Tank to get tank_number for folder structure
-    tank_record = db.query(Tank).filter(Tank.id == tank_id).first()
+    tank_record = await db.scalar(select(Tank).filter(Tank.id == tank_id).limit(1))
     if not tank_record:
         raise HTTPException(status_code=404, detail="Tank not found")
     
@@ -41,12 +51,16 @@ def upload_drawing(
     # 2. Save File using utility
     # Structure: uploads/drawings/TANK-101/TANK-101_drawings.pdf (or similar)
     try:
-        file_path_db = save_uploaded_file(
+        stored = await store_upload(
             upload_file=file,
+            upload_id=upload_id,
             tank_number=tank_number,
             image_type=DRAWING_TYPE,
             upload_root=UPLOAD_ROOT
         )
+        file_path_db = stored.rel_path
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
@@ -58,26 +72,49 @@ def upload_drawing(
             drawing_type=drawing_type,
             description=description.strip() if description and description.strip() else None, 
             file_path=file_path_db,
-            original_filename=file.filename,
+            original_filename=stored.original_filename,
             created_by=created_by
         )
         db.add(db_drawing)
-        db.commit()
-        db.refresh(db_drawing)
+        await db.commit()
+        await db.refresh(db_drawing)
     except Exception as e:
+        await db.rollback()
         # Cleanup file if DB fails
-        delete_file_if_exists(UPLOAD_ROOT, file_path_db)
-        print(f"Database Error: {e}")
+        await run_io(delete_file_if_exists, UPLOAD_ROOT, file_path_db, stored.sha256)
+        logger.error(f"Database error: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    return {"message": "Drawing uploaded successfully", "data": db_drawing}
+    await run_io(ppt_cache.invalidate_tank, tank_id)
+    return {"message": "Drawing uploaded successfully", "data": db_drawing, "sha256": stored.sha256}
 
 # --- READ (List by Tank) ---
 @router.get("/tank/{tank_id}")
-def get_drawings_by_tank(tank_id: int, db: Session = Depends(get_db)):
+def get_drawings_by_tank(tank_id: int, db: Session = Depends(get_read_db)):
     drawings = db.query(TankDrawing).filter(TankDrawing.tank_id == tank_id).order_by(TankDrawing.created_at.desc()).all()
     return drawings
 
+# --- READ (File) ---
+@router.get("/{drawing_id}/file")
+async def get_drawing_file(
+    drawing_id: int,
+    request: Request,
+    download: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Drawing document; supports Range requests and ETag / If-Modified-Since revalidation."""
+    row = (await db.execute(
+        select(TankDrawing, Tank.tank_number).outerjoin(Tank, Tank.id == TankDrawing.tank_id).filter(TankDrawing.id == drawing_id)
+    )).first()
+    if not row or not row[0].file_path:
+        raise HTTPException(status_code=404, detail="Drawing file not found")
+    drawing, tank_number = row
+
+    path = await run_in_threadpool(resolve_upload_path, UPLOAD_ROOT, drawing.file_path, tank_number)
+    if not path:
+        raise HTTPException(status_code=404, detail="Drawing file missing on disk")
+    return await serve_file(request, path, filename=drawing.original_filename or os.path.basename(path), download=download)
+
 # --- DELETE ---
 @router.delete("/{drawing_id}")
 def delete_drawing(drawing_id: int, db: Session = Depends(get_db)):
@@ -91,4 +128,5 @@ def delete_drawing(drawing_id: int, db: Session = Depends(get_db)):
 
     db.delete(drawing)
     db.commit()
+    ppt_cache.invalidate_tank(drawing.tank_id)
     return {"message": "Drawing deleted successfully"}
\ No newline at end of file
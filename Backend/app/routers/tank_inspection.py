@@ -5,7 +5,7 @@ from typing import List, Optional
 from datetime import date, datetime
 
 from app.models.tank_inspection import TankInspection
-from app.database import get_db
+from app.database import get_db, get_read_db
 
 router = APIRouter()
 
@@ -53,7 +53,7 @@ def create_tank_inspection(data: TankInspectionCreate, db: Session = Depends(get
 
 # READ ALL (Used by the frontend to get all records for filtering)
 @router.get("/", response_model=List[TankInspectionResponse])
-def get_all_tank_inspections(db: Session = Depends(get_db)):
+def get_all_tank_inspections(db: Session = Depends(get_read_db)):
     records = db.query(TankInspection).all()
     # Pydantic (TankInspectionResponse) will automatically handle the date/datetime serialization
     return records
@@ -61,7 +61,7 @@ def get_all_tank_inspections(db: Session = Depends(get_db)):
 
 # READ BY ID
 @router.get("/{id}", response_model=TankInspectionResponse)
-def get_tank_inspection(id: int, db: Session = Depends(get_db)):
+def get_tank_inspection(id: int, db: Session = Depends(get_read_db)):
     record = db.query(TankInspection).filter(TankInspection.id == id).first()
     if not record:
         raise HTTPException(status_code=404, detail="Tank inspection not found")
@@ -1,11 +1,15 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, func, select
+from app.database import get_db, get_async_read_db
 from app.models.tank_regulations import TankRegulation
 from app.models.regulations_master import RegulationsMaster
+from app.services import ppt_cache, master_cache
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # --- NOTE: Removed get_or_create_regulation_master helper, as frontend sends ID ---
 
@@ -41,72 +45,57 @@ def create_tank_regulation(payload: dict, db: Session = Depends(get_db)):
         db.refresh(reg)
     except Exception as e:
         db.rollback()
-        import logging
-        logging.error(f"SQLAlchemy Insertion Error: {e}")
+        logger.error(f"SQLAlchemy Insertion Error: {e}")
         raise HTTPException(status_code=400, detail=f"Database Insertion Failed. Check model constraints. Detail: {str(e)}")
 
+    ppt_cache.invalidate_tank(reg.tank_id)
     return {"message": "Tank regulation added successfully", "data": reg.id}
 
+# Regulation names come from the master data cache instead of a join per request
+async def load_regulation_names(db: AsyncSession) -> list:
+    rows = (await db.execute(select(RegulationsMaster.id, RegulationsMaster.regulation_name))).all()
+    return [[r.id, r.regulation_name] for r in rows]
+
+async def get_regulation_names() -> dict:
+    return dict((await master_cache.get_or_load(master_cache.REGULATION_NAMES, load_regulation_names)).data)
+
+def build_regulation_row(reg: TankRegulation, names: dict) -> dict:
+    return {
+        "id": reg.id,
+        "tank_id": reg.tank_id,
+        "regulation_id": reg.regulation_id,
+        "regulation_name": names[reg.regulation_id] if reg.regulation_id in names else reg.regulation_name, # Use Master name first
+        
+        # Retrieval Fix: Ensure None values are explicitly converted to empty strings for the frontend
+        "initial_approval_no": reg.initial_approval_no or "",
+        "imo_type": reg.imo_type or "",
+        "safety_standard": reg.safety_standard or "",
+        "country_registration": reg.country_registration or "",
+        
+        "created_by": reg.created_by,
+        "updated_by": reg.updated_by,
+        "created_at": reg.created_at,
+        "updated_at": reg.updated_at
+    }
+
 # -------- READ ALL (Kept Fixes for retrieval/display) --------
 @router.get("/")
-def get_all_tank_regulations(db: Session = Depends(get_db)):
-    regs = db.query(TankRegulation, RegulationsMaster).outerjoin(
-        RegulationsMaster, TankRegulation.regulation_id == RegulationsMaster.id
-    ).all()
-    
-    return [
-        {
-            "id": r[0].id,
-            "tank_id": r[0].tank_id,
-            "regulation_id": r[0].regulation_id,
-            "regulation_name": r[1].regulation_name if r[1] else r[0].regulation_name, # Use Master name first
-            
-            # Retrieval Fix: Ensure None values are explicitly converted to empty strings for the frontend
-            "initial_approval_no": r[0].initial_approval_no or "",
-            "imo_type": r[0].imo_type or "",
-            "safety_standard": r[0].safety_standard or "",
-            "country_registration": r[0].country_registration or "",
-            
-            "created_by": r[0].created_by,
-            "updated_by": r[0].updated_by,
-            "created_at": r[0].created_at,
-            "updated_at": r[0].updated_at
-        }
-        for r in regs
-    ]
+async def get_all_tank_regulations(db: AsyncSession = Depends(get_async_read_db)):
+    regs = (await db.execute(select(TankRegulation))).scalars().all()
+    names = await get_regulation_names()
+    return [build_regulation_row(r, names) for r in regs]
 
 # -------- READ BY TANK ID (Kept Fixes for retrieval/display) --------
 @router.get("/tank/{tank_id}")
-def get_tank_regulations_by_tank(tank_id: int, db: Session = Depends(get_db)):
-    regs = db.query(TankRegulation, RegulationsMaster).outerjoin(
-        RegulationsMaster, TankRegulation.regulation_id == RegulationsMaster.id
-    ).filter(TankRegulation.tank_id == tank_id).all()
-
-    return [
-        {
-            "id": r[0].id,
-            "tank_id": r[0].tank_id,
-            "regulation_id": r[0].regulation_id,
-            "regulation_name": r[1].regulation_name if r[1] else r[0].regulation_name, # Use Master name first
-            
-            # Retrieval Fix: Ensure None values are explicitly converted to empty strings for the frontend
-            "initial_approval_no": r[0].initial_approval_no or "",
-            "imo_type": r[0].imo_type or "",
-            "safety_standard": r[0].safety_standard or "",
-            "country_registration": r[0].country_registration or "",
-            
-            "created_by": r[0].created_by,
-            "updated_by": r[0].updated_by,
-            "created_at": r[0].created_at,
-            "updated_at": r[0].updated_at
-        }
-        for r in regs
-    ]
+async def get_tank_regulations_by_tank(tank_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    regs = (await db.execute(select(TankRegulation).filter(TankRegulation.tank_id == tank_id))).scalars().all()
+    names = await get_regulation_names()
+    return [build_regulation_row(r, names) for r in regs]
 
 # -------- READ BY ID --------
 @router.get("/{reg_id}")
-def get_tank_regulation_by_id(reg_id: int, db: Session = Depends(get_db)):
-    reg = db.query(TankRegulation).filter(TankRegulation.id == reg_id).first()
+async def get_tank_regulation_by_id(reg_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    reg = await db.scalar(select(TankRegulation).filter(TankRegulation.id == reg_id).limit(1))
     if not reg:
         raise HTTPException(status_code=404, detail="Tank regulation not found")
     return reg
@@ -130,6 +119,7 @@ def update_tank_regulation(reg_id: int, payload: dict, db: Session = Depends(get
             
     db.commit()
     db.refresh(reg)
+    ppt_cache.invalidate_tank(reg.tank_id)
     return {"message": "Tank regulation updated successfully", "data": reg}
 
 # -------- DELETE --------
@@ -140,4 +130,5 @@ def delete_tank_regulation(reg_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Tank regulation not found")
     db.delete(reg)
     db.commit()
+    ppt_cache.invalidate_tank(reg.tank_id)
     return {"message": "Tank regulation deleted successfully"}
\ No newline at end of file
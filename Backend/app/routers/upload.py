@@ -1,22 +1,33 @@
 import os
+import json
+import base64
+import asyncio
 import logging
 from datetime import datetime, date
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.database import get_db
-from app.models.tank_images import TankImage
+from app.database import get_db, get_async_db, get_async_read_db
+from app.models.tank_images import TankImage, with_relations
 from app.models.tank_header import Tank
 # Ensure these imports match your project structure
 from app.utils.upload_utils import (
     IMAGE_TYPES,
     validate_image_type,
-    save_uploaded_file,
-    delete_file_if_exists
+    save_uploaded_file_async,
+    delete_file_if_exists,
+    run_io
 )
+from app.utils.image_derivatives import get_derivative, is_raster_image, FORMAT_MEDIA_TYPES
+from app.utils.file_serving import resolve_upload_path, serve_file
+from app.services import ppt_cache, master_cache
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -28,6 +39,12 @@ MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))
 # Ensure upload root exists
 os.makedirs(UPLOAD_ROOT, exist_ok=True)
 
+# Served image sizes / formats (see image_derivatives.PRESETS)
+IMAGE_SIZES = ("thumb", "medium", "original")
+IMAGE_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+# How long browsers may reuse a served image before revalidating with its ETag
+IMAGE_CACHE_MAX_AGE = int(os.getenv("IMAGE_CACHE_MAX_AGE", 3600))
+
 
 # ==================== Pydantic Schemas ====================
 
@@ -62,6 +79,7 @@ class UploadResponseSchema(BaseModel):
     success: bool
     message: str
     data: TankImageDataSchema
+    sha256: Optional[str] = None  # content hash; identical files share one copy on disk
 
 
 class ImagesListResponseSchema(BaseModel):
@@ -69,6 +87,28 @@ class ImagesListResponseSchema(BaseModel):
     data: List[TankImageDataSchema]
 
 
+class ImageHistoryResponseSchema(BaseModel):
+    success: bool
+    data: List[TankImageDataSchema]
+    next_cursor: Optional[str] = None
+
+
+class BatchUploadResultSchema(BaseModel):
+    image_type: str
+    success: bool
+    message: str
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    data: Optional[TankImageDataSchema] = None
+
+
+class BatchUploadResponseSchema(BaseModel):
+    success: bool
+    uploaded_count: int
+    failed_count: int
+    results: List[BatchUploadResultSchema]
+
+
 class DeleteResponseSchema(BaseModel):
     success: bool
     message: str
@@ -77,6 +117,44 @@ class DeleteResponseSchema(BaseModel):
 
 # ==================== Helper Functions ====================
 
+def latest_images_query(tank_number: str, image_type: Optional[str] = None, eager: bool = False):
+    """
+    Latest row per image type for a tank, in one query. ROW_NUMBER() is
+    computed over the (tank_number, image_type, created_date) unique index,
+    so the cost follows the number of types, not the years of daily photos.
+    eager=True also loads each row's uploader and tank.
+    """
+    ranked = select(
+        TankImage,
+        func.row_number().over(
+            partition_by=TankImage.image_type,
+            order_by=(TankImage.created_date.desc(), TankImage.id.desc())
+        ).label("rn")
+    ).filter(TankImage.tank_number == tank_number)
+    if image_type:
+        ranked = ranked.filter(TankImage.image_type == image_type)
+    ranked = ranked.subquery()
+
+    latest = aliased(TankImage, ranked)
+    query = select(latest).filter(ranked.c.rn == 1)
+    if eager:
+        query = query.options(*with_relations(latest))
+    return query
+
+
+def encode_history_cursor(record: TankImage) -> str:
+    raw = json.dumps({"d": record.created_date.isoformat(), "id": record.id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_history_cursor(cursor: str):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(data["d"]), int(data["id"])
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
 def validate_tank(tank_number: str, db: Session) -> Tank:
     """Validate that tank exists in tank_header table."""
     tank = db.query(Tank).filter(Tank.tank_number == tank_number).first()
@@ -88,6 +166,43 @@ def validate_tank(tank_number: str, db: Session) -> Tank:
     return tank
 
 
+async def validate_tank_async(tank_number: str, db: AsyncSession) -> Tank:
+    """validate_tank for handlers using an AsyncSession."""
+    tank = await db.scalar(select(Tank).filter(Tank.tank_number == tank_number).limit(1))
+    if not tank:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tank '{tank_number}' not found"
+        )
+    return tank
+
+
+async def upsert_tank_images(db: AsyncSession, rows: List[dict]) -> None:
+    """
+    Inserts or updates the tank_images rows in a single statement,
+    keyed on uq_tank_image_daily (tank_number, image_type, created_date).
+    """
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql.insert(TankImage).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            image_path=stmt.inserted.image_path,
+            sha256=stmt.inserted.sha256,
+            emp_id=stmt.inserted.emp_id,
+            updated_at=func.now()
+        )
+    else:
+        # SQLite (local benchmarks)
+        stmt = sqlite.insert(TankImage).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tank_number", "image_type", "created_date"],
+            set_={
+                "image_path": stmt.excluded.image_path, "sha256": stmt.excluded.sha256,
+                "emp_id": stmt.excluded.emp_id, "updated_at": func.now()
+            }
+        )
+    await db.execute(stmt)
+
+
 def get_image_label(image_type: str) -> str:
     """Get human-readable label for image type."""
     return IMAGE_TYPES.get(image_type, image_type)
@@ -130,13 +245,129 @@ def build_empty_image_response(tank_number: str, image_type: str) -> TankImageDa
 # ==================== Endpoints ====================
 
 @router.get("/types", response_model=ImageTypeResponseSchema, tags=["Upload"])
-def get_image_types():
+def get_image_types(request: Request):
     """Get list of allowed image types."""
     data = [
         ImageTypeSchema(slug=slug, label=label)
         for slug, label in IMAGE_TYPES.items()
     ]
-    return ImageTypeResponseSchema(success=True, data=data)
+    return master_cache.json_response(request, master_cache.encode_value(ImageTypeResponseSchema(success=True, data=data)))
+
+
+# Registered before "/{tank_number}/{image_type}", which would otherwise match "images"
+@router.post(
+    "/{tank_number}/images",
+    response_model=BatchUploadResponseSchema,
+    tags=["Upload"]
+)
+async def upload_images_batch(
+    request: Request,
+    tank_number: str,
+    emp_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload a full inspection photo set in one multipart request.
+    Each form field name is the image type, e.g. frontview=@front.jpg, rearview=@rear.jpg.
+    Files are written concurrently and today's rows are upserted in one statement.
+    Returns a result per field; a failed file does not stop the others.
+    """
+    tank = await validate_tank_async(tank_number, db)
+
+    # One result per file field, in request order
+    results: List[Optional[BatchUploadResultSchema]] = []
+    uploads = {}  # image_type -> (result position, file)
+    async with request.form(max_files=len(IMAGE_TYPES)) as form:
+        for field, value in form.multi_items():
+            if not isinstance(value, StarletteUploadFile):
+                continue
+            image_type = field.lower()
+            if image_type not in IMAGE_TYPES:
+                results.append(BatchUploadResultSchema(image_type=field, success=False, message=f"Invalid image_type '{field}'"))
+            elif image_type in uploads:
+                results.append(BatchUploadResultSchema(image_type=image_type, success=False, message="Duplicate image_type in request"))
+            else:
+                uploads[image_type] = (len(results), value)
+                results.append(None)
+
+        if not results:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files provided")
+
+        # Write every file concurrently
+        stored_list = await asyncio.gather(
+            *(save_uploaded_file_async(f, tank_number, image_type, UPLOAD_ROOT, MAX_UPLOAD_SIZE) for image_type, (_, f) in uploads.items()),
+            return_exceptions=True
+        )
+
+    stored = {}
+    for (image_type, (pos, _)), outcome in zip(uploads.items(), stored_list):
+        if isinstance(outcome, Exception):
+            detail = outcome.detail if isinstance(outcome, HTTPException) else "Error saving file"
+            results[pos] = BatchUploadResultSchema(image_type=image_type, success=False, message=detail)
+        else:
+            stored[image_type] = outcome
+
+    if stored:
+        today = date.today()
+        todays_images = select(TankImage).filter(
+            TankImage.tank_number == tank_number,
+            TankImage.created_date == today,
+            TankImage.image_type.in_(list(stored))
+        )
+        previous = {r.image_type: (r.image_path, r.sha256) for r in (await db.execute(todays_images)).scalars().all()}
+
+        try:
+            await upsert_tank_images(db, [
+                {
+                    "emp_id": emp_id,
+                    "tank_number": tank_number,
+                    "image_type": image_type,
+                    "image_path": upload.rel_path,
+                    "sha256": upload.sha256,
+                    "created_date": today
+                }
+                for image_type, upload in stored.items()
+            ])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Error saving batch upload rows: {str(e)}")
+            # Remove the files written for this batch, except paths older rows still point to
+            referenced = set((await db.execute(
+                select(TankImage.image_path).filter(TankImage.image_path.in_([u.rel_path for u in stored.values()]))
+            )).scalars().all())
+            for upload in stored.values():
+                if upload.rel_path not in referenced:
+                    await run_io(delete_file_if_exists, UPLOAD_ROOT, upload.rel_path, upload.sha256)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error saving images"
+            )
+
+        # Extension changes leave the previous file behind under another name
+        for image_type, (old_path, old_digest) in previous.items():
+            if old_path and old_path != stored[image_type].rel_path:
+                await run_io(delete_file_if_exists, UPLOAD_ROOT, old_path, old_digest)
+
+        records = (await db.execute(todays_images.execution_options(populate_existing=True))).scalars().all()
+        for record in records:
+            results[uploads[record.image_type][0]] = BatchUploadResultSchema(
+                image_type=record.image_type,
+                success=True,
+                message="Image uploaded successfully",
+                size=stored[record.image_type].size,
+                sha256=stored[record.image_type].sha256,
+                data=build_image_response(record)
+            )
+        await run_io(ppt_cache.invalidate_tank, tank.id)
+
+    failed_count = sum(1 for r in results if not r.success)
+    return BatchUploadResponseSchema(
+        success=failed_count == 0,
+        uploaded_count=len(results) - failed_count,
+        failed_count=failed_count,
+        results=results
+    )
 
 
 @router.post(
@@ -144,55 +375,57 @@ def get_image_types():
     response_model=UploadResponseSchema,
     tags=["Upload"]
 )
-def upload_image(
+async def upload_image(
     tank_number: str,
     image_type: str,
     file: UploadFile = File(...),
     emp_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload or update today's image for a tank and image type.
     """
     try:
         # Validate tank exists
-        validate_tank(tank_number, db)
+        tank = await validate_tank_async(tank_number, db)
         
         # Validate and normalize image type
         image_type = validate_image_type(image_type)
         
         # Save file to disk (UPDATED LOGIC CALLED HERE)
-        image_path = save_uploaded_file(
+        stored = await save_uploaded_file_async(
             file,
             tank_number,
             image_type,
             UPLOAD_ROOT,
             MAX_UPLOAD_SIZE
         )
+        image_path = stored.rel_path
         
         # Upsert into database
         today = date.today()
         
-        existing = db.query(TankImage).filter(
+        existing = await db.scalar(select(TankImage).filter(
             and_(
                 TankImage.tank_number == tank_number,
                 TankImage.image_type == image_type,
                 TankImage.created_date == today
             )
-        ).first()
+        ).limit(1))
         
         if existing:
             # Delete old file if it exists and path is different
             # Note: With fixed filenames, path might be same, so we verify
             if existing.image_path and existing.image_path != image_path:
-                delete_file_if_exists(UPLOAD_ROOT, existing.image_path)
+                await run_io(delete_file_if_exists, UPLOAD_ROOT, existing.image_path, existing.sha256)
             
             # Update existing record
             existing.image_path = image_path
+            existing.sha256 = stored.sha256
             existing.emp_id = emp_id
             existing.updated_at = datetime.now()
-            db.commit()
-            db.refresh(existing)
+            await db.commit()
+            await db.refresh(existing)
             db_record = existing
         else:
             # Create new record
@@ -201,17 +434,20 @@ def upload_image(
                 tank_number=tank_number,
                 image_type=image_type,
                 image_path=image_path,
+                sha256=stored.sha256,
                 created_date=today
             )
             db.add(db_record)
-            db.commit()
-            db.refresh(db_record)
+            await db.commit()
+            await db.refresh(db_record)
         
+        await run_io(ppt_cache.invalidate_tank, tank.id)
         response_data = build_image_response(db_record)
         return UploadResponseSchema(
             success=True,
             message="Image uploaded successfully",
-            data=response_data
+            data=response_data,
+            sha256=stored.sha256
         )
     
     except HTTPException:
@@ -229,19 +465,19 @@ def upload_image(
     response_model=UploadResponseSchema,
     tags=["Upload"]
 )
-def update_image(
+async def update_image(
     tank_number: str,
     image_type: str,
     file: UploadFile = File(...),
     emp_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update today's image for a tank and image type (replace if exists).
     """
     try:
         # Validate tank exists
-        validate_tank(tank_number, db)
+        tank = await validate_tank_async(tank_number, db)
         
         # Validate and normalize image type
         image_type = validate_image_type(image_type)
@@ -249,35 +485,37 @@ def update_image(
         today = date.today()
         
         # Check if existing image exists for today
-        existing = db.query(TankImage).filter(
+        existing = await db.scalar(select(TankImage).filter(
             and_(
                 TankImage.tank_number == tank_number,
                 TankImage.image_type == image_type,
                 TankImage.created_date == today
             )
-        ).first()
+        ).limit(1))
         
         # Save new file first
         # (With fixed filenames, this overwrites the file on disk immediately)
-        image_path = save_uploaded_file(
+        stored = await save_uploaded_file_async(
             file,
             tank_number,
             image_type,
             UPLOAD_ROOT,
             MAX_UPLOAD_SIZE
         )
+        image_path = stored.rel_path
         
         if existing:
             # If path somehow changed (e.g. extension changed), delete old specific file
             if existing.image_path and existing.image_path != image_path:
-                delete_file_if_exists(UPLOAD_ROOT, existing.image_path)
+                await run_io(delete_file_if_exists, UPLOAD_ROOT, existing.image_path, existing.sha256)
 
             # Update existing record
             existing.image_path = image_path
+            existing.sha256 = stored.sha256
             existing.emp_id = emp_id
             existing.updated_at = datetime.now()
-            db.commit()
-            db.refresh(existing)
+            await db.commit()
+            await db.refresh(existing)
             db_record = existing
         else:
             # Create new record
@@ -286,17 +524,20 @@ def update_image(
                 tank_number=tank_number,
                 image_type=image_type,
                 image_path=image_path,
+                sha256=stored.sha256,
                 created_date=today
             )
             db.add(db_record)
-            db.commit()
-            db.refresh(db_record)
+            await db.commit()
+            await db.refresh(db_record)
         
+        await run_io(ppt_cache.invalidate_tank, tank.id)
         response_data = build_image_response(db_record)
         return UploadResponseSchema(
             success=True,
             message="Image updated successfully",
-            data=response_data
+            data=response_data,
+            sha256=stored.sha256
         )
     
     except HTTPException:
@@ -310,40 +551,28 @@ def update_image(
 
 
 @router.get("/{tank_number}/images", response_model=ImagesListResponseSchema, tags=["Upload"])
-def get_tank_images(
+async def get_tank_images(
     tank_number: str,
     image_type: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get all images for a tank."""
+    """Get the latest image of each type for a tank (see /history for older days)."""
     try:
-        validate_tank(tank_number, db)
+        await validate_tank_async(tank_number, db)
         
         if image_type:
             image_type = validate_image_type(image_type)
         
-        query = db.query(TankImage).filter(TankImage.tank_number == tank_number)
-        
-        if image_type:
-            query = query.filter(TankImage.image_type == image_type)
-        
-        db_records = query.all()
+        db_records = (await db.execute(latest_images_query(tank_number, image_type))).scalars().all()
+        latest = {r.image_type: r for r in db_records}
         
         response_data = []
-        
-        if image_type:
-            existing = next((r for r in db_records if r.image_type == image_type), None)
+        for type_slug in ([image_type] if image_type else IMAGE_TYPES.keys()):
+            existing = latest.get(type_slug)
             if existing:
                 response_data.append(build_image_response(existing))
             else:
-                response_data.append(build_empty_image_response(tank_number, image_type))
-        else:
-            for type_slug in IMAGE_TYPES.keys():
-                existing = next((r for r in db_records if r.image_type == type_slug), None)
-                if existing:
-                    response_data.append(build_image_response(existing))
-                else:
-                    response_data.append(build_empty_image_response(tank_number, type_slug))
+                response_data.append(build_empty_image_response(tank_number, type_slug))
         
         return ImagesListResponseSchema(success=True, data=response_data)
     
@@ -357,6 +586,93 @@ def get_tank_images(
         )
 
 
+@router.get("/{tank_number}/images/history", response_model=ImageHistoryResponseSchema, tags=["Upload"])
+async def get_tank_image_history(
+    tank_number: str,
+    image_type: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Images of a tank, newest day first, optionally within a date range.
+    Pass the returned next_cursor to get the following page.
+    """
+    await validate_tank_async(tank_number, db)
+
+    query = select(TankImage).filter(TankImage.tank_number == tank_number)
+    if image_type:
+        query = query.filter(TankImage.image_type == validate_image_type(image_type))
+    if date_from:
+        query = query.filter(TankImage.created_date >= date_from)
+    if date_to:
+        query = query.filter(TankImage.created_date <= date_to)
+    if cursor:
+        last_date, last_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            TankImage.created_date < last_date,
+            and_(TankImage.created_date == last_date, TankImage.id < last_id)
+        ))
+
+    # One extra row tells whether another page exists
+    query = query.order_by(TankImage.created_date.desc(), TankImage.id.desc()).limit(limit + 1)
+    records = (await db.execute(query)).scalars().all()
+
+    next_cursor = encode_history_cursor(records[limit - 1]) if len(records) > limit else None
+    return ImageHistoryResponseSchema(
+        success=True,
+        data=[build_image_response(r) for r in records[:limit]],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/{tank_number}/{image_type}/file", tags=["Upload"])
+async def get_tank_image_file(
+    request: Request,
+    tank_number: str,
+    image_type: str,
+    size: str = Query("medium", description="thumb | medium | original"),
+    format: str = Query("jpeg", description="jpeg | webp (ignored for original)"),
+    date_str: Optional[str] = Query(None, description="YYYY-MM-DD, defaults to the latest image"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Serve a tank image at display size. Resized copies are generated on first
+    request and cached in a .derivatives folder next to the original.
+    """
+    image_type = validate_image_type(image_type)
+    if size not in IMAGE_SIZES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"size must be one of: {', '.join(IMAGE_SIZES)}")
+    fmt = IMAGE_FORMATS.get(format.lower())
+    if not fmt:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"format must be one of: {', '.join(IMAGE_FORMATS)}")
+
+    query = select(TankImage).filter(TankImage.tank_number == tank_number, TankImage.image_type == image_type)
+    if date_str:
+        try:
+            query = query.filter(TankImage.created_date == datetime.strptime(date_str, "%Y-%m-%d").date())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date format. Use YYYY-MM-DD")
+    record = await db.scalar(query.order_by(TankImage.created_date.desc()).limit(1))
+    if not record or not record.image_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    src_path = await run_in_threadpool(resolve_upload_path, UPLOAD_ROOT, record.image_path, record.tank_number)
+    if not src_path:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image file missing on disk")
+
+    path, media_type = src_path, None
+    if size != "original" and is_raster_image(src_path):
+        derivative = await run_in_threadpool(get_derivative, src_path, size, fmt)
+        if derivative:
+            path, media_type = derivative, FORMAT_MEDIA_TYPES[fmt]
+
+    # Strong ETag is safe: derivatives are regenerated whenever the original changes
+    return await serve_file(request, path, media_type=media_type, max_age=IMAGE_CACHE_MAX_AGE)
+
+
 @router.delete("/{tank_number}/image", tags=["Upload"])
 def delete_image(
     tank_number: str,
@@ -366,7 +682,7 @@ def delete_image(
 ):
     """Delete a specific image."""
     try:
-        validate_tank(tank_number, db)
+        tank = validate_tank(tank_number, db)
         image_type = validate_image_type(image_type)
         
         try:
@@ -393,10 +709,11 @@ def delete_image(
         
         # Delete file from disk (and clean folder if empty)
         if record.image_path:
-            delete_file_if_exists(UPLOAD_ROOT, record.image_path)
+            delete_file_if_exists(UPLOAD_ROOT, record.image_path, record.sha256)
         
         db.delete(record)
         db.commit()
+        ppt_cache.invalidate_tank(tank.id)
         
         return DeleteResponseSchema(
             success=True,
@@ -422,7 +739,7 @@ def delete_tank_images(
 ):
     """Delete all images for a tank."""
     try:
-        validate_tank(tank_number, db)
+        tank = validate_tank(tank_number, db)
         
         query = db.query(TankImage).filter(TankImage.tank_number == tank_number)
         
@@ -441,11 +758,12 @@ def delete_tank_images(
         
         for record in records:
             if record.image_path:
-                delete_file_if_exists(UPLOAD_ROOT, record.image_path)
+                delete_file_if_exists(UPLOAD_ROOT, record.image_path, record.sha256)
             db.delete(record)
             deleted_count += 1
         
         db.commit()
+        ppt_cache.invalidate_tank(tank.id)
         
         return DeleteResponseSchema(
             success=True,
@@ -0,0 +1,95 @@
+import os
+import asyncio
+import logging
+from typing import Optional
+from fastapi import APIRouter, Query, Request, status
+from pydantic import BaseModel
+
+from app.utils.upload_utils import (
+    init_upload_session,
+    get_upload_session,
+    write_upload_chunk,
+    complete_upload_session,
+    abort_upload_session,
+    cleanup_uploads
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Same upload root as the certificate / drawing / valve report routers that consume the sessions
+UPLOAD_ROOT = os.getenv("UPLOAD_ROOT", os.path.join(os.path.dirname(__file__), "..", "..", "uploads"))
+os.makedirs(UPLOAD_ROOT, exist_ok=True)
+
+# Stale temp files, sessions and unreferenced blobs are removed this often
+CLEANUP_INTERVAL_SECONDS = int(os.getenv("UPLOAD_CLEANUP_INTERVAL_SECONDS", 3600))
+_cleanup_task: Optional[asyncio.Task] = None
+
+
+# ==================== Periodic cleanup ====================
+
+async def _cleanup_loop():
+    while True:
+        await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+        try:
+            removed = await cleanup_uploads(UPLOAD_ROOT)
+            if removed:
+                logger.info(f"Removed {removed} stale temp files / upload sessions / blobs")
+        except Exception as e:
+            logger.error(f"Upload cleanup failed: {str(e)}")
+
+
+def start_cleanup() -> None:
+    """Starts the periodic upload cleanup; called from the app's startup event."""
+    global _cleanup_task
+    if _cleanup_task is None:
+        _cleanup_task = asyncio.get_running_loop().create_task(_cleanup_loop())
+
+
+def stop_cleanup() -> None:
+    global _cleanup_task
+    if _cleanup_task is not None:
+        _cleanup_task.cancel()
+        _cleanup_task = None
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    total_size: int
+
+
+class UploadSessionComplete(BaseModel):
+    sha256: str
+
+
+# ==================== Endpoints ====================
+# Flow: POST / -> PUT /{upload_id}?offset=N (repeat) -> POST /{upload_id}/complete,
+# then pass upload_id to the certificate, drawing or valve report endpoint.
+# After a dropped connection, GET /{upload_id} returns the offset to resume from.
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_upload_session(payload: UploadSessionCreate):
+    return await init_upload_session(UPLOAD_ROOT, payload.filename, payload.content_type, payload.total_size)
+
+
+@router.get("/{upload_id}")
+async def get_upload_session_status(upload_id: str):
+    return await get_upload_session(UPLOAD_ROOT, upload_id)
+
+
+@router.put("/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    """Raw chunk bytes in the request body, written at offset."""
+    return await write_upload_chunk(UPLOAD_ROOT, upload_id, offset, request.stream())
+
+
+@router.post("/{upload_id}/complete")
+async def complete_upload(upload_id: str, payload: UploadSessionComplete):
+    return await complete_upload_session(UPLOAD_ROOT, upload_id, payload.sha256)
+
+
+@router.delete("/{upload_id}")
+async def abort_upload(upload_id: str):
+    await abort_upload_session(UPLOAD_ROOT, upload_id)
+    return {"message": "Upload session deleted"}
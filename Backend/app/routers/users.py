@@ -1,14 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from pydantic import BaseModel, EmailStr
 from typing import Optional
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-from io import BytesIO
-from datetime import datetime
+from app.utils.export_utils import export_rows
 import secrets
 import hashlib
 
@@ -35,7 +31,7 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
 
 @router.get("/")
-def get_all_users(db: Session = Depends(get_db)):
+def get_all_users(db: Session = Depends(get_read_db)):
     """Get all users"""
     users = db.query(User).order_by(User.id).all()
     
@@ -56,21 +52,13 @@ def get_all_users(db: Session = Depends(get_db)):
     ]
 
 @router.get("/export-to-excel")
-def export_to_excel(db: Session = Depends(get_db)):
+def export_to_excel(format: str = Query("xlsx", description="xlsx | csv | parquet"), db: Session = Depends(get_read_db)):
     """
-    Export all users to Excel file with all columns from users table.
+    Export all users to Excel (or CSV / Parquet) with all columns from users table.
+    Rows are streamed from a server-side cursor, so memory stays flat.
     """
-    # Query all users
-    users = db.query(User).order_by(User.id).all()
-    
-    if not users:
-        raise HTTPException(status_code=404, detail="No users found to export")
-    
-    # Create a new workbook and worksheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Users"
-    
+    users = db.query(User).order_by(User.id).yield_per(1000)
+
     # Define column headers (all columns from users table)
     headers = [
         "ID",
@@ -84,64 +72,32 @@ def export_to_excel(db: Session = Depends(get_db)):
         "Created At",
         "Updated At"
     ]
-    
-    # Style the header row
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Write headers
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-    
-    # Write data rows
-    for row_num, user in enumerate(users, 2):
-        ws.cell(row=row_num, column=1, value=user.id)
-        ws.cell(row=row_num, column=2, value=user.emp_id)
-        ws.cell(row=row_num, column=3, value=user.name)
-        ws.cell(row=row_num, column=4, value=user.department)
-        ws.cell(row=row_num, column=5, value=user.designation)
-        ws.cell(row=row_num, column=6, value=user.hod)
-        ws.cell(row=row_num, column=7, value=user.supervisor)
-        ws.cell(row=row_num, column=8, value=user.email)
-        ws.cell(row=row_num, column=9, value=user.created_at.strftime("%Y-%m-%d %H:%M:%S") if user.created_at else None)
-        ws.cell(row=row_num, column=10, value=user.updated_at.strftime("%Y-%m-%d %H:%M:%S") if user.updated_at else None)
-    
-    # Auto-adjust column widths
-    for col_num, header in enumerate(headers, 1):
-        column_letter = ws.cell(row=1, column=col_num).column_letter
-        max_length = len(str(header))
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=col_num, max_col=col_num):
-            if row[0].value:
-                max_length = max(max_length, len(str(row[0].value)))
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-    
-    # Set row height for header
-    ws.row_dimensions[1].height = 25
-    
-    # Save workbook to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    # Generate filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"users_export_{timestamp}.xlsx"
-    
-    # Return as downloadable file
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+
+    rows = (
+        (
+            user.id,
+            user.emp_id,
+            user.name,
+            user.department,
+            user.designation,
+            user.hod,
+            user.supervisor,
+            user.email,
+            user.created_at.strftime("%Y-%m-%d %H:%M:%S") if user.created_at else None,
+            user.updated_at.strftime("%Y-%m-%d %H:%M:%S") if user.updated_at else None,
+        )
+        for user in users
+    )
+
+    return export_rows(
+        headers, rows, format,
+        filename_prefix="users_export",
+        sheet_title="Users",
+        empty_detail="No users found to export"
     )
 
 @router.get("/{emp_id}")
-def get_user_by_emp_id(emp_id: int, db: Session = Depends(get_db)):
+def get_user_by_emp_id(emp_id: int, db: Session = Depends(get_read_db)):
     """Get user by Employee ID"""
     user = db.query(User).filter(User.emp_id == emp_id).first()
     
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_db, get_async_read_db
 from app.models.valve_test_report import ValveTestReport 
 from app.models.tank_header import Tank
 import os
@@ -8,7 +11,9 @@ from typing import Optional
 from datetime import date as date_type
 
 # Import shared utility functions
-from app.utils.upload_utils import save_uploaded_file, delete_file_if_exists
+from app.utils.upload_utils import store_upload, delete_file_if_exists, run_io
+from app.utils.file_serving import resolve_upload_path, serve_file
+from app.services import ppt_cache
 
 router = APIRouter()
 
@@ -24,32 +29,39 @@ def clean_form_data(value: Optional[str]):
 
 # --- CREATE ---
 @router.post("/")
-def create_valve_test_report(
+async def create_valve_test_report(
     tank_id: int = Form(...),
     test_date: Optional[str] = Form(None),
     inspected_by: Optional[str] = Form(None),
     remarks: Optional[str] = Form(None),
     inspection_report_file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     created_by: str = Form("Admin"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # 1. Fetch Tank to get tank_number
-    tank_record = db.query(Tank).filter(Tank.id == tank_id).first()
+    tank_record = await db.scalar(select(Tank).filter(Tank.id == tank_id).limit(1))
     if not tank_record:
         raise HTTPException(status_code=404, detail="Tank not found")
     
     tank_number = tank_record.tank_number
 
     # 2. Save File
+    # (either the file itself or the upload_id of a completed chunked upload session)
     file_path_db = None
-    if inspection_report_file:
+    file_sha256 = None
+    if inspection_report_file or upload_id:
         try:
-            file_path_db = save_uploaded_file(
+            stored = await store_upload(
                 upload_file=inspection_report_file,
+                upload_id=upload_id,
                 tank_number=tank_number,
                 image_type=VALVE_REPORT_TYPE,
                 upload_root=UPLOAD_ROOT
             )
+            file_path_db, file_sha256 = stored.rel_path, stored.sha256
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
@@ -68,60 +80,89 @@ def create_valve_test_report(
             created_by=created_by
         )
         db.add(new_report)
-        db.commit()
-        db.refresh(new_report)
+        await db.commit()
+        await db.refresh(new_report)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         # Cleanup file if DB insertion fails
         if file_path_db:
-            delete_file_if_exists(UPLOAD_ROOT, file_path_db)
+            await run_io(delete_file_if_exists, UPLOAD_ROOT, file_path_db, file_sha256)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    return {"message": "Report created successfully", "data": new_report}
+    await run_io(ppt_cache.invalidate_tank, tank_id)
+    return {"message": "Report created successfully", "data": new_report, "sha256": file_sha256}
 
 # --- READ BY TANK ID ---
 @router.get("/tank/{tank_id}")
-def get_valve_reports_by_tank(tank_id: int, db: Session = Depends(get_db)):
+def get_valve_reports_by_tank(tank_id: int, db: Session = Depends(get_read_db)):
     reports = db.query(ValveTestReport).filter(ValveTestReport.tank_id == tank_id).order_by(ValveTestReport.created_at.desc()).all()
     return reports
 
+# --- READ (File) ---
+@router.get("/{report_id}/file")
+async def get_valve_report_file(
+    report_id: int,
+    request: Request,
+    download: bool = Query(False),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Inspection report document; supports Range requests and ETag / If-Modified-Since revalidation."""
+    row = (await db.execute(
+        select(ValveTestReport.inspection_report_file, Tank.tank_number)
+        .outerjoin(Tank, Tank.id == ValveTestReport.tank_id)
+        .filter(ValveTestReport.id == report_id)
+    )).first()
+    if not row or not row.inspection_report_file:
+        raise HTTPException(status_code=404, detail="Report file not found")
+
+    path = await run_in_threadpool(resolve_upload_path, UPLOAD_ROOT, row.inspection_report_file, row.tank_number)
+    if not path:
+        raise HTTPException(status_code=404, detail="Report file missing on disk")
+    return await serve_file(request, path, filename=os.path.basename(path), download=download)
+
 # --- UPDATE ---
 @router.put("/{report_id}")
-def update_valve_test_report(
+async def update_valve_test_report(
     report_id: int,
     test_date: Optional[str] = Form(None),
     inspected_by: Optional[str] = Form(None),
     remarks: Optional[str] = Form(None),
     inspection_report_file: Optional[UploadFile] = File(None),
+    upload_id: Optional[str] = Form(None),
     updated_by: str = Form("Admin"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    report = db.query(ValveTestReport).filter(ValveTestReport.id == report_id).first()
+    report = await db.scalar(select(ValveTestReport).filter(ValveTestReport.id == report_id).limit(1))
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
     # Fetch Tank Number for file operations
-    tank_record = db.query(Tank).filter(Tank.id == report.tank_id).first()
+    tank_record = await db.scalar(select(Tank).filter(Tank.id == report.tank_id).limit(1))
     if not tank_record:
         raise HTTPException(status_code=404, detail="Associated Tank not found")
     
     tank_number = tank_record.tank_number
 
     # File Update Logic
-    if inspection_report_file:
+    file_sha256 = None
+    if inspection_report_file or upload_id:
         # 1. Delete old file if exists
         if report.inspection_report_file:
-            delete_file_if_exists(UPLOAD_ROOT, report.inspection_report_file)
+            await run_io(delete_file_if_exists, UPLOAD_ROOT, report.inspection_report_file)
         
         # 2. Save new file
         try:
-            new_file_path = save_uploaded_file(
+            stored = await store_upload(
                 upload_file=inspection_report_file,
+                upload_id=upload_id,
                 tank_number=tank_number,
                 image_type=VALVE_REPORT_TYPE,
                 upload_root=UPLOAD_ROOT
             )
-            report.inspection_report_file = new_file_path
+            report.inspection_report_file = stored.rel_path
+            file_sha256 = stored.sha256
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
@@ -136,13 +177,14 @@ def update_valve_test_report(
     report.updated_by = updated_by
 
     try:
-        db.commit()
-        db.refresh(report)
+        await db.commit()
+        await db.refresh(report)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database update error: {str(e)}")
 
-    return {"message": "Report updated successfully", "data": report}
+    await run_io(ppt_cache.invalidate_tank, report.tank_id)
+    return {"message": "Report updated successfully", "data": report, "sha256": file_sha256}
 
 # --- DELETE ---
 @router.delete("/{report_id}")
@@ -158,4 +200,5 @@ def delete_valve_test_report(report_id: int, db: Session = Depends(get_db)):
 
     db.delete(report)
     db.commit()
+    ppt_cache.invalidate_tank(report.tank_id)
     return {"message": "Report deleted successfully"}
\ No newline at end of file
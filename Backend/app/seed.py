@@ -1,3 +1,4 @@
+import logging
 from sqlalchemy.orm import Session
 
 # --- UPDATED IMPORTS ---
@@ -7,6 +8,8 @@ from sqlalchemy.orm import Session
 from app.models.cargo_master import CargoTankMaster
 from app.models.regulations_master import RegulationsMaster
 
+logger = logging.getLogger(__name__)
+
 def init_seed_data(db: Session):
     """
     Checks if tables are empty and populates them with initial 5 values.
@@ -15,7 +18,7 @@ def init_seed_data(db: Session):
     # --- 1. Seed CargoTankMaster ---
     try:
         if not db.query(CargoTankMaster).first():
-            print("Seeding CargoTankMaster data...")
+            logger.info("Seeding CargoTankMaster data...")
             
             cargo_tanks = [
                 CargoTankMaster(cargo_reference="CT-Alpha-01"),
@@ -27,18 +30,18 @@ def init_seed_data(db: Session):
             
             db.add_all(cargo_tanks)
             db.commit()
-            print("CargoTankMaster seeded successfully.")
+            logger.info("CargoTankMaster seeded successfully")
         else:
-            print("CargoTankMaster data already exists. Skipping.")
+            logger.info("CargoTankMaster data already exists. Skipping")
 
     except Exception as e:
-        print(f"Error seeding CargoTankMaster: {e}")
+        logger.error(f"Error seeding CargoTankMaster: {e}")
         db.rollback()
 
     # --- 2. Seed RegulationsMaster ---
     try:
         if not db.query(RegulationsMaster).first():
-            print("Seeding RegulationsMaster data...")
+            logger.info("Seeding RegulationsMaster data...")
             
             regulations = [
                 RegulationsMaster(regulation_name="API Standard 650"),
@@ -50,10 +53,10 @@ def init_seed_data(db: Session):
             
             db.add_all(regulations)
             db.commit()
-            print("RegulationsMaster seeded successfully.")
+            logger.info("RegulationsMaster seeded successfully")
         else:
-            print("RegulationsMaster data already exists. Skipping.")
+            logger.info("RegulationsMaster data already exists. Skipping")
 
     except Exception as e:
-        print(f"Error seeding RegulationsMaster: {e}")
+        logger.error(f"Error seeding RegulationsMaster: {e}")
         db.rollback()
\ No newline at end of file
@@ -0,0 +1,106 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from app.database import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# The lookup tables are reloaded (all at once, a few dozen rows) when older than this.
+LOOKUP_REFRESH_SECONDS = int(os.getenv("LOOKUP_REFRESH_SECONDS", 300))
+
+# kind -> (table, id column, name column), as defined in sql/backup.sql
+LOOKUP_TABLES = {
+    "inspection_status": ("inspection_status", "status_id", "status_name"),
+    "inspection_type": ("inspection_type", "inspection_type_id", "inspection_type_name"),
+    "location": ("location_master", "location_id", "location_name"),
+    "product": ("product_master", "product_id", "product_name"),
+    "safety_valve_brand": ("safety_valve_brand", "id", "brand_name"),
+    "safety_valve_model": ("safety_valve_model", "id", "model_name"),
+    "safety_valve_size": ("safety_valve_size", "id", "size_label"),
+    "operator": ("operators", "operator_id", "operator_name"),
+    "tank_status": ("tank_status", "status_id", "status_name"),
+}
+
+# tank_inspection_details id column -> (lookup kind, name key added next to it)
+INSPECTION_FIELDS = {
+    "status_id": ("inspection_status", "status_name"),
+    "inspection_type_id": ("inspection_type", "inspection_type_name"),
+    "location_id": ("location", "location_name"),
+    "product_id": ("product", "product_name"),
+    "safety_valve_brand_id": ("safety_valve_brand", "safety_valve_brand_name"),
+    "safety_valve_model_id": ("safety_valve_model", "safety_valve_model_name"),
+    "safety_valve_size_id": ("safety_valve_size", "safety_valve_size_name"),
+    "operator_id": ("operator", "operator_name"),
+}
+
+_tables: Dict[str, Dict[int, str]] = {}
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def _load() -> Dict[str, Dict[int, str]]:
+    # Always a private session: never touch (expire, roll back) a caller's objects
+    db = ReadSessionLocal()
+    tables = {}
+    try:
+        for kind, (table, id_col, name_col) in LOOKUP_TABLES.items():
+            try:
+                rows = db.execute(text(f"SELECT {id_col}, {name_col} FROM {table}")).fetchall()
+                tables[kind] = {r[0]: r[1] for r in rows}
+            except Exception as e:
+                # A missing table only disables its own names
+                logger.warning(f"Lookup table {table} not loaded: {str(e)}")
+                tables[kind] = {}
+    finally:
+        db.close()
+    return tables
+
+
+def get_tables() -> Dict[str, Dict[int, str]]:
+    """
+    All lookup tables as {kind: {id: name}}, loaded once (on a read session of
+    their own) and reloaded after LOOKUP_REFRESH_SECONDS or refresh().
+    """
+    global _tables, _loaded_at
+    if _tables and time.monotonic() - _loaded_at < LOOKUP_REFRESH_SECONDS:
+        return _tables
+
+    with _lock:
+        if _tables and time.monotonic() - _loaded_at < LOOKUP_REFRESH_SECONDS:
+            return _tables
+        tables = _load()
+        # Swapped in one assignment: readers never see a half-loaded state
+        _tables, _loaded_at = tables, time.monotonic()
+        return _tables
+
+
+def refresh() -> None:
+    """Forces a reload on the next lookup, e.g. after a lookup table was edited."""
+    global _loaded_at
+    with _lock:
+        _loaded_at = 0.0
+
+
+def resolve(kind: str, value_id: Optional[int]) -> Optional[str]:
+    if value_id is None:
+        return None
+    return get_tables().get(kind, {}).get(value_id)
+
+
+def resolve_inspection(inspection: dict) -> dict:
+    """
+    Adds the name of every lookup id in a tank_inspection_details row
+    (status_name, location_name, ...), e.g. to TankInspectionDetails.as_dict
+    output before it is returned by a route.
+    """
+    tables = get_tables()
+    for id_field, (kind, name_field) in INSPECTION_FIELDS.items():
+        if id_field in inspection:
+            inspection[name_field] = tables.get(kind, {}).get(inspection[id_field])
+    return inspection
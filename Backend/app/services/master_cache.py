@@ -0,0 +1,216 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.utils.file_serving import etag_matches
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Master data (regulations, cargo references, lookup tables) is read on every
+# form load but changes a few times a year. Entries expire after this many
+# seconds even without an invalidation, which bounds staleness when another
+# worker process made the change and no shared backend is configured.
+MASTER_CACHE_TTL_SECONDS = int(os.getenv("MASTER_CACHE_TTL_SECONDS", 300))
+# Max entries kept by the in-process backend (least recently used evicted first).
+MASTER_CACHE_MAX_ENTRIES = int(os.getenv("MASTER_CACHE_MAX_ENTRIES", 256))
+# Optional Redis-compatible server shared by all workers, e.g. redis://localhost:6379/0.
+# Needs the "redis" package; falls back to the in-process cache without it.
+MASTER_CACHE_REDIS_URL = os.getenv("MASTER_CACHE_REDIS_URL")
+
+KEY_PREFIX = "isotank:master:"
+
+# Cache keys
+REGULATIONS = "regulations"
+REGULATION_NAMES = "regulation_names"
+CARGO = "cargo"
+
+
+class CachedValue(NamedTuple):
+    data: Any  # JSON-compatible payload
+    etag: str
+
+
+def _make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def encode_value(data: Any) -> CachedValue:
+    """JSON-compatible copy of data with its ETag."""
+    data = jsonable_encoder(data)
+    return CachedValue(data=data, etag=_make_etag(json.dumps(data, sort_keys=True).encode()))
+
+
+# ==================== Backends ====================
+
+class LocalBackend:
+    """Per-process TTL + LRU store."""
+    blocking = False
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedValue]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedValue) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+class RedisBackend:
+    """Shared store, so an invalidation in one worker is seen by all of them."""
+    blocking = True
+
+    def __init__(self, url: str, ttl: int):
+        import redis  # Optional dependency
+
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url, socket_timeout=1)
+
+    def get(self, key: str) -> Optional[CachedValue]:
+        raw = self._client.get(KEY_PREFIX + key)
+        if raw is None:
+            return None
+        stored = json.loads(raw)
+        return CachedValue(data=stored["data"], etag=stored["etag"])
+
+    def set(self, key: str, value: CachedValue) -> None:
+        self._client.set(KEY_PREFIX + key, json.dumps(value._asdict()), ex=self.ttl)
+
+    def delete(self, *keys: str) -> None:
+        self._client.delete(*(KEY_PREFIX + key for key in keys))
+
+
+def _build_backend():
+    if MASTER_CACHE_REDIS_URL:
+        try:
+            return RedisBackend(MASTER_CACHE_REDIS_URL, MASTER_CACHE_TTL_SECONDS)
+        except ImportError:
+            logger.warning("MASTER_CACHE_REDIS_URL is set but the redis package is not installed; using the in-process cache")
+    return LocalBackend(MASTER_CACHE_TTL_SECONDS, MASTER_CACHE_MAX_ENTRIES)
+
+
+_backend = _build_backend()
+_load_locks = {}
+# key -> number of invalidations seen by this process. A load that overlaps an
+# invalidation may have read pre-write rows, so its result is not stored.
+_generations = {}
+_generations_lock = threading.Lock()
+
+
+def _generation(key: str) -> int:
+    with _generations_lock:
+        return _generations.get(key, 0)
+
+
+async def _call(func, *args):
+    if _backend.blocking:
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+# ==================== Public API ====================
+
+async def _load(loader: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+    # Always the primary: a lagging replica would re-cache pre-write rows right
+    # after an invalidation. Loads are rare (one per key per TTL).
+    async with async_session() as db:
+        return await loader(db)
+
+
+async def get_or_load(key: str, loader: Callable[[AsyncSession], Awaitable[Any]]) -> CachedValue:
+    """
+    Returns the cached value of key, running loader(db) on a miss with a
+    session on the primary database. Concurrent misses on the same key in
+    this process wait for a single load. A result loaded while the key was
+    invalidated is served but not stored.
+    Backend errors are logged and the loader result is served uncached.
+    """
+    try:
+        cached = await _call(_backend.get, key)
+    except Exception as e:
+        logger.warning(f"Master cache read failed for {key}: {str(e)}")
+        return encode_value(await _load(loader))
+    if cached is not None:
+        return cached
+
+    lock = _load_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        try:
+            cached = await _call(_backend.get, key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return cached
+
+        generation = _generation(key)
+        value = encode_value(await _load(loader))
+        if _generation(key) != generation:
+            return value
+        try:
+            await _call(_backend.set, key, value)
+        except Exception as e:
+            logger.warning(f"Master cache write failed for {key}: {str(e)}")
+        return value
+
+
+def invalidate(*keys: str) -> None:
+    """Drops cached entries. Called by the master routers after writes."""
+    with _generations_lock:
+        for key in keys:
+            _generations[key] = _generations.get(key, 0) + 1
+    try:
+        _backend.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Master cache invalidation failed for {', '.join(keys)}: {str(e)}")
+
+
+def json_response(request: Request, value: CachedValue) -> Response:
+    """JSON response carrying the value's ETag; 304 when the client copy is current."""
+    headers = {
+        "ETag": value.etag,
+        # Clients may keep the list but must revalidate, since writes invalidate it
+        "Cache-Control": "no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, value.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=json.dumps(value.data, ensure_ascii=False, separators=(",", ":")).encode(),
+        media_type="application/json",
+        headers=headers
+    )
@@ -0,0 +1,186 @@
+import os
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.ppt_generator import load_report_data, build_presentation, resolve_path
+from app.utils.metrics import timed_phase
+from app.utils.file_index import forget_file
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION (DYNAMIC PATHS) ---
+# Go up two levels from app/services to get the Project Root (Backend folder)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Generated decks live under <UPLOAD_ROOT>/ppt (default /Backend/uploads/ppt)
+SAVE_DIRECTORY = os.path.join(os.getenv("UPLOAD_ROOT") or os.path.join(BASE_DIR, "uploads"), "ppt")
+
+# Total size of generated decks kept under the PPT save directory.
+PPT_CACHE_MAX_MB = int(os.getenv("PPT_CACHE_MAX_MB", 2048))
+# Decks not used for this many days are removed.
+PPT_CACHE_MAX_AGE_DAYS = int(os.getenv("PPT_CACHE_MAX_AGE_DAYS", 30))
+# Bump when the slide layout changes so previously cached decks are not reused.
+GENERATOR_VERSION = "2"
+
+CACHE_SUBDIR = "cache"
+
+_evict_lock = threading.Lock()
+
+
+def _image_items(data: SimpleNamespace):
+    yield from data.insp_images
+    for c in data.certs:
+        if c.certificate_file: yield {'path': c.certificate_file}
+    for dr in data.drawings:
+        if dr.file_path: yield {'path': dr.file_path}
+    for v in data.valves:
+        if v.inspection_report_file: yield {'path': v.inspection_report_file}
+
+
+def compute_fingerprint(data: SimpleNamespace, base_dir: str) -> str:
+    """
+    Hashes every input of the deck: the prefetched rows (tank, details,
+    regulations, cargos, certificates, drawings, valve reports, latest
+    inspection with its checklist) plus the inode/mtime/size of each embedded
+    file (the inode changes when a path is re-linked to another blob).
+    Any change to those produces a different key.
+    """
+    h = hashlib.sha256()
+    h.update(GENERATOR_VERSION.encode())
+    h.update(repr(data).encode())
+    for item in _image_items(data):
+        real_path = resolve_path(item['path'], data.tank.tank_number, base_dir)
+        try:
+            # The file can be deleted between resolving and stat-ing it
+            st = os.stat(real_path) if real_path else None
+        except OSError:
+            st = None
+            forget_file(real_path)  # Stale index entry
+        if st:
+            h.update(f"{real_path}|{st.st_ino}|{st.st_mtime_ns}|{st.st_size}".encode())
+        else:
+            h.update(f"missing|{item['path']}".encode())
+    return h.hexdigest()
+
+
+def _tank_cache_dir(save_dir: str, tank_id: int) -> str:
+    return os.path.join(save_dir, CACHE_SUBDIR, str(tank_id))
+
+
+def _cache_filename(tank_number: str, fingerprint: str) -> str:
+    return f"Tank_Report_{tank_number}_{fingerprint[:16]}.pptx"
+
+
+def lookup(save_dir: str, tank_id: int, tank_number: str, fingerprint: str) -> Optional[str]:
+    path = os.path.join(_tank_cache_dir(save_dir, tank_id), _cache_filename(tank_number, fingerprint))
+    if not os.path.exists(path):
+        return None
+    # Touch so LRU eviction sees the deck as recently used
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return path
+
+
+def store(save_dir: str, tank_id: int, tank_number: str, fingerprint: str, ppt_buffer: BytesIO) -> str:
+    tank_dir = _tank_cache_dir(save_dir, tank_id)
+    os.makedirs(tank_dir, exist_ok=True)
+    final_path = os.path.join(tank_dir, _cache_filename(tank_number, fingerprint))
+
+    # Unique per call: concurrent renders of one tank each write their own file
+    tmp_path = f"{final_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ppt_buffer.getbuffer())
+    os.replace(tmp_path, final_path)
+
+    # Older fingerprints of the same tank are stale now; other requests'
+    # in-flight .tmp files are left alone
+    for name in os.listdir(tank_dir):
+        if name != os.path.basename(final_path) and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(tank_dir, name))
+            except OSError:
+                pass
+    return final_path
+
+
+def invalidate_tank(tank_id: Optional[int], save_dir: str = SAVE_DIRECTORY) -> None:
+    """Drops every cached deck of a tank. Called by routers after writes."""
+    if tank_id is None:
+        return
+    shutil.rmtree(_tank_cache_dir(save_dir, tank_id), ignore_errors=True)
+
+
+def evict(save_dir: str = SAVE_DIRECTORY, max_mb: int = PPT_CACHE_MAX_MB, max_age_days: int = PPT_CACHE_MAX_AGE_DAYS) -> int:
+    """
+    LRU eviction over every deck under save_dir (cached and timestamped ones):
+    removes decks older than max_age_days, then the least recently used until
+    the total size fits in max_mb. Returns the number of files removed.
+    """
+    if not _evict_lock.acquire(blocking=False):
+        return 0  # Another thread is already evicting
+    try:
+        entries = []
+        for root, _dirs, files in os.walk(save_dir):
+            for name in files:
+                if not name.endswith(".pptx"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+        total = sum(size for _, size, _ in entries)
+        max_bytes = max_mb * 1024 * 1024
+        removed = 0
+        for mtime, size, path in entries:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Failed to evict {path}: {e}")
+        return removed
+    finally:
+        _evict_lock.release()
+
+
+def get_or_create_report(
+    db: Session, tank_id: int, base_dir: str, save_dir: str, timings: Optional[Dict[str, float]] = None
+) -> Tuple[str, str, bool]:
+    """
+    Returns (filename, full_path, cached). Reuses the stored deck when the
+    fingerprint of its inputs is unchanged, otherwise renders and stores it.
+    The seconds spent per phase are added to timings when given.
+    """
+    with timed_phase(timings, "load"):
+        data = load_report_data(db, tank_id)
+    tank_number = data.tank.tank_number
+    with timed_phase(timings, "fingerprint"):
+        fingerprint = compute_fingerprint(data, base_dir)
+
+    cached_path = lookup(save_dir, tank_id, tank_number, fingerprint)
+    if cached_path:
+        return os.path.basename(cached_path), cached_path, True
+
+    with timed_phase(timings, "render"):
+        ppt_buffer = build_presentation(data, base_dir)
+    with timed_phase(timings, "store"):
+        full_path = store(save_dir, tank_id, tank_number, fingerprint, ppt_buffer)
+        evict(save_dir)
+    return os.path.basename(full_path), full_path, False
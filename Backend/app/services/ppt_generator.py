@@ -1,12 +1,15 @@
 import os
 from io import BytesIO
+from collections import defaultdict
 from datetime import datetime, date
+from types import SimpleNamespace
+from typing import Dict, List
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
-from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy import text, bindparam, inspect as sa_inspect
+from sqlalchemy.orm import Session, lazyload
 
 # --- MODEL IMPORTS ---
 from app.models.tank_header import Tank
@@ -19,6 +22,9 @@ from app.models.cargo_master import CargoTankMaster
 from app.models.tank_certificate import TankCertificate
 from app.models.tank_drawings import TankDrawing
 from app.models.valve_test_report import ValveTestReport
+from app.utils.image_derivatives import get_derivative
+from app.utils.file_index import get_index
+from app.services import lookups
 
 # --- CONFIGURATION ---
 THEME_COLOR = RGBColor(0, 51, 102)
@@ -36,47 +42,9 @@ IMAGE_TYPE_MAP = {
 }
 
 def resolve_path(file_path, tank_number, base_dir):
-    if not file_path: return None
-    
-    # Standardize slashes
-    clean_db_path = str(file_path).replace("\\", "/")
-    
-    # Remove 'uploads/' prefix if it exists in the DB string
-    if clean_db_path.startswith("uploads/"):
-        clean_db_path = clean_db_path.replace("uploads/", "", 1)
-        
-    filename_only = os.path.basename(clean_db_path)
-
-    # 1. The uploads folder where the code is currently running
-    current_uploads = os.path.join(base_dir, "uploads")
-
-    # 2. DYNAMIC RELATIVE PATH (No absolute "E:\" string)
-    # This logic says: "Go up 2 levels, look for ISOTank-Mobile (1), then go into Backend/uploads"
-    external_uploads = os.path.abspath(os.path.join(
-        base_dir, 
-        "..", "..",  # Go up to the drive/root folder
-        "ISOTank-Mobile (1)", "Backend", "uploads" # Go down into the other project
-    ))
-    
-    candidates = [
-        # --- CHECK LOCAL FOLDER FIRST ---
-        os.path.join(current_uploads, clean_db_path),
-        os.path.join(current_uploads, "tank_images_mobile", clean_db_path),
-        os.path.join(current_uploads, "tank_images_mobile", tank_number, "originals", filename_only),
-
-        # --- CHECK NEIGHBOR PROJECT FOLDER ---
-        os.path.join(external_uploads, clean_db_path),
-        os.path.join(external_uploads, "tank_images_mobile", clean_db_path),
-        os.path.join(external_uploads, "tank_images_mobile", tank_number, "originals", filename_only),
-        os.path.join(external_uploads, "tank_images_mobile", tank_number, "thumbnails", filename_only),
-        os.path.join(external_uploads, "drawings", tank_number, filename_only),
-        os.path.join(external_uploads, "certificates", tank_number, filename_only)
-    ]
-    
-    for path in candidates:
-        if os.path.exists(path): return path
-        
-    return None
+    # Looks the DB path up in the file-location index (no per-candidate stat calls)
+    return get_index(base_dir).resolve(file_path, tank_number)
+
 def format_value(value, suffix=""):
     if value is None or value == "": return "-"
     if isinstance(value, bool): return "Yes" if value else "No"
@@ -161,7 +129,9 @@ def add_image_sequence(prs, tank_number, image_list, section_title, base_dir):
                 err_box.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
             else:
                 try:
-                    pic = current_slide.shapes.add_picture(path, img_left, img_top, height=max_height)
+                    # Embed the slide-sized rendition, not the full-resolution upload
+                    embed_path = get_derivative(path, "slide") or path
+                    pic = current_slide.shapes.add_picture(embed_path, img_left, img_top, height=max_height)
                     if pic.width > max_width:
                         ratio = max_width / pic.width
                         pic.width = max_width
@@ -179,57 +149,126 @@ def add_image_sequence(prs, tank_number, image_list, section_title, base_dir):
             err_box.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 0, 0)
 
 # ==============================================================================
-# MAIN GENERATOR (Updated signature)
+# DATA LOADING
 # ==============================================================================
-def create_presentation(db: Session, tank_id: int, base_dir: str) -> BytesIO:
-    tank = db.query(Tank).filter(Tank.id == tank_id).first()
-    d = db.query(TankDetails).filter(TankDetails.tank_id == tank_id).first()
-    if not tank or not d: raise ValueError("Tank Details not found")
-
-    regs = db.query(TankRegulation, RegulationsMaster).outerjoin(RegulationsMaster, TankRegulation.regulation_id == RegulationsMaster.id).filter(TankRegulation.tank_id == tank_id).all()
-    cargos = db.query(CargoTankTransaction, CargoTankMaster).join(CargoTankMaster, CargoTankTransaction.cargo_reference == CargoTankMaster.id).filter(CargoTankTransaction.tank_id == tank_id).all()
-    certs = db.query(TankCertificate).filter(TankCertificate.tank_id == tank_id).all()
-    drawings = db.query(TankDrawing).filter(TankDrawing.tank_id == tank_id).all()
-    valves = db.query(ValveTestReport).filter(ValveTestReport.tank_id == tank_id).all()
-    
-    insp_sql = text("SELECT * FROM tank_inspection_details WHERE tank_id = :tid OR tank_number = :tn ORDER BY inspection_date DESC LIMIT 1")
-    insp_row = db.execute(insp_sql, {"tid": tank_id, "tn": tank.tank_number}).mappings().first()
-    insp = dict(insp_row) if insp_row else None
+# Report inputs are copied into plain SimpleNamespace snapshots so they can be
+# pickled to the PPT worker processes and rendered without a DB session.
 
-    checklist_rows = []
-    todo_rows = []
-    insp_images = []
+def snapshot(obj):
+    if obj is None: return None
+    return SimpleNamespace(**{attr.key: getattr(obj, attr.key) for attr in sa_inspect(obj).mapper.column_attrs})
+
+def _group_by(rows, key):
+    grouped = defaultdict(list)
+    for row in rows: grouped[key(row)].append(row)
+    return grouped
+
+def load_report_data_batch(db: Session, tank_ids: List[int]) -> Dict[int, SimpleNamespace]:
+    """
+    Prefetches everything the report needs for many tanks with a fixed number of
+    set-based queries (instead of ~10 queries per tank).
+    Tanks without TankDetails are left out of the result.
+    """
+    if not tank_ids: return {}
+    tank_ids = list(set(tank_ids))
+
+    tanks = {t.id: t for t in db.query(Tank).filter(Tank.id.in_(tank_ids)).all()}
+    details = {d.tank_id: d for d in db.query(TankDetails).filter(TankDetails.tank_id.in_(tank_ids)).all()}
+    tank_ids = [tid for tid in tank_ids if tid in tanks and tid in details]
+    if not tank_ids: return {}
+    number_to_id = {tanks[tid].tank_number: tid for tid in tank_ids}
+
+    regs = _group_by(db.query(TankRegulation, RegulationsMaster).outerjoin(RegulationsMaster, TankRegulation.regulation_id == RegulationsMaster.id).filter(TankRegulation.tank_id.in_(tank_ids)).all(), lambda r: r[0].tank_id)
+    cargos = _group_by(db.query(CargoTankTransaction, CargoTankMaster).join(CargoTankMaster, CargoTankTransaction.cargo_reference == CargoTankMaster.id).filter(CargoTankTransaction.tank_id.in_(tank_ids)).all(), lambda r: r[0].tank_id)
+    certs = _group_by(db.query(TankCertificate).filter(TankCertificate.tank_id.in_(tank_ids)).all(), lambda c: c.tank_id)
+    drawings = _group_by(db.query(TankDrawing).filter(TankDrawing.tank_id.in_(tank_ids)).all(), lambda dr: dr.tank_id)
+    # Snapshots copy columns only, so skip the joined ValveTestReport.tank load
+    valves = _group_by(db.query(ValveTestReport).options(lazyload(ValveTestReport.tank)).filter(ValveTestReport.tank_id.in_(tank_ids)).all(), lambda v: v.tank_id)
+
+    # Latest inspection per tank (matched by tank_id OR tank_number, like the single-tank query)
+    latest_iid = {}
+    insp_keys_sql = text("SELECT inspection_id, tank_id, tank_number FROM tank_inspection_details WHERE tank_id IN :tids OR tank_number IN :tns ORDER BY inspection_date DESC").bindparams(bindparam("tids", expanding=True), bindparam("tns", expanding=True))
+    for r in db.execute(insp_keys_sql, {"tids": tank_ids, "tns": list(number_to_id.keys())}).mappings():
+        for tid in {r['tank_id'], number_to_id.get(r['tank_number'])}:
+            if tid in tanks and tid not in latest_iid: latest_iid[tid] = r['inspection_id']
+
+    inspections = {}
+    checklists, todos, insp_image_rows = defaultdict(list), defaultdict(list), defaultdict(list)
+    iids = list(set(latest_iid.values()))
+    if iids:
+        insp_sql = text("SELECT * FROM tank_inspection_details WHERE inspection_id IN :iids").bindparams(bindparam("iids", expanding=True))
+        # Lookup ids (status, type, location, safety valve...) resolved from the in-memory tables
+        inspections = {r['inspection_id']: lookups.resolve_inspection(dict(r)) for r in db.execute(insp_sql, {"iids": iids}).mappings()}
 
-    if insp:
-        iid = insp['inspection_id']
         try:
-            sql_chk = text("SELECT job_name, sub_job_description, status, comment FROM inspection_checklist WHERE inspection_id = :iid ORDER BY id ASC")
-            checklist_data = db.execute(sql_chk, {"iid": iid}).fetchall()
-            for r in checklist_data: checklist_rows.append([r[0], r[1], r[2] or "-", r[3] or "-"])
+            sql_chk = text("SELECT inspection_id, job_name, sub_job_description, status, comment FROM inspection_checklist WHERE inspection_id IN :iids ORDER BY id ASC").bindparams(bindparam("iids", expanding=True))
+            for r in db.execute(sql_chk, {"iids": iids}).fetchall(): checklists[r[0]].append([r[1], r[2], r[3] or "-", r[4] or "-"])
         except Exception: pass
 
         try:
-            sql_todo = text("SELECT job_name, sub_job_description, status, comment FROM to_do_list WHERE inspection_id = :iid ORDER BY id ASC")
-            todo_data = db.execute(sql_todo, {"iid": iid}).fetchall()
-            for r in todo_data: todo_rows.append([r[0], r[1], r[2] or "Faulty", r[3] or "-"])
+            sql_todo = text("SELECT inspection_id, job_name, sub_job_description, status, comment FROM to_do_list WHERE inspection_id IN :iids ORDER BY id ASC").bindparams(bindparam("iids", expanding=True))
+            for r in db.execute(sql_todo, {"iids": iids}).fetchall(): todos[r[0]].append([r[1], r[2], r[3] or "Faulty", r[4] or "-"])
         except Exception: pass
-            
+
         try:
-            img_sql = text("SELECT image_type, image_path FROM tank_images WHERE inspection_id = :iid ORDER BY id ASC")
-            img_data = db.execute(img_sql, {"iid": iid}).fetchall()
-            for r in img_data:
-                readable_label = IMAGE_TYPE_MAP.get(r[0], str(r[0]).title().replace("_", " "))
-                insp_images.append({'path': r[1], 'label': readable_label})
+            img_sql = text("SELECT inspection_id, image_type, image_path FROM tank_images WHERE inspection_id IN :iids ORDER BY id ASC").bindparams(bindparam("iids", expanding=True))
+            for r in db.execute(img_sql, {"iids": iids}).fetchall():
+                readable_label = IMAGE_TYPE_MAP.get(r[1], str(r[1]).title().replace("_", " "))
+                insp_image_rows[r[0]].append({'path': r[2], 'label': readable_label})
         except Exception: pass
-    
-    if not insp_images:
-        tank_images = db.query(TankImage).filter(TankImage.tank_number == tank.tank_number).all()
-        for img in tank_images:
-             readable_label = IMAGE_TYPE_MAP.get(img.image_type, (img.image_type or "").title())
-             insp_images.append({'path': img.image_path, 'label': readable_label})
 
+    # Fallback to the tank's own uploads for tanks whose inspection has no photos
+    fallback_numbers = [tanks[tid].tank_number for tid in tank_ids if not insp_image_rows.get(latest_iid.get(tid))]
+    fallback_images = defaultdict(list)
+    if fallback_numbers:
+        fallback_sql = db.query(TankImage.tank_number, TankImage.image_type, TankImage.image_path).filter(TankImage.tank_number.in_(fallback_numbers))
+        for img in fallback_sql.all():
+            readable_label = IMAGE_TYPE_MAP.get(img.image_type, (img.image_type or "").title())
+            fallback_images[img.tank_number].append({'path': img.image_path, 'label': readable_label})
+
+    result = {}
+    for tid in tank_ids:
+        tank = tanks[tid]
+        iid = latest_iid.get(tid)
+        result[tid] = SimpleNamespace(
+            tank=snapshot(tank),
+            details=snapshot(details[tid]),
+            regs=[(snapshot(t), snapshot(r)) for t, r in regs.get(tid, [])],
+            cargos=[(snapshot(c), snapshot(m)) for c, m in cargos.get(tid, [])],
+            certs=[snapshot(c) for c in certs.get(tid, [])],
+            drawings=[snapshot(dr) for dr in drawings.get(tid, [])],
+            valves=[snapshot(v) for v in valves.get(tid, [])],
+            inspection=inspections.get(iid),
+            checklist_rows=checklists.get(iid, []),
+            todo_rows=todos.get(iid, []),
+            insp_images=insp_image_rows.get(iid) or fallback_images.get(tank.tank_number, []),
+        )
+    return result
+
+def load_report_data(db: Session, tank_id: int) -> SimpleNamespace:
+    data = load_report_data_batch(db, [tank_id]).get(tank_id)
+    if not data: raise ValueError("Tank Details not found")
+    return data
+
+# ==============================================================================
+# MAIN GENERATOR (Updated signature)
+# ==============================================================================
+def create_presentation(db: Session, tank_id: int, base_dir: str) -> BytesIO:
+    return build_presentation(load_report_data(db, tank_id), base_dir)
+
+def build_presentation(data: SimpleNamespace, base_dir: str) -> BytesIO:
     # --- PPT GENERATION ---
+    # Split in phases that benchmarks/ppt_phases.py times separately
     prs = Presentation()
+    add_summary_slides(prs, data)
+    add_document_slides(prs, data, base_dir)
+    return save_presentation(prs)
+
+def add_summary_slides(prs, data: SimpleNamespace):
+    """Slides 1-3: key/value blocks and tables, no images."""
+    tank, d, insp = data.tank, data.details, data.inspection
+    regs, cargos, certs = data.regs, data.cargos, data.certs
+    checklist_rows, todo_rows = data.checklist_rows, data.todo_rows
 
     # SLIDE 1
     slide1 = prs.slides.add_slide(prs.slide_layouts[5])
@@ -238,7 +277,9 @@ def create_presentation(db: Session, tank_id: int, base_dir: str) -> BytesIO:
     create_kv_block(slide1, "General Identity", gen_data, Inches(0.5), Inches(1.8), Inches(4.2))
 
     if insp:
-        insp_data = [("Report No", insp['report_number']), ("Inspection Date", format_value(insp['inspection_date'])), ("Status", insp['status_id']), ("Type", insp['inspection_type_id']), ("Inspector", insp['created_by']), ("Location", insp['location_id']), ("Safety Valve", f"{insp['safety_valve_brand_id'] or '-'} / {insp['safety_valve_model_id'] or '-'}"), ("Next Due", format_value(insp['pi_next_inspection_date']))]
+        # Names added by lookups.resolve_inspection; the raw id is shown when a name is missing
+        def lookup_name(id_field, name_field): return insp.get(name_field) or insp[id_field]
+        insp_data = [("Report No", insp['report_number']), ("Inspection Date", format_value(insp['inspection_date'])), ("Status", lookup_name('status_id', 'status_name')), ("Type", lookup_name('inspection_type_id', 'inspection_type_name')), ("Inspector", insp['created_by']), ("Location", lookup_name('location_id', 'location_name')), ("Safety Valve", f"{lookup_name('safety_valve_brand_id', 'safety_valve_brand_name') or '-'} / {lookup_name('safety_valve_model_id', 'safety_valve_model_name') or '-'}"), ("Next Due", format_value(insp['pi_next_inspection_date']))]
         create_kv_block(slide1, "Latest Inspection", insp_data, Inches(5.0), Inches(1.8), Inches(4.5))
         if insp['notes']:
             txBox = slide1.shapes.add_textbox(Inches(0.5), Inches(5.5), Inches(9), Inches(1)); txBox.text_frame.paragraphs[0].text = f"Inspector Notes: {insp['notes']}"; txBox.text_frame.paragraphs[0].font.size = Pt(10)
@@ -277,6 +318,11 @@ def create_presentation(db: Session, tank_id: int, base_dir: str) -> BytesIO:
         current_y = create_section_title(slide3, "Inspection Checklist (Preview)", Inches(0.5), current_y)
         create_compact_table(slide3, ["Category", "Check Item", "Status", "Comment"], checklist_rows[:8], Inches(0.5), current_y, Inches(9))
 
+def add_document_slides(prs, data: SimpleNamespace, base_dir: str):
+    """Slides 4+: one slide per photo or document."""
+    tank, certs, drawings, valves = data.tank, data.certs, data.drawings, data.valves
+    insp_images = data.insp_images
+
     # SLIDE 4+: IMAGES (Pass base_dir)
     add_image_sequence(prs, tank.tank_number, insp_images, "Inspection Photos", base_dir)
     
@@ -289,6 +335,7 @@ def create_presentation(db: Session, tank_id: int, base_dir: str) -> BytesIO:
     valve_imgs = [{'path': v.inspection_report_file, 'label': f"Report: {format_value(v.test_date)}"} for v in valves if v.inspection_report_file]
     add_image_sequence(prs, tank.tank_number, valve_imgs, "Valve Test Documents", base_dir)
 
+def save_presentation(prs) -> BytesIO:
     output = BytesIO()
     prs.save(output)
     output.seek(0)
@@ -0,0 +1,339 @@
+import os
+import time
+import uuid
+import shutil
+import zipfile
+import tempfile
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.database import SessionLocal, engine
+# Worker processes may start without the routers imported; TankImage's
+# relationships need the User mapper registered.
+from app.models.user import User  # noqa: F401
+from app.services.ppt_generator import build_presentation, load_report_data_batch
+from app.services.ppt_cache import get_or_create_report
+from app.utils.metrics import timed_phase, observe_ppt_phases
+from app.utils.logging_config import setup_worker_logging
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Number of worker processes rendering decks. Keep this below the number of
+# cores so report bursts cannot starve the CRUD endpoints.
+PPT_WORKERS = int(os.getenv("PPT_WORKERS", 2))
+# Max jobs waiting or running at once. New submissions are rejected beyond this.
+PPT_QUEUE_DEPTH = int(os.getenv("PPT_QUEUE_DEPTH", 20))
+# Finished jobs are forgotten after this many minutes.
+PPT_JOB_TTL_MINUTES = int(os.getenv("PPT_JOB_TTL_MINUTES", 60))
+# Max tanks rendered by one /generate-batch request.
+PPT_BATCH_MAX_TANKS = int(os.getenv("PPT_BATCH_MAX_TANKS", 500))
+# Decks of a batch handed to the process pool at once. Single-deck jobs queue
+# behind at most this many batch decks, however large the batch.
+PPT_BATCH_IN_FLIGHT = int(os.getenv("PPT_BATCH_IN_FLIGHT", PPT_WORKERS))
+
+# Job kinds
+REPORT = "report"
+BATCH = "batch"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobQueueFull(Exception):
+    """Raised when PPT_QUEUE_DEPTH jobs are already pending."""
+
+
+class PPTJob:
+    def __init__(self, tank_id: Optional[int], future, kind: str = REPORT, tank_count: int = 1, not_found: Optional[List[int]] = None):
+        self.id = uuid.uuid4().hex
+        self.tank_id = tank_id
+        self.kind = kind
+        self.tank_count = tank_count
+        # Batch only: requested tank ids that matched no tank
+        self.not_found = not_found or []
+        self.future = future
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def status(self) -> str:
+        if self.future.cancelled():
+            return CANCELLED
+        if self.future.done():
+            return FAILED if self.future.exception() else COMPLETED
+        if self.future.running():
+            return RUNNING
+        return QUEUED
+
+    @property
+    def result(self) -> Optional[dict]:
+        if self.status != COMPLETED:
+            return None
+        return self.future.result()
+
+    @property
+    def error(self) -> Optional[str]:
+        if self.status != FAILED:
+            return None
+        return str(self.future.exception())
+
+    def as_dict(self) -> dict:
+        result = self.result or {}
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "tank_id": self.tank_id,
+            "tank_count": self.tank_count,
+            "not_found": self.not_found,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "filename": result.get("filename"),
+            "rendered": result.get("rendered"),
+            "failed": result.get("failed"),
+            "error": self.error,
+        }
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Runs one batch at a time in the API process; its decks go to _executor
+_batch_runner: Optional[ThreadPoolExecutor] = None
+_jobs: Dict[str, PPTJob] = {}
+# Reentrant: get_executor() is called by code already holding it
+_lock = threading.RLock()
+
+
+def _init_worker():
+    setup_worker_logging()
+    # Connections inherited from the parent process must not be reused here.
+    engine.dispose(close=False)
+
+
+def render_report(tank_id: int, base_dir: str, save_dir: str) -> dict:
+    """
+    Runs inside a worker process: opens its own DB session, renders the deck
+    (or reuses the cached one) under save_dir.
+    """
+    db = SessionLocal()
+    timings = {}
+    try:
+        filename, full_save_path, _cached = get_or_create_report(db, tank_id, base_dir, save_dir, timings)
+        # Metrics live in the API process; it records these when the job completes
+        return {"filename": filename, "file_path": full_save_path, "timings": timings}
+    finally:
+        db.close()
+
+
+def render_prefetched_report(data, base_dir: str, out_dir: str) -> Tuple[str, Dict[str, float]]:
+    """
+    Runs inside a worker process for batch generation: renders a deck from
+    already-prefetched report data (no DB access) and writes it to out_dir.
+    Returns the filename and the seconds spent per phase.
+    """
+    timings = {}
+    with timed_phase(timings, "render"):
+        ppt_buffer = build_presentation(data, base_dir)
+    filename = f"Tank_Report_{data.tank.tank_number}.pptx"
+    with timed_phase(timings, "store"):
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(ppt_buffer.getbuffer())
+    return filename, timings
+
+
+def render_batch(tank_ids: List[int], base_dir: str, out_dir: str) -> dict:
+    """
+    Runs on the batch runner thread: prefetches the report data of every tank
+    with a few set-based queries, renders the decks across the process pool
+    (PPT_BATCH_IN_FLIGHT at a time) and zips them into out_dir.
+    """
+    timings = {}
+    db = SessionLocal()
+    try:
+        with timed_phase(timings, "batch_load"):
+            report_data = load_report_data_batch(db, tank_ids)
+    finally:
+        db.close()
+
+    started = time.perf_counter()
+    # Outside out_dir, where deck cache eviction could remove decks mid-batch
+    work_dir = tempfile.mkdtemp(prefix="ppt_batch_")
+    filenames = []
+    # Tanks without TankDetails cannot be rendered (same as a single deck)
+    errors = [f"tank id {tid}: Tank Details not found" for tid in dict.fromkeys(tank_ids) if tid not in report_data]
+    try:
+        pending = {}
+        queued = iter(report_data.values())
+        while True:
+            for data in queued:
+                future, executor = _submit(render_prefetched_report, data, base_dir, work_dir)
+                pending[future] = (data.tank.tank_number, executor)
+                if len(pending) >= PPT_BATCH_IN_FLIGHT:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                tank_number, executor = pending.pop(future)
+                try:
+                    filename, deck_timings = future.result()
+                    filenames.append(filename)
+                    observe_ppt_phases(deck_timings)
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_executor(executor)
+                    logger.warning(f"Batch deck failed: {e}", extra={"tank_number": tank_number})
+                    errors.append(f"{tank_number}: {e}")
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"Tank_Reports_{timestamp}_{uuid.uuid4().hex[:8]}.zip"
+        zip_path = os.path.join(out_dir, filename)
+        # pptx files are already deflate-compressed, so store them as-is
+        with timed_phase(timings, "batch_zip"), zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as zf:
+            for name in sorted(filenames):
+                zf.write(os.path.join(work_dir, name), arcname=name)
+            if errors:
+                zf.writestr("errors.txt", "\n".join(errors))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "filename": filename,
+        "file_path": zip_path,
+        "rendered": len(filenames),
+        "failed": len(errors),
+        "tanks_per_second": round(len(filenames) / elapsed, 2) if elapsed else 0.0,
+        "timings": timings,
+    }
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=PPT_WORKERS, initializer=_init_worker)
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Drops a pool broken by a dead worker (OOM kill, crash in a native
+    library); the next get_executor() starts a fresh one. Its pending jobs
+    have already failed with BrokenProcessPool.
+    """
+    global _executor
+    with _lock:
+        if _executor is not executor:
+            return  # Already replaced
+        _executor = None
+    logger.error("PPT worker pool is broken; starting a new one for the next job")
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit(fn, *args):
+    """Submits to the process pool, replacing it once if it is broken. Returns (future, executor)."""
+    executor = get_executor()
+    try:
+        return executor.submit(fn, *args), executor
+    except BrokenProcessPool:
+        _discard_executor(executor)
+        executor = get_executor()
+        return executor.submit(fn, *args), executor
+
+
+def _get_batch_runner() -> ThreadPoolExecutor:
+    global _batch_runner
+    if _batch_runner is None:
+        _batch_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ppt-batch")
+    return _batch_runner
+
+
+def _prune_jobs():
+    """Drops finished jobs older than PPT_JOB_TTL_MINUTES. Caller holds _lock."""
+    cutoff = datetime.now() - timedelta(minutes=PPT_JOB_TTL_MINUTES)
+    expired = [jid for jid, job in _jobs.items() if job.finished_at and job.finished_at < cutoff]
+    for jid in expired:
+        job = _jobs.pop(jid)
+        # Batch archives are not part of the deck cache; nothing else removes them
+        if job.kind == BATCH and job.result:
+            try:
+                os.remove(job.result["file_path"])
+            except OSError:
+                pass
+
+
+def _mark_finished(job: PPTJob, executor: Optional[ProcessPoolExecutor] = None):
+    if executor is not None and not job.future.cancelled() and isinstance(job.future.exception(), BrokenProcessPool):
+        _discard_executor(executor)
+    job.finished_at = datetime.now()
+    if job.status == COMPLETED:
+        observe_ppt_phases(job.result.get("timings"))
+
+
+def _check_queue_depth() -> None:
+    """Caller holds _lock."""
+    _prune_jobs()
+    pending = sum(1 for job in _jobs.values() if not job.future.done())
+    if pending >= PPT_QUEUE_DEPTH:
+        raise JobQueueFull(f"{pending} report jobs already pending")
+
+
+def submit_job(tank_id: int, base_dir: str, save_dir: str) -> PPTJob:
+    with _lock:
+        _check_queue_depth()
+        future, executor = _submit(render_report, tank_id, base_dir, save_dir)
+        job = PPTJob(tank_id, future)
+        _jobs[job.id] = job
+    future.add_done_callback(lambda _f: _mark_finished(job, executor))
+    return job
+
+
+def submit_batch(tank_ids: List[int], base_dir: str, out_dir: str, not_found: Optional[List[int]] = None) -> PPTJob:
+    """
+    Queues a fleet batch. It counts as one job against PPT_QUEUE_DEPTH and
+    batches run one at a time, each keeping at most PPT_BATCH_IN_FLIGHT decks
+    in the process pool.
+    """
+    with _lock:
+        _check_queue_depth()
+        future = _get_batch_runner().submit(render_batch, tank_ids, base_dir, out_dir)
+        job = PPTJob(None, future, kind=BATCH, tank_count=len(tank_ids), not_found=not_found)
+        _jobs[job.id] = job
+    future.add_done_callback(lambda _f: _mark_finished(job))
+    return job
+
+
+def get_job(job_id: str) -> Optional[PPTJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    Cancels a queued job. Jobs already running in a worker cannot be
+    interrupted; returns False for those.
+    """
+    job = get_job(job_id)
+    if not job:
+        return False
+    return job.future.cancel()
+
+
+def shutdown():
+    global _executor, _batch_runner
+    with _lock:
+        if _batch_runner is not None:
+            _batch_runner.shutdown(wait=False, cancel_futures=True)
+            _batch_runner = None
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
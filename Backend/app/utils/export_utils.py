@@ -0,0 +1,183 @@
+import csv
+import io
+import tempfile
+from datetime import datetime, date
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.utils import get_column_letter
+
+# Shared export engine for the "export" endpoints (tanks, users).
+# Rows are consumed once from an iterator (typically a server-side cursor via
+# Query.yield_per) and written to a spooled temp file, so memory stays flat
+# regardless of how many rows are exported.
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows kept in memory to size the Excel columns and infer Parquet types.
+# Write-only sheets need column widths before the first row is written.
+SAMPLE_ROWS = 1000
+MAX_COLUMN_WIDTH = 50
+# Exports up to this size stay in memory, larger ones spill to disk.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def _iter_chunks(file_obj) -> Iterator[bytes]:
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _write_xlsx(out, headers: List[str], sample: List[Sequence], rest: Iterator[Sequence], sheet_title: str):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+
+    # Column widths in one pass over the header + sampled rows
+    widths = [len(str(h)) for h in headers]
+    for row in sample:
+        for i, value in enumerate(row):
+            if value:
+                widths[i] = max(widths[i], len(str(value)))
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = min(width + 2, MAX_COLUMN_WIDTH)
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        header_cells.append(cell)
+    ws.row_dimensions[1].height = 25
+    ws.append(header_cells)
+
+    for row in chain(sample, rest):
+        ws.append(list(row))
+
+    wb.save(out)
+
+
+def _write_csv(out, headers: List[str], sample: List[Sequence], rest: Iterator[Sequence]):
+    # utf-8-sig so Excel opens non-ASCII names correctly
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    writer.writerow(headers)
+    for row in chain(sample, rest):
+        writer.writerow(row)
+    text.flush()
+    text.detach()
+
+
+def _arrow_type(values: Iterable[Any]):
+    import pyarrow as pa
+
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            return pa.bool_()
+        if isinstance(value, int):
+            return pa.int64()
+        if isinstance(value, float):
+            return pa.float64()
+        if isinstance(value, datetime):
+            return pa.timestamp("us")
+        if isinstance(value, date):
+            return pa.date32()
+        return pa.string()
+    return pa.string()
+
+
+def _write_parquet(out, headers: List[str], sample: List[Sequence], rest: Iterator[Sequence], batch_size: int = 5000):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Parquet export requires the 'pyarrow' package")
+
+    schema = pa.schema([
+        (header, _arrow_type(row[i] for row in sample)) for i, header in enumerate(headers)
+    ])
+
+    def to_value(value, field_type):
+        if value is not None and pa.types.is_string(field_type) and not isinstance(value, str):
+            return str(value)
+        return value
+
+    with pq.ParquetWriter(out, schema) as writer:
+        rows = chain(sample, rest)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            columns = [
+                pa.array([to_value(row[i], field.type) for row in batch], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def export_rows(
+    headers: List[str],
+    rows: Iterable[Sequence],
+    fmt: str,
+    filename_prefix: str,
+    sheet_title: str = "Sheet1",
+    empty_detail: str = "No data found to export"
+) -> StreamingResponse:
+    """
+    Writes rows as xlsx (openpyxl write-only mode), csv or parquet and returns
+    a StreamingResponse of the file. Raises 404 with empty_detail when there
+    are no rows.
+    """
+    fmt = (fmt or "xlsx").lower()
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{fmt}'. Allowed: {', '.join(EXPORT_MEDIA_TYPES)}")
+
+    rows = iter(rows)
+    sample = list(islice(rows, SAMPLE_ROWS))
+    if not sample:
+        raise HTTPException(status_code=404, detail=empty_detail)
+
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        if fmt == "xlsx":
+            _write_xlsx(out, headers, sample, rows, sheet_title)
+        elif fmt == "csv":
+            _write_csv(out, headers, sample, rows)
+        else:
+            _write_parquet(out, headers, sample, rows)
+    except Exception:
+        out.close()
+        raise
+
+    size = out.seek(0, io.SEEK_END)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{filename_prefix}_{timestamp}.{fmt}"
+
+    return StreamingResponse(
+        _iter_chunks(out),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(size),
+        },
+        background=BackgroundTask(out.close)
+    )
@@ -0,0 +1,277 @@
+"""
+In-memory index of the files under the upload folders.
+
+resolve_path used to probe up to 9 candidate locations with os.path.exists for
+every image of every report. The index is built with one directory scan, kept
+fresh by the upload/delete helpers in upload_utils, and answers lookups with
+set membership instead of stat calls. Hits are not re-checked on disk: a file
+deleted by another process stays indexed until the next rescan
+(FILE_INDEX_TTL_SECONDS) or until a caller that fails to open it calls
+forget_file.
+
+Rebuild / verify from the Backend folder:
+    python -m app.utils.file_index rebuild
+    python -m app.utils.file_index verify
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The index is rescanned when older than this, to pick up files written by
+# other processes (e.g. the mobile backend writing into its own uploads folder).
+FILE_INDEX_TTL_SECONDS = int(os.getenv("FILE_INDEX_TTL_SECONDS", 300))
+
+# Generated / transient content that never backs a DB path
+SKIP_DIRS = {"tmp", "ppt", ".derivatives", "blobs"}
+
+# Where the upload routes store files when moved out of <Backend>/uploads
+UPLOAD_ROOT = os.getenv("UPLOAD_ROOT")
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def local_roots(base_dir: str) -> List[str]:
+    """UPLOAD_ROOT (when set) and the base_dir uploads folder, in priority order."""
+    roots = [os.path.abspath(os.path.join(base_dir, "uploads"))]
+    if UPLOAD_ROOT and _key(UPLOAD_ROOT) != _key(roots[0]):
+        roots.insert(0, os.path.abspath(UPLOAD_ROOT))
+    return roots
+
+
+def upload_roots(base_dir: str) -> Tuple[str, ...]:
+    """(local uploads folders..., neighbouring ISOTank-Mobile uploads folder)"""
+    # "Go up 2 levels, look for ISOTank-Mobile (1), then go into Backend/uploads"
+    external_uploads = os.path.abspath(os.path.join(
+        base_dir, "..", "..", "ISOTank-Mobile (1)", "Backend", "uploads"
+    ))
+    return (*local_roots(base_dir), external_uploads)
+
+
+def candidate_paths(file_path: str, tank_number: str, base_dir: str) -> List[str]:
+    """Locations a DB file path may live in, in priority order."""
+    # Standardize slashes
+    clean_db_path = str(file_path).replace("\\", "/")
+
+    # Remove 'uploads/' prefix if it exists in the DB string
+    if clean_db_path.startswith("uploads/"):
+        clean_db_path = clean_db_path.replace("uploads/", "", 1)
+
+    filename_only = os.path.basename(clean_db_path)
+    tank_number = tank_number or ""
+    external_uploads = upload_roots(base_dir)[-1]
+
+    candidates = []
+    # --- CHECK LOCAL FOLDER(S) FIRST ---
+    for current_uploads in local_roots(base_dir):
+        candidates += [
+            os.path.join(current_uploads, clean_db_path),
+            os.path.join(current_uploads, "tank_images_mobile", clean_db_path),
+            os.path.join(current_uploads, "tank_images_mobile", tank_number, "originals", filename_only),
+        ]
+
+    return candidates + [
+        # --- CHECK NEIGHBOR PROJECT FOLDER ---
+        os.path.join(external_uploads, clean_db_path),
+        os.path.join(external_uploads, "tank_images_mobile", clean_db_path),
+        os.path.join(external_uploads, "tank_images_mobile", tank_number, "originals", filename_only),
+        os.path.join(external_uploads, "tank_images_mobile", tank_number, "thumbnails", filename_only),
+        os.path.join(external_uploads, "drawings", tank_number, filename_only),
+        os.path.join(external_uploads, "certificates", tank_number, filename_only)
+    ]
+
+
+class FileIndex:
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+        self.roots = upload_roots(base_dir)
+        self._files: Dict[str, str] = {}  # normalized key -> real path
+        self._missing: Set[Tuple[str, str]] = set()  # (db path, tank_number) known to be absent
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        # Held by the one thread scanning the disk
+        self._rebuild_lock = threading.Lock()
+
+    def rebuild(self) -> int:
+        """Scans every upload root once. Returns the number of files indexed."""
+        with self._rebuild_lock:
+            return self._scan()
+
+    def _scan(self) -> int:
+        files: Dict[str, str] = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    files.setdefault(_key(path), path)
+        with self._lock:
+            self._files = files
+            self._missing = set()
+            self._built_at = time.monotonic()
+        logger.info(f"File index built: {len(files)} files under {self.roots}")
+        return len(files)
+
+    def _ensure_fresh(self):
+        if time.monotonic() - self._built_at <= FILE_INDEX_TTL_SECONDS:
+            return
+        if not self._built_at:
+            # First use: nothing to answer from yet, wait for a single scan
+            with self._rebuild_lock:
+                if not self._built_at:
+                    self._scan()
+            return
+        # Expired: one background thread rescans while lookups use the old map
+        if self._rebuild_lock.acquire(blocking=False):
+            threading.Thread(target=self._background_rebuild, name="file-index-rebuild", daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self._scan()
+        except Exception as e:
+            logger.warning(f"File index rebuild failed: {e}")
+        finally:
+            self._rebuild_lock.release()
+
+    def add(self, path: str):
+        self._files[_key(path)] = path
+        self._missing.clear()
+
+    def discard(self, path: str):
+        self._files.pop(_key(path), None)
+
+    def files(self) -> List[str]:
+        self._ensure_fresh()
+        return list(self._files.values())
+
+    def resolve(self, file_path: str, tank_number: str) -> Optional[str]:
+        if not file_path:
+            return None
+        self._ensure_fresh()
+
+        candidates = candidate_paths(file_path, tank_number, self.base_dir)
+        for path in candidates:
+            hit = self._files.get(_key(path))
+            if hit:
+                return hit
+
+        # Not indexed: probe the disk once in case another process wrote it
+        # since the last scan, and remember misses until the next rebuild.
+        miss_key = (str(file_path), tank_number)
+        if miss_key in self._missing:
+            return None
+        for path in candidates:
+            if os.path.exists(path):
+                self.add(path)
+                return path
+        self._missing.add(miss_key)
+        return None
+
+
+_indexes: Dict[str, FileIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(base_dir: str) -> FileIndex:
+    key = _key(base_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = FileIndex(base_dir)
+    return index
+
+
+def record_file(path: str):
+    """Called after a file is written so every live index sees it."""
+    for index in list(_indexes.values()):
+        index.add(path)
+
+
+def forget_file(path: str):
+    """Called after a file is deleted."""
+    for index in list(_indexes.values()):
+        index.discard(path)
+
+
+# ==============================================================================
+# CLI: rebuild / verify
+# ==============================================================================
+
+def _db_file_references(db) -> List[Tuple[str, str, str]]:
+    """(source, tank_number, file path) for every file referenced in the DB."""
+    from app.models.tank_header import Tank
+    from app.models.tank_images import TankImage
+    from app.models.tank_certificate import TankCertificate
+    from app.models.tank_drawings import TankDrawing
+    from app.models.valve_test_report import ValveTestReport
+    from app.models.user import User  # noqa: F401 (registers TankImage.user)
+
+    refs = []
+    for tank_number, path in db.query(TankImage.tank_number, TankImage.image_path).all():
+        refs.append(("tank_images", tank_number, path))
+    for tank_number, path in db.query(TankCertificate.tank_number, TankCertificate.certificate_file).filter(TankCertificate.certificate_file.isnot(None)).all():
+        refs.append(("tank_certificate", tank_number, path))
+    for tank_number, path in db.query(Tank.tank_number, TankDrawing.file_path).join(Tank, Tank.id == TankDrawing.tank_id).all():
+        refs.append(("tank_drawings", tank_number, path))
+    for tank_number, path in db.query(Tank.tank_number, ValveTestReport.inspection_report_file).join(Tank, Tank.id == ValveTestReport.tank_id).filter(ValveTestReport.inspection_report_file.isnot(None)).all():
+        refs.append(("valve_test_report", tank_number, path))
+    return refs
+
+
+def verify(base_dir: str, db) -> Tuple[List[Tuple[str, str, str]], List[str]]:
+    """Returns (missing DB references, orphaned files on disk)."""
+    index = get_index(base_dir)
+    index.rebuild()
+
+    missing = []
+    referenced = set()
+    for source, tank_number, path in _db_file_references(db):
+        real_path = index.resolve(path, tank_number)
+        if real_path:
+            referenced.add(_key(real_path))
+        else:
+            missing.append((source, tank_number, path))
+
+    orphaned = sorted(p for p in index.files() if _key(p) not in referenced)
+    return missing, orphaned
+
+
+def main(argv: List[str]) -> int:
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    command = argv[1] if len(argv) > 1 else "verify"
+
+    if command == "rebuild":
+        count = get_index(base_dir).rebuild()
+        print(f"Indexed {count} files under: {', '.join(upload_roots(base_dir))}")
+        return 0
+
+    if command == "verify":
+        from app.database import SessionLocal
+        db = SessionLocal()
+        try:
+            missing, orphaned = verify(base_dir, db)
+        finally:
+            db.close()
+
+        print(f"Missing files ({len(missing)}): referenced in DB but not found on disk")
+        for source, tank_number, path in missing:
+            print(f"  [{source}] {tank_number}: {path}")
+        print(f"Orphaned files ({len(orphaned)}): on disk but not referenced in DB")
+        for path in orphaned:
+            print(f"  {path}")
+        return 1 if missing else 0
+
+    print(f"Unknown command '{command}'. Use: rebuild | verify")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,110 @@
+"""
+Serving of stored uploads (tank images, certificates, drawings, valve reports).
+
+serve_file adds conditional GET on top of Starlette's FileResponse:
+- strong ETag + Last-Modified on every response,
+- If-None-Match / If-Modified-Since answered with 304 and no body,
+- Range / If-Range (partial content for PDF viewers) and zero-copy sendfile
+  through the ASGI "http.response.pathsend" extension where the server
+  supports it, both handled by FileResponse itself.
+"""
+import os
+import hashlib
+import mimetypes
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response
+
+from app.utils.file_index import get_index, forget_file
+
+# Backend folder (root of the file index)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Documents are revalidated with their ETag after this many seconds
+DOCUMENT_CACHE_MAX_AGE = int(os.getenv("DOCUMENT_CACHE_MAX_AGE", 300))
+
+
+def resolve_upload_path(upload_root: str, rel_path: Optional[str], tank_number: Optional[str]) -> Optional[str]:
+    """Full path of a stored file; falls back to the file index for mobile-app paths."""
+    if not rel_path:
+        return None
+    direct = os.path.join(upload_root, rel_path)
+    if os.path.isfile(direct):
+        return direct
+    return get_index(BASE_DIR).resolve(rel_path, tank_number)
+
+
+def strong_etag(path: str, st: os.stat_result) -> str:
+    # The inode changes whenever a path is replaced (new file or a link to another
+    # blob), even when the new content carries an older mtime
+    return '"' + hashlib.sha1(f"{path}|{st.st_ino}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest() + '"'
+
+
+def last_modified(st: os.stat_result) -> float:
+    # A deduplicated upload is a hard link to an existing blob and keeps the
+    # blob's (older) mtime; linking it updates ctime, so use the later of both
+    return max(st.st_mtime, st.st_ctime)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110 13.1.3)
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified(st)) <= since
+    return False
+
+
+async def serve_file(
+    request: Request,
+    path: str,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None,
+    download: bool = False,
+    max_age: int = DOCUMENT_CACHE_MAX_AGE
+) -> Response:
+    """
+    Returns path as a FileResponse, or a 304 when the client copy is current.
+    filename sets Content-Disposition (inline unless download=True).
+    """
+    try:
+        st = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        forget_file(path)  # May have come from a stale file index entry
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File missing on disk")
+
+    etag = strong_etag(path, st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified(st), usegmt=True),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    if is_not_modified(request, etag, st):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        path,
+        media_type=media_type or mimetypes.guess_type(path)[0] or "application/octet-stream",
+        headers=headers,
+        filename=filename,
+        stat_result=st,
+        content_disposition_type="attachment" if download else "inline"
+    )
@@ -0,0 +1,141 @@
+import os
+import re
+import uuid
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Derivatives are cached next to the original, in a hidden sub-folder:
+#   upload_root/image_type/tank_number/.derivatives/<name>_<preset>_<version>.<ext>
+# <version> identifies the original (inode, size, mtime). mtime alone is not
+# enough: a deduplicated upload is a hard link to an existing blob, so the
+# replaced path can take an older mtime than its previous content had.
+DERIVATIVE_DIR = ".derivatives"
+
+# Renditions by name. max_px bounds the longest edge.
+# "slide" fits a 9in x 5in picture area at ~180 DPI.
+# "thumb" / "medium" are served to the frontend gallery and image viewer.
+PRESETS: Dict[str, dict] = {
+    "slide": {"max_px": 1600, "format": "JPEG", "quality": 80},
+    "thumb": {"max_px": 320, "format": "JPEG", "quality": 75},
+    "medium": {"max_px": 1024, "format": "JPEG", "quality": 80},
+}
+
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp", "PNG": ".png"}
+FORMAT_MEDIA_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".gif", ".webp"}
+
+
+def is_raster_image(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in RASTER_EXTENSIONS
+
+
+def source_version(st: os.stat_result) -> str:
+    """Short key of a file's identity; changes whenever the path points at other content."""
+    return hashlib.sha1(f"{st.st_ino}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def derivative_path(src_path: str, preset: str, fmt: Optional[str] = None, version: Optional[str] = None) -> str:
+    """Location of the cached rendition of src_path for a preset."""
+    fmt = (fmt or PRESETS[preset]["format"]).upper()
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    version = version or source_version(os.stat(src_path))
+    return os.path.join(
+        os.path.dirname(src_path), DERIVATIVE_DIR, f"{stem}_{preset}_{version}{FORMAT_EXTENSIONS[fmt]}"
+    )
+
+
+def _rendition_re(src_path: str) -> re.Pattern:
+    stem = re.escape(os.path.splitext(os.path.basename(src_path))[0])
+    presets = "|".join(map(re.escape, PRESETS))
+    extensions = "|".join(re.escape(ext) for ext in FORMAT_EXTENSIONS.values())
+    return re.compile(rf"^{stem}_({presets})_[0-9a-f]{{12}}({extensions})$")
+
+
+def _render(src_path: str, dest_path: str, preset: str, fmt: str) -> None:
+    settings = PRESETS[preset]
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+
+    with Image.open(src_path) as img:
+        # Phone photos carry their rotation in EXIF; bake it in before resizing
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((settings["max_px"], settings["max_px"]), Image.LANCZOS)
+        if fmt == "JPEG" and img.mode != "RGB":
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            else:
+                img = img.convert("RGB")
+        img.save(tmp_path, format=fmt, quality=settings.get("quality", 85), optimize=True)
+
+    os.replace(tmp_path, dest_path)
+
+
+def get_derivative(src_path: str, preset: str = "slide", fmt: Optional[str] = None) -> Optional[str]:
+    """
+    Returns the path of a cached rendition of src_path, creating it on first use
+    (or when src_path now points at different content).
+    Returns None when src_path is not a raster image or cannot be converted,
+    so callers can fall back to the original.
+    """
+    if not src_path or not is_raster_image(src_path):
+        return None
+    fmt = (fmt or PRESETS[preset]["format"]).upper()
+
+    try:
+        dest_path = derivative_path(src_path, preset, fmt)
+        if os.path.exists(dest_path):
+            return dest_path
+        _render(src_path, dest_path, preset, fmt)
+        _remove_renditions(src_path, keep=dest_path, preset=preset, ext=FORMAT_EXTENSIONS[fmt])
+        return dest_path
+    except Exception as e:
+        logger.warning(f"Could not create '{preset}' derivative for {src_path}: {e}")
+        return None
+
+
+def _remove_renditions(src_path: str, keep: Optional[str] = None, preset: Optional[str] = None, ext: Optional[str] = None) -> int:
+    deriv_dir = os.path.join(os.path.dirname(src_path), DERIVATIVE_DIR)
+    try:
+        names = os.listdir(deriv_dir)
+    except FileNotFoundError:
+        return 0
+
+    pattern = _rendition_re(src_path)
+    removed = 0
+    for name in names:
+        match = pattern.match(name)
+        if not match or (preset and match.group(1) != preset) or (ext and match.group(2) != ext):
+            continue
+        path = os.path.join(deriv_dir, name)
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def remove_derivatives(src_path: str) -> int:
+    """Deletes every cached rendition of src_path. Returns the number removed."""
+    deriv_dir = os.path.join(os.path.dirname(src_path), DERIVATIVE_DIR)
+    if not os.path.isdir(deriv_dir):
+        return 0
+
+    removed = _remove_renditions(src_path)
+    if not os.listdir(deriv_dir):
+        try:
+            os.rmdir(deriv_dir)
+        except OSError:
+            pass
+    return removed
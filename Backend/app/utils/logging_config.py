@@ -0,0 +1,187 @@
+"""
+Application logging: one line per record, written by a background thread.
+
+Records are put on an in-memory queue by a QueueHandler and formatted and
+written to stderr by a QueueListener thread, so a request never waits on the
+stream lock. Every record carries the id of the request that produced it
+(request_id, "-" outside requests), taken from the X-Request-ID header or
+generated by RequestIdMiddleware and echoed back in the response.
+
+Configured from .env:
+  LOG_LEVEL   root level (default INFO)
+  LOG_LEVELS  per-logger levels, e.g. app.utils.upload_utils=DEBUG,sqlalchemy.engine=INFO
+  LOG_FORMAT  json (default) or text
+"""
+import os
+import json
+import uuid
+import queue
+import atexit
+import logging
+import datetime
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# --- CONFIGURATION ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Standard LogRecord attributes; anything else was passed with extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+_listener: Optional[QueueListener] = None
+
+
+def current_request_id() -> str:
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps the current request id on the record while still in the request's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class formats the whole record here, in the caller's thread;
+        # only render args and tracebacks (they may not survive the hand-off)
+        # and leave formatting to the listener thread
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'a.b=DEBUG, c=WARNING' -> {'a.b': 'DEBUG', 'c': 'WARNING'}"""
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _stream_handler() -> logging.StreamHandler:
+    stream = logging.StreamHandler()
+    if LOG_FORMAT == "text":
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    else:
+        stream.setFormatter(JsonFormatter())
+    return stream
+
+
+def _set_root_handler(handler: logging.Handler) -> None:
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def setup_logging() -> None:
+    """Routes all logging through the background writer. Safe to call more than once."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = _stream_handler()
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    _set_root_handler(handler)
+
+    # Let uvicorn's loggers flow through the same queue and format
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def setup_worker_logging() -> None:
+    """
+    Logging for worker processes (PPT rendering). A forked worker inherits the
+    queue handler but not the listener thread draining it, so its records
+    would be lost; write them to stderr directly, in the same format.
+    """
+    global _listener
+    _listener = None  # the parent's thread does not exist in this process
+    stream = _stream_handler()
+    stream.addFilter(RequestIdFilter())
+    _set_root_handler(stream)
+
+
+def shutdown_logging() -> None:
+    """Writes out queued records and stops the background thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# ==================== Middleware ====================
+
+class RequestIdMiddleware:
+    """Binds a request id to the request's context and returns it in X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_id.reset(token)
@@ -0,0 +1,197 @@
+"""
+Prometheus metrics for the API, exposed on GET /metrics.
+
+- http_request_duration_seconds / http_requests_in_progress: per route
+  (the route template, e.g. /api/tanks/{tank_id}, never the raw path)
+- http_request_db_queries / http_request_db_seconds: statements executed per
+  request and time spent in them, counted by SQLAlchemy engine events (sync
+  and async engines alike)
+- upload_bytes_total / upload_throughput_bytes_per_second: file uploads
+- ppt_generation_phase_seconds: report generation split into phases
+  (load, fingerprint, render, store, ...); decks rendered in the PPT worker
+  processes report their timings back with the job result
+
+prometheus_client is optional: without it every metric is a no-op and
+/metrics answers 503.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, *args): pass
+    def inc(self, *args): pass
+    def dec(self, *args): pass
+
+
+def _metric(cls_name: str, *args, **kwargs):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return {"Counter": Counter, "Gauge": Gauge, "Histogram": Histogram}[cls_name](*args, **kwargs)
+
+
+# --- METRICS ---
+REQUEST_LATENCY = _metric(
+    "Histogram", "http_request_duration_seconds", "Request latency",
+    ["method", "route", "status_code"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+REQUESTS_IN_PROGRESS = _metric(
+    "Gauge", "http_requests_in_progress", "Requests being served", ["method"]
+)
+REQUEST_DB_QUERIES = _metric(
+    "Histogram", "http_request_db_queries", "SQL statements executed per request",
+    ["method", "route"], buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_DB_SECONDS = _metric(
+    "Histogram", "http_request_db_seconds", "Time spent in SQL statements per request",
+    ["method", "route"], buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+UPLOAD_BYTES = _metric(
+    "Counter", "upload_bytes_total", "Bytes written by file uploads", ["kind"]
+)
+UPLOAD_THROUGHPUT = _metric(
+    "Histogram", "upload_throughput_bytes_per_second", "Per-upload write throughput", ["kind"],
+    buckets=(64e3, 256e3, 1e6, 4e6, 16e6, 64e6, 256e6)
+)
+PPT_PHASE_SECONDS = _metric(
+    "Histogram", "ppt_generation_phase_seconds", "PPT report generation time per phase", ["phase"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+)
+
+# Requests that did not match any route share one label value
+UNMATCHED_ROUTE = "unmatched"
+
+
+# ==================== Per-request DB statistics ====================
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Mutable holder, so statements run in the threadpool (sync routes) or in
+# SQLAlchemy's greenlets (async routes) add to the request that started them
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute is skipped for failed statements
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+# ==================== Middleware ====================
+
+def route_template(scope) -> str:
+    """Path template of the matched route (set by the router), with the router prefix."""
+    # Newer FastAPI keeps the router-relative route in scope["route"] and the
+    # prefixed path in its effective route context
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            _request_stats.reset(token)
+
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+
+def metrics_endpoint(request: Request) -> Response:
+    if not PROMETHEUS_AVAILABLE:
+        return Response("prometheus_client is not installed", status_code=503, media_type="text/plain")
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# ==================== Uploads / PPT ====================
+
+def observe_upload(kind: str, size: int, seconds: float) -> None:
+    UPLOAD_BYTES.labels(kind).inc(size)
+    if size and seconds > 0:
+        UPLOAD_THROUGHPUT.labels(kind).observe(size / seconds)
+
+
+@contextmanager
+def timed_phase(timings: Optional[Dict[str, float]], phase: str):
+    """Adds the duration of the block to timings[phase] (no-op when timings is None)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - started
+
+
+def observe_ppt_phases(timings: Optional[Dict[str, float]]) -> None:
+    for phase, seconds in (timings or {}).items():
+        PPT_PHASE_SECONDS.labels(phase).observe(seconds)
@@ -0,0 +1,213 @@
+"""
+Per-request SQL profiler and N+1 detector.
+
+When enabled, every statement a request executes is recorded (SQL, duration,
+rows) through SQLAlchemy cursor events, for the sync and async engines alike.
+At the end of the request:
+- statements sharing one shape (the SQL with literals and IN lists folded)
+  QUERY_PROFILER_N_PLUS_ONE times or more are reported as N+1 candidates
+  in a warning log line
+- the response carries a Server-Timing header (db time and statement count,
+  shown in the browser dev tools next to the request)
+- the profile is kept in a small ring buffer served by GET /api/admin/query-profiles
+  (slowest requests and N+1 findings)
+
+Configured from .env:
+  QUERY_PROFILER               off (default) | on (every request)
+                               | header (only requests sending X-Profile-Queries: 1)
+  QUERY_PROFILER_N_PLUS_ONE    repetitions of one shape flagged as N+1 (default 5)
+  QUERY_PROFILER_KEEP          profiles kept for the admin endpoint (default 200)
+"""
+import os
+import re
+import time
+import logging
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.logging_config import current_request_id
+from app.utils.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+QUERY_PROFILER = os.getenv("QUERY_PROFILER", "off").lower()
+QUERY_PROFILER_N_PLUS_ONE = int(os.getenv("QUERY_PROFILER_N_PLUS_ONE", 5))
+QUERY_PROFILER_KEEP = int(os.getenv("QUERY_PROFILER_KEEP", 200))
+
+PROFILE_HEADER = b"x-profile-queries"
+# Statements kept per request; later ones are still counted and timed
+MAX_STATEMENTS = 500
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*[^()]*\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with literals replaced and IN lists folded, so repeated lookups compare equal."""
+    shape = _LITERAL_RE.sub("?", statement)
+    shape = _IN_LIST_RE.sub("IN (...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.route = None
+        self.request_id = None
+        self.status_code = None
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.statements: List[dict] = []
+        self.count = 0
+        self.db_seconds = 0.0
+
+    def record(self, statement: str, seconds: float, rows: Optional[int]) -> None:
+        self.count += 1
+        self.db_seconds += seconds
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append({"sql": statement, "ms": round(seconds * 1000, 3), "rows": rows})
+
+    def repeated_shapes(self, threshold: int) -> List[dict]:
+        shapes = Counter(statement_shape(s["sql"]) for s in self.statements)
+        return [
+            {"shape": shape, "count": count}
+            for shape, count in shapes.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_seconds * 1000:.1f};desc="{self.count} queries"'
+
+    def as_dict(self, threshold: int) -> dict:
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration * 1000, 3),
+            "queries": self.count,
+            "db_ms": round(self.db_seconds * 1000, 3),
+            "n_plus_one": self.repeated_shapes(threshold),
+            "statements": self.statements,
+        }
+
+
+_profile: ContextVar[Optional[RequestProfile]] = ContextVar("query_profile", default=None)
+_recent = deque(maxlen=QUERY_PROFILER_KEEP)
+_recent_lock = threading.Lock()
+
+
+# ==================== Engine events ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile.get() is not None:
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is None or not conn.info.get("profiler_start"):
+        return
+    seconds = time.perf_counter() - conn.info["profiler_start"].pop()
+    rowcount = getattr(cursor, "rowcount", -1)
+    profile.record(statement, seconds, rowcount if rowcount is not None and rowcount >= 0 else None)
+
+
+def _handle_error(context):
+    if context.connection is not None and context.connection.info.get("profiler_start"):
+        context.connection.info["profiler_start"].pop()
+
+
+_installed = False
+
+
+def install() -> None:
+    """Registers the engine events; called at startup only when the profiler is enabled."""
+    global _installed
+    if _installed:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _installed = True
+
+
+def enabled() -> bool:
+    return QUERY_PROFILER in ("on", "header")
+
+
+def recent_profiles(limit: int = 20, n_plus_one_only: bool = False) -> List[dict]:
+    """Slowest recent profiles first."""
+    with _recent_lock:
+        profiles = list(_recent)
+    results = [p.as_dict(QUERY_PROFILER_N_PLUS_ONE) for p in profiles]
+    if n_plus_one_only:
+        results = [r for r in results if r["n_plus_one"]]
+    results.sort(key=lambda r: r["db_ms"], reverse=True)
+    return results[:limit]
+
+
+def _finish(profile: RequestProfile) -> None:
+    repeated = profile.repeated_shapes(QUERY_PROFILER_N_PLUS_ONE)
+    for item in repeated:
+        logger.warning(
+            f"Possible N+1: {item['count']} x {item['shape'][:200]}",
+            extra={"route": profile.route, "method": profile.method, "repeated": item["count"]}
+        )
+    logger.debug(
+        f"{profile.method} {profile.route}: {profile.count} queries, {profile.db_seconds * 1000:.1f} ms in DB",
+        extra={"queries": profile.count, "db_ms": round(profile.db_seconds * 1000, 3)}
+    )
+    with _recent_lock:
+        _recent.append(profile)
+
+
+# ==================== Middleware ====================
+
+class QueryProfilerMiddleware:
+    """Profiles requests per QUERY_PROFILER and adds the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        profile.request_id = current_request_id()
+        token = _profile.set(profile)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                app_ms = (time.perf_counter() - profile.started) * 1000
+                timing = f'{profile.server_timing()}, app;dur={app_ms:.1f}'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _profile.reset(token)
+            profile.duration = time.perf_counter() - profile.started
+            profile.route = route_template(scope)
+            _finish(profile)
+
+    @staticmethod
+    def _wanted(scope) -> bool:
+        if QUERY_PROFILER == "on":
+            return True
+        if QUERY_PROFILER == "header":
+            return any(name == PROFILE_HEADER and value in (b"1", b"true") for name, value in scope["headers"])
+        return False
@@ -1,11 +1,21 @@
 import os
+import re
+import json
+import time
 import shutil
+import asyncio
+import hashlib
 import logging
 import uuid
-from typing import Tuple, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Dict, Optional, NamedTuple
 from datetime import datetime, timedelta
 from fastapi import UploadFile, HTTPException, status
 
+from app.utils.image_derivatives import remove_derivatives
+from app.utils.file_index import record_file, forget_file
+from app.utils.metrics import observe_upload
+
 logger = logging.getLogger(__name__)
 
 # Image type definitions
@@ -50,23 +60,27 @@ def validate_image_type(image_type: str) -> str:
 
 def validate_file_content_type(file: UploadFile) -> None:
     """Validate file content type and basic file validation."""
-    if not file.content_type:
+    validate_content_type(file.content_type)
+
+
+def validate_content_type(content_type: Optional[str]) -> None:
+    if not content_type:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File content type not provided"
         )
     
     # Optional: Allow PDF if you are doing certificates/reports
-    if not (file.content_type.startswith("image/") or file.content_type == "application/pdf"):
+    if not (content_type.startswith("image/") or content_type == "application/pdf"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Got: {file.content_type}"
+            detail=f"Invalid file type. Got: {content_type}"
         )
     
-    if file.content_type not in ALLOWED_MIME_TYPES:
+    if content_type not in ALLOWED_MIME_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type '{file.content_type}' not supported. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
+            detail=f"File type '{content_type}' not supported. Allowed: {', '.join(ALLOWED_MIME_TYPES)}"
         )
 
 
@@ -86,99 +100,483 @@ def get_file_extension(filename: str) -> str:
     return ext
 
 
-def save_uploaded_file(
+# ==================== Write path ====================
+# The only way uploads reach disk (through the blob store): request chunks are awaited from UploadFile,
+# disk writes run on a small dedicated thread pool (so slow uploads never hold
+# the anyio worker threads), and the file is fsynced before the atomic rename.
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_IO_WORKERS = int(os.getenv("UPLOAD_IO_WORKERS", 4))
+
+_io_pool = ThreadPoolExecutor(max_workers=UPLOAD_IO_WORKERS, thread_name_prefix="upload-io")
+
+
+class StoredUpload(NamedTuple):
+    rel_path: str  # path stored in the DB, relative to upload_root
+    size: int
+    original_filename: Optional[str] = None
+    sha256: Optional[str] = None
+
+
+async def run_io(func, *args):
+    """Runs blocking disk work on the upload I/O pool, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_io_pool, func, *args)
+
+
+def _make_dirs(*paths: str) -> None:
+    for path in paths:
+        os.makedirs(path, exist_ok=True)
+
+
+def _fsync_dir(path: str) -> None:
+    # Persists the rename itself; not supported on Windows
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# --- Content-addressed blob store ---
+# Every stored file is a hard link to upload_root/blobs/<aa>/<sha256>, so
+# identical content (e.g. one class certificate attached to many tanks) is kept
+# once on disk. The inode link count is the refcount: the blob itself plus one
+# per path referencing it. A blob left with only its own link is removed when
+# its last path is replaced or deleted; gc_blobs (run by the periodic upload
+# cleanup) collects any that slip through, e.g. after a crash.
+BLOB_DIR = "blobs"
+
+
+def blob_path(upload_root: str, digest: str) -> str:
+    return os.path.join(upload_root, BLOB_DIR, digest[:2], digest)
+
+
+def _place_file(src_path: str, final_path: str, upload_root: str, digest: Optional[str]) -> None:
+    """
+    Moves src_path (under upload_root/tmp) to final_path, sharing the blob of
+    its digest when one exists. Each step is a same-filesystem link or rename,
+    so final_path switches atomically from the old content to the new.
+    Cached renditions of a replaced file are dropped.
+    """
+    replacing = os.path.exists(final_path)
+    replaced_digest = _sole_blob_digest(final_path) if replacing else None
+    _link_or_move(src_path, final_path, upload_root, digest)
+    if replacing:
+        remove_derivatives(final_path)
+    if replaced_digest:
+        _release_blob(upload_root, replaced_digest)
+
+
+def _sole_blob_digest(path: str) -> Optional[str]:
+    """
+    SHA-256 of path when its only other link is its blob, i.e. when removing
+    or replacing path leaves the blob unreferenced; otherwise None (shared
+    with other paths, or stored outside the blob store).
+    """
+    try:
+        if os.stat(path).st_nlink != 2:
+            return None
+        return _sha256_file(path)
+    except OSError:
+        return None
+
+
+def _link_or_move(src_path: str, final_path: str, upload_root: str, digest: Optional[str]) -> None:
+    if digest:
+        blob = blob_path(upload_root, digest)
+        link_tmp = f"{final_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                # First copy of this content becomes the blob
+                os.link(src_path, blob)
+            except FileExistsError:
+                pass
+            os.link(blob, link_tmp)
+            os.replace(link_tmp, final_path)
+            os.remove(src_path)
+            _fsync_dir(os.path.dirname(final_path))
+            return
+        except OSError as e:
+            # Hard links not supported by this filesystem: keep a private copy
+            logger.warning(f"Blob store unavailable, storing {final_path} without deduplication: {str(e)}")
+        finally:
+            # rename() is a no-op when final_path is already a link to the same blob
+            if os.path.exists(link_tmp):
+                os.remove(link_tmp)
+
+    # tmp/ lives under upload_root, so this is a same-filesystem atomic rename
+    os.replace(src_path, final_path)
+    _fsync_dir(os.path.dirname(final_path))
+
+
+def _release_blob(upload_root: str, digest: str) -> None:
+    blob = blob_path(upload_root, digest)
+    try:
+        if os.stat(blob).st_nlink <= 1:
+            os.remove(blob)
+    except FileNotFoundError:
+        pass
+
+
+def gc_blobs(upload_root: str) -> int:
+    """Removes blobs no stored path links to any more (e.g. after a file was replaced)."""
+    root = os.path.join(upload_root, BLOB_DIR)
+    if not os.path.isdir(root):
+        return 0
+    removed = 0
+    for dirpath, _dirs, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.stat(path).st_nlink <= 1:
+                    os.remove(path)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Failed to remove blob {name}: {str(e)}")
+    return removed
+
+
+def _write_chunk_hashed(dest, hasher, chunk: bytes) -> None:
+    hasher.update(chunk)
+    dest.write(chunk)
+
+
+def _commit_file(dest, tmp_path: str, final_path: str, upload_root: str, digest: str) -> None:
+    dest.flush()
+    os.fsync(dest.fileno())
+    dest.close()
+    os.chmod(tmp_path, 0o644)
+    _place_file(tmp_path, final_path, upload_root, digest)
+
+
+def _discard_file(dest, tmp_path: str) -> None:
+    try:
+        dest.close()
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+async def save_uploaded_file_async(
     upload_file: UploadFile,
     tank_number: str,
     image_type: str,
     upload_root: str,
     max_size: int = MAX_UPLOAD_SIZE
-) -> str:
+) -> StoredUpload:
     """
     Save uploaded file with structure: upload_root/image_type/tank_number/tank_number_image_type.ext
+    The file is hashed while written and stored through the blob store.
     """
-    # --- START DEBUG BLOCK ---
-    print("\n" + "="*30)
-    print(f"DEBUG CHECK:")
-    print(f"1. Function Called")
-    print(f"2. Tank Number Received: '{tank_number}'")
-    print(f"3. Image Type Received: '{image_type}'")
-    print(f"4. Upload Root: '{upload_root}'")
-    # --- END DEBUG BLOCK ---
+    validate_file_content_type(upload_file)
+    ext = get_file_extension(upload_file.filename)
+    started = time.perf_counter()
+
+    # Reject before writing anything when the size is already known
+    if upload_file.size is not None and upload_file.size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds limit of {max_size // (1024 * 1024)} MB"
+        )
+
+    tmp_dir = os.path.join(upload_root, "tmp")
+    final_dir = os.path.join(upload_root, image_type, tank_number)
+    final_name = f"{tank_number}_{image_type}{ext}"
+    final_path = os.path.join(final_dir, final_name)
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}{ext}")
 
     try:
-        # Validate inputs
-        validate_file_content_type(upload_file)
-        ext = get_file_extension(upload_file.filename)
-        
-        # 1. Create Temp File
-        uid = uuid.uuid4().hex
-        tmp_dir = os.path.join(upload_root, "tmp")
-        os.makedirs(tmp_dir, exist_ok=True)
-        tmp_path = os.path.join(tmp_dir, f"{uid}{ext}")
-        
-        # Stream write to temp file
-        bytes_written = 0
-        try:
-            with open(tmp_path, "wb") as dest:
-                while True:
-                    chunk = upload_file.file.read(65536)
-                    if not chunk:
-                        break
-                    bytes_written += len(chunk)
-                    if bytes_written > max_size:
-                        dest.close()
-                        os.remove(tmp_path)
-                        raise HTTPException(
-                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                            detail=f"File size exceeds limit"
-                        )
-                    dest.write(chunk)
-        except HTTPException:
-            raise
-        except Exception as e:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            raise HTTPException(status_code=500, detail="Error saving file")
-        
-        # 2. Construct Target Directory
-        final_dir = os.path.join(upload_root, image_type, tank_number)
-        
-        # --- DEBUG PRINT FOR PATH ---
-        print(f"5. Target Directory Calculated: '{final_dir}'")
-        print("="*30 + "\n")
-        # ----------------------------
+        await run_io(_make_dirs, tmp_dir, final_dir)
+        dest = await run_io(open, tmp_path, "wb")
+    except Exception as e:
+        logger.error(f"Error preparing upload folders: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error saving file")
 
-        os.makedirs(final_dir, exist_ok=True)
-        
-        # 3. Construct Fixed Filename
-        final_name = f"{tank_number}_{image_type}{ext}"
-        final_path = os.path.join(final_dir, final_name)
-        
-        # 4. Atomic Move
-        try:
-            if os.path.exists(final_path):
-                os.remove(final_path)
-            shutil.move(tmp_path, final_path)
-            os.chmod(final_path, 0o644)
-        except Exception as e:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
-            logger.error(f"Error moving file: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error finalizing file storage")
-        
-        rel_path = os.path.join(image_type, tank_number, final_name).replace("\\", "/")
-        return rel_path
-        
+    size = 0
+    hasher = hashlib.sha256()
+    try:
+        while True:
+            chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File size exceeds limit of {max_size // (1024 * 1024)} MB"
+                )
+            await run_io(_write_chunk_hashed, dest, hasher, chunk)
+        digest = hasher.hexdigest()
+        await run_io(_commit_file, dest, tmp_path, final_path, upload_root, digest)
     except HTTPException:
+        await run_io(_discard_file, dest, tmp_path)
         raise
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Unexpected error")
+        await run_io(_discard_file, dest, tmp_path)
+        logger.error(f"Error saving file: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error saving file")
 
+    observe_upload(image_type, size, time.perf_counter() - started)
+    record_file(final_path)
+    rel_path = os.path.join(image_type, tank_number, final_name).replace("\\", "/")
+    return StoredUpload(rel_path=rel_path, size=size, original_filename=upload_file.filename, sha256=digest)
 
-def delete_file_if_exists(upload_root: str, image_path: str) -> bool:
+
+# ==================== Resumable chunked uploads ====================
+# For large certificates / drawings over unreliable networks:
+#   1. init      -> session folder upload_root/tmp/sessions/<upload_id>/ (meta.json + data.part)
+#   2. put chunk -> written at the given offset; a retried chunk overwrites from its offset
+#   3. complete  -> size and SHA-256 checked, session marked complete
+#   4. the certificate / drawing / valve report route consumes the session with
+#      an atomic os.replace of data.part into the final location.
+# Stale sessions are removed by cleanup_uploads.
+
+UPLOAD_SESSION_MAX_SIZE = int(os.getenv("UPLOAD_SESSION_MAX_SIZE", 200 * 1024 * 1024))
+UPLOAD_SESSION_CHUNK_SIZE = int(os.getenv("UPLOAD_SESSION_CHUNK_SIZE", 5 * 1024 * 1024))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", 24))
+
+SESSION_STATUS_OPEN = "open"
+SESSION_STATUS_COMPLETE = "complete"
+
+_UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_session_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _sessions_dir(upload_root: str) -> str:
+    return os.path.join(upload_root, "tmp", "sessions")
+
+
+def _session_dir(upload_root: str, upload_id: str) -> str:
+    if not upload_id or not _UPLOAD_ID_RE.match(upload_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid upload_id")
+    return os.path.join(_sessions_dir(upload_root), upload_id)
+
+
+def _read_session(session_dir: str) -> dict:
+    try:
+        with open(os.path.join(session_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload session not found or expired")
+    data_path = os.path.join(session_dir, "data.part")
+    meta["received"] = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+    return meta
+
+
+def _write_session(session_dir: str, meta: dict) -> None:
+    meta = {k: v for k, v in meta.items() if k != "received"}
+    tmp_path = os.path.join(session_dir, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(session_dir, "meta.json"))
+
+
+def _create_session(session_dir: str, meta: dict) -> None:
+    os.makedirs(session_dir)
+    open(os.path.join(session_dir, "data.part"), "wb").close()
+    _write_session(session_dir, meta)
+
+
+def _write_chunk(session_dir: str, offset: int, chunks: list) -> int:
+    data_path = os.path.join(session_dir, "data.part")
+    with open(data_path, "r+b") as dest:
+        dest.seek(offset)
+        for chunk in chunks:
+            dest.write(chunk)
+        dest.truncate()
+        dest.flush()
+        os.fsync(dest.fileno())
+        return dest.tell()
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _session_lock(upload_id: str) -> asyncio.Lock:
+    lock = _session_locks.get(upload_id)
+    if lock is None:
+        lock = _session_locks[upload_id] = asyncio.Lock()
+    return lock
+
+
+def session_status(meta: dict, upload_id: str) -> dict:
+    return {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "content_type": meta["content_type"],
+        "total_size": meta["total_size"],
+        "received": meta["received"],
+        "status": meta["status"],
+        "chunk_size": UPLOAD_SESSION_CHUNK_SIZE,
+        "expires_in_hours": UPLOAD_SESSION_TTL_HOURS,
+    }
+
+
+async def init_upload_session(upload_root: str, filename: str, content_type: str, total_size: int) -> dict:
+    validate_content_type(content_type)
+    get_file_extension(filename)
+    if total_size <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="total_size must be positive")
+    if total_size > UPLOAD_SESSION_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds limit of {UPLOAD_SESSION_MAX_SIZE // (1024 * 1024)} MB"
+        )
+
+    upload_id = uuid.uuid4().hex
+    meta = {
+        "filename": os.path.basename(filename),
+        "content_type": content_type,
+        "total_size": total_size,
+        "status": SESSION_STATUS_OPEN,
+        "created_at": datetime.now().isoformat(),
+    }
+    await run_io(_create_session, _session_dir(upload_root, upload_id), meta)
+    meta["received"] = 0
+    return session_status(meta, upload_id)
+
+
+async def get_upload_session(upload_root: str, upload_id: str) -> dict:
+    meta = await run_io(_read_session, _session_dir(upload_root, upload_id))
+    return session_status(meta, upload_id)
+
+
+async def write_upload_chunk(upload_root: str, upload_id: str, offset: int, body) -> dict:
+    """
+    Writes the request body (an async iterator of bytes) at offset.
+    offset may be lower than what was received (a retried chunk) but not higher.
+    """
+    session_dir = _session_dir(upload_root, upload_id)
+    async with _session_lock(upload_id):
+        meta = await run_io(_read_session, session_dir)
+        if meta["status"] != SESSION_STATUS_OPEN:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload session is already complete")
+        if offset < 0 or offset > meta["received"]:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Offset does not match received bytes", "received": meta["received"]}
+            )
+
+        chunks = []
+        length = 0
+        async for chunk in body:
+            length += len(chunk)
+            if length > UPLOAD_SESSION_CHUNK_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Chunk exceeds {UPLOAD_SESSION_CHUNK_SIZE} bytes"
+                )
+            if offset + length > meta["total_size"]:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Chunk goes past total_size")
+            chunks.append(chunk)
+        if not length:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty chunk")
+
+        started = time.perf_counter()
+        meta["received"] = await run_io(_write_chunk, session_dir, offset, chunks)
+        observe_upload("session_chunk", length, time.perf_counter() - started)
+    return session_status(meta, upload_id)
+
+
+async def complete_upload_session(upload_root: str, upload_id: str, sha256: str) -> dict:
+    session_dir = _session_dir(upload_root, upload_id)
+    async with _session_lock(upload_id):
+        meta = await run_io(_read_session, session_dir)
+        if meta["status"] == SESSION_STATUS_OPEN:
+            if meta["received"] != meta["total_size"]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": "Upload is incomplete", "received": meta["received"]}
+                )
+            digest = await run_io(_sha256_file, os.path.join(session_dir, "data.part"))
+            if digest != (sha256 or "").lower():
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={"message": "Checksum mismatch", "sha256": digest}
+                )
+            meta["status"] = SESSION_STATUS_COMPLETE
+            meta["sha256"] = digest
+            await run_io(_write_session, session_dir, meta)
+    _session_locks.pop(upload_id, None)
+    return session_status(meta, upload_id)
+
+
+async def abort_upload_session(upload_root: str, upload_id: str) -> None:
+    session_dir = _session_dir(upload_root, upload_id)
+    async with _session_lock(upload_id):
+        await run_io(_read_session, session_dir)
+        await run_io(shutil.rmtree, session_dir, True)
+    _session_locks.pop(upload_id, None)
+
+
+def _consume_session(session_dir: str, final_dir: str, final_path: str, upload_root: str, digest: str) -> None:
+    os.makedirs(final_dir, exist_ok=True)
+    data_path = os.path.join(session_dir, "data.part")
+    os.chmod(data_path, 0o644)
+    # Sessions live under upload_root/tmp, so this is a same-filesystem link / rename
+    _place_file(data_path, final_path, upload_root, digest)
+    shutil.rmtree(session_dir, ignore_errors=True)
+
+
+async def consume_upload_session(
+    upload_id: str,
+    tank_number: str,
+    image_type: str,
+    upload_root: str
+) -> StoredUpload:
+    """Moves a completed session into upload_root/image_type/tank_number/tank_number_image_type.ext"""
+    session_dir = _session_dir(upload_root, upload_id)
+    async with _session_lock(upload_id):
+        meta = await run_io(_read_session, session_dir)
+        if meta["status"] != SESSION_STATUS_COMPLETE:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Upload session is not complete")
+
+        ext = get_file_extension(meta["filename"])
+        final_dir = os.path.join(upload_root, image_type, tank_number)
+        final_name = f"{tank_number}_{image_type}{ext}"
+        final_path = os.path.join(final_dir, final_name)
+        await run_io(_consume_session, session_dir, final_dir, final_path, upload_root, meta["sha256"])
+    _session_locks.pop(upload_id, None)
+
+    record_file(final_path)
+    rel_path = os.path.join(image_type, tank_number, final_name).replace("\\", "/")
+    return StoredUpload(rel_path=rel_path, size=meta["total_size"], original_filename=meta["filename"], sha256=meta["sha256"])
+
+
+async def store_upload(
+    upload_file: Optional[UploadFile],
+    upload_id: Optional[str],
+    tank_number: str,
+    image_type: str,
+    upload_root: str
+) -> Optional[StoredUpload]:
+    """
+    Saves either a file sent with the request or a completed chunked upload session.
+    Returns None when neither was given.
+    """
+    if upload_id:
+        return await consume_upload_session(upload_id, tank_number, image_type, upload_root)
+    if upload_file:
+        return await save_uploaded_file_async(upload_file, tank_number, image_type, upload_root)
+    return None
+
+
+def delete_file_if_exists(upload_root: str, image_path: str, digest: Optional[str] = None) -> bool:
     """
     Delete a file from disk and clean up the tank folder if empty.
+    digest is the stored SHA-256 of the file; without it the file is hashed
+    first when its blob would be left unreferenced.
     """
     try:
         full_path = os.path.join(upload_root, image_path)
@@ -186,8 +584,13 @@ def delete_file_if_exists(upload_root: str, image_path: str) -> bool:
         if not os.path.exists(full_path):
             return False
 
-        # Delete the file
+        # Delete the file, its blob when nothing else shares it, and its cached renditions
+        digest = digest or _sole_blob_digest(full_path)
         os.remove(full_path)
+        if digest:
+            _release_blob(upload_root, digest)
+        forget_file(full_path)
+        remove_derivatives(full_path)
         logger.info(f"Deleted file: {image_path}")
         
         # Clean up directory if empty
@@ -207,15 +610,33 @@ def delete_file_if_exists(upload_root: str, image_path: str) -> bool:
         return False
 
 
+async def cleanup_uploads(upload_root: str) -> int:
+    """
+    Removes chunked upload sessions with no activity for UPLOAD_SESSION_TTL_HOURS,
+    then stale temp files and unreferenced blobs (cleanup_temp_files).
+    The disk work runs on the I/O pool; the session locks belong to the event
+    loop and are only read and pruned here, on the loop.
+    """
+    # A session whose lock is held has a request in progress, however old its files look
+    busy = {upload_id for upload_id, lock in _session_locks.items() if lock.locked()}
+    deleted_count, remaining = await run_io(_cleanup_upload_sessions, upload_root, UPLOAD_SESSION_TTL_HOURS, busy)
+    # Locks of expired sessions, and of requests for sessions that are gone (unknown ids, failed aborts)
+    for upload_id in [u for u, lock in _session_locks.items() if u not in remaining and not lock.locked()]:
+        del _session_locks[upload_id]
+    return deleted_count + await run_io(cleanup_temp_files, upload_root)
+
+
 def cleanup_temp_files(upload_root: str, hours_old: int = 2) -> int:
     """
-    Clean up temporary files older than specified hours.
+    Clean up temporary files older than specified hours and unreferenced blobs.
+    Upload sessions are handled by cleanup_uploads.
     """
+    deleted_count = gc_blobs(upload_root)
+
     tmp_dir = os.path.join(upload_root, "tmp")
     if not os.path.exists(tmp_dir):
-        return 0
+        return deleted_count
     
-    deleted_count = 0
     cutoff_time = datetime.now() - timedelta(hours=hours_old)
     
     try:
@@ -232,4 +653,32 @@ def cleanup_temp_files(upload_root: str, hours_old: int = 2) -> int:
     except Exception as e:
         logger.error(f"Error cleaning temp directory: {str(e)}")
     
-    return deleted_count
\ No newline at end of file
+    return deleted_count
+
+def _cleanup_upload_sessions(upload_root: str, hours_old: int, busy: set) -> Tuple[int, set]:
+    """Returns the number of sessions removed and the ids of those still on disk."""
+    sessions_dir = _sessions_dir(upload_root)
+    if not os.path.isdir(sessions_dir):
+        return 0, set()
+
+    deleted_count = 0
+    remaining = set()
+    cutoff = (datetime.now() - timedelta(hours=hours_old)).timestamp()
+    for upload_id in os.listdir(sessions_dir):
+        remaining.add(upload_id)
+        if upload_id in busy:
+            continue
+        session_dir = os.path.join(sessions_dir, upload_id)
+        try:
+            # Last activity is the newest of meta.json / data.part
+            last_activity = max(
+                (os.path.getmtime(os.path.join(session_dir, name)) for name in os.listdir(session_dir)),
+                default=os.path.getmtime(session_dir)
+            )
+            if last_activity < cutoff:
+                shutil.rmtree(session_dir)
+                remaining.discard(upload_id)
+                deleted_count += 1
+        except Exception as e:
+            logger.warning(f"Failed to delete upload session {upload_id}: {str(e)}")
+    return deleted_count, remaining
@@ -0,0 +1,292 @@
+"""
+Load benchmark of the main API paths, with regression checks against a
+stored baseline.
+
+Scenarios (each request picks the next seeded tank, round robin):
+  tanks_list      GET  /api/tanks/
+  tanks_page      GET  /api/tanks/page?limit=50
+  excel_export    GET  /api/tanks/export-to-excel
+  login           POST /api/auth/login
+  image_list      GET  /api/upload/{tank}/images
+  image_upload    POST /api/upload/{tank}/{type}
+  certificate     POST, GET, PUT and DELETE /api/tank-certificates (one cycle
+                  per iteration; latency is the whole cycle)
+  ppt_generate    POST /api/ppt/generate (cold: one request per tank until
+                  every tank has a cached deck). Afterwards every generated
+                  deck is opened and must contain the seeded photos; a deck
+                  without pictures fails the run, since its timing would not
+                  include image embedding.
+
+For each scenario: requests, errors, throughput and p50 / p95 / p99 / max
+latency. --save-baseline stores the results; --baseline compares against
+them and exits with status 1 when a scenario's p95 grew, or its throughput
+dropped, by more than --tolerance, or when it has new errors.
+
+By default the app runs in-process (httpx ASGI transport) on the database
+from DATABASE_URL, seeded with benchmarks.fleet. --base-url targets a
+running server instead; seed the same database first with --seed-only.
+
+Run from the Backend folder:
+    DATABASE_URL=sqlite:////tmp/isotank-bench.db UPLOAD_ROOT=/tmp/isotank-bench-uploads \\
+        python -m benchmarks.api_load --tanks 500 --requests 200 --concurrency 16 \\
+        --save-baseline benchmarks/baselines/local.json
+    ... python -m benchmarks.api_load --baseline benchmarks/baselines/local.json --tolerance 0.2
+
+SQLite serializes writes, so use it to compare commits on one machine, not to
+size production; point DATABASE_URL at a MySQL container for that.
+
+benchmarks/baselines/reference.json is a run of the command above (SQLite,
+in-process) kept as a reference for the shape and order of magnitude of the
+numbers. Latency depends on the machine, so regression checks should compare
+against a baseline saved on the same machine.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import httpx
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+from app.database import DATABASE_URL
+from benchmarks.fleet import BENCH_EMAIL, BENCH_PASSWORD, fleet_size, sample_photo, seed_fleet, tank_number
+from app.routers.upload import UPLOAD_ROOT
+
+
+# ==================== Scenarios ====================
+
+class Scenarios:
+    """One coroutine per scenario; each makes one iteration and raises on failure."""
+
+    def __init__(self, client: httpx.AsyncClient, tanks: int):
+        self.client = client
+        self.tanks = itertools.cycle(range(1, tanks + 1))
+        self.counter = itertools.count()
+        self.decks = []
+        with open(sample_photo(UPLOAD_ROOT), "rb") as f:
+            self.photo = f.read()
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        response = await self.client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} -> {response.status_code}: {response.text[:200]}")
+        return response
+
+    async def tanks_list(self):
+        await self.request("GET", "/api/tanks/")
+
+    async def tanks_page(self):
+        await self.request("GET", "/api/tanks/page", params={"limit": 50})
+
+    async def excel_export(self):
+        await self.request("GET", "/api/tanks/export-to-excel")
+
+    async def login(self):
+        await self.request("POST", "/api/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+
+    async def image_list(self):
+        await self.request("GET", f"/api/upload/{tank_number(next(self.tanks))}/images")
+
+    async def image_upload(self):
+        number = tank_number(next(self.tanks))
+        files = {"file": (f"{number}.jpg", self.photo, "image/jpeg")}
+        await self.request("POST", f"/api/upload/{number}/frontview", files=files)
+
+    async def certificate(self):
+        number = tank_number(next(self.tanks))
+        tank_id = self.tank_ids[number]
+        cert_number = f"LOAD-{os.getpid()}-{next(self.counter)}-{time.time_ns()}"
+        created = await self.request("POST", "/api/tank-certificates/", data={
+            "tank_id": tank_id, "certificate_number": cert_number,
+            "insp_2_5y_date": "2025-01-01", "next_insp_date": "2027-07-01", "inspection_agency": "BV",
+        })
+        cert_id = created.json()["id"]
+        await self.request("GET", f"/api/tank-certificates/{cert_id}")
+        await self.request("PUT", f"/api/tank-certificates/{cert_id}", data={"inspection_agency": "LR"})
+        await self.request("DELETE", f"/api/tank-certificates/{cert_id}")
+
+    async def ppt_generate(self):
+        number = tank_number(next(self.tanks))
+        response = await self.request("POST", "/api/ppt/generate", json={"tank_id": self.tank_ids[number]})
+        self.decks.append(response.json()["file_path"])
+
+    async def prepare(self, tanks: int) -> None:
+        """Resolves tank ids once, so scenarios do not measure the lookup."""
+        response = await self.request("GET", "/api/tanks/")
+        self.tank_ids = {t["tank_number"]: t["id"] for t in response.json()}
+        missing = [tank_number(i) for i in range(1, tanks + 1) if tank_number(i) not in self.tank_ids]
+        if missing:
+            raise SystemExit(f"{len(missing)} benchmark tanks missing (first: {missing[0]}); seed with --tanks {tanks}")
+
+
+def count_pictures(path: str) -> int:
+    return sum(
+        1 for slide in Presentation(path).slides for shape in slide.shapes
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE
+    )
+
+
+def check_decks(paths: list) -> None:
+    """Fails the run when generated decks have no photos (e.g. UPLOAD_ROOT not searched)."""
+    local = [p for p in set(paths) if os.path.exists(p)]
+    if not local:
+        print(f"{'':<14}decks not on this machine, picture check skipped")
+        return
+    empty = [p for p in local if count_pictures(p) == 0]
+    if empty:
+        raise SystemExit(f"{len(empty)} of {len(local)} generated decks contain no pictures (first: {empty[0]})")
+    print(f"{'':<14}{len(local)} decks checked, all contain pictures")
+
+
+SCENARIOS = ["tanks_list", "tanks_page", "excel_export", "login", "image_list", "image_upload", "certificate", "ppt_generate"]
+
+
+# ==================== Load generation ====================
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+async def run_scenario(run, total: int, concurrency: int) -> dict:
+    latencies, errors = [], []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                await run()
+                latencies.append(time.perf_counter() - started)
+            except Exception as e:
+                errors.append(str(e))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def make_client(base_url: str, timeout: float) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout)
+    from app.main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=timeout)
+
+
+async def run_all(args) -> dict:
+    results = {}
+    async with make_client(args.base_url, args.timeout) as client:
+        scenarios = Scenarios(client, args.tanks)
+        await scenarios.prepare(args.tanks)
+        for name in args.scenarios:
+            run = getattr(scenarios, name)
+            total = min(args.requests, args.tanks) if name == "ppt_generate" else args.requests
+            for _ in range(args.warmup):
+                try:
+                    await run()
+                except Exception:
+                    pass
+            results[name] = await run_scenario(run, total, args.concurrency)
+            print_row(name, results[name])
+            if name == "ppt_generate":
+                check_decks(scenarios.decks)
+    return results
+
+
+# ==================== Reporting / baselines ====================
+
+def print_header():
+    print(f"{'scenario':<14}{'reqs':>6}{'errs':>6}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+
+def print_row(name: str, r: dict):
+    print(f"{name:<14}{r['requests']:>6}{r['errors']:>6}{r['throughput']:>9.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['max_ms']:>10.2f}")
+    if r["first_error"]:
+        print(f"{'':<14}first error: {r['first_error']}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of results against baseline, as readable lines."""
+    regressions = []
+    for name, base in baseline["scenarios"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {current['throughput']:.1f} req/s")
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main(args) -> int:
+    if not args.base_url or args.seed_only:
+        added = seed_fleet(args.tanks)
+        print(f"Fleet: {fleet_size()} tanks ({added} added) on {DATABASE_URL.split('@')[-1]}")
+    if args.seed_only:
+        return 0
+
+    print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, target {args.base_url or 'in-process app'}\n")
+    print_header()
+    results = asyncio.run(run_all(args))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "machine": platform.node(), "python": platform.python_version(),
+                "database": DATABASE_URL.split("://")[0],
+                "settings": {"tanks": args.tanks, "requests": args.requests, "concurrency": args.concurrency},
+                "scenarios": results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tanks", type=int, default=200, help="fleet size, seeded when missing")
+    parser.add_argument("--requests", type=int, default=200, help="iterations per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=3, help="unmeasured iterations per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--base-url", help="running server, e.g. http://localhost:8000 (default: in-process)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed-only", action="store_true", help="seed the fleet and exit")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH", help="fail on regression against this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 0.2)")
+    sys.exit(main(parser.parse_args()))
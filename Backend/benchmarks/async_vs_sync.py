@@ -0,0 +1,112 @@
+"""
+Sync vs async DB handlers under concurrent load.
+
+Serves the same tank listing two ways inside one in-process app:
+  /sync   def handler on the blocking Session (runs in the anyio threadpool)
+  /async  the real async handler from app.routers.tank_details (AsyncSession)
+and fires N concurrent requests at each, reporting throughput and latency.
+
+--sleep-ms adds SELECT SLEEP() to every request to model the round trip to a
+remote MySQL server; that wait is where sync handlers hold a thread.
+
+Run from the Backend folder against the database configured in .env:
+    python -m benchmarks.async_vs_sync --requests 2000 --concurrency 50 100 200 --sleep-ms 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_async_read_db, get_read_db, dispose_async_engines
+from app.models.tank_header import Tank
+from app.models.tank_details import TankDetails
+from app.models.user import User  # noqa: F401 (registers mappers)
+from app.routers.tank_details import get_all_tanks
+
+
+def build_app(sleep_ms: int) -> FastAPI:
+    bench = FastAPI()
+    sleep_sql = text("SELECT SLEEP(:s)")
+
+    @bench.get("/sync")
+    def sync_tanks(db: Session = Depends(get_read_db)):
+        if sleep_ms:
+            db.execute(sleep_sql, {"s": sleep_ms / 1000})
+        rows = db.query(Tank, TankDetails).join(TankDetails, Tank.id == TankDetails.tank_id).all()
+        return {"count": len(rows)}
+
+    @bench.get("/async")
+    async def async_tanks(db: AsyncSession = Depends(get_async_read_db)):
+        if sleep_ms:
+            await db.execute(sleep_sql, {"s": sleep_ms / 1000})
+        rows = await get_all_tanks(db)
+        return {"count": len(rows)}
+
+    return bench
+
+
+async def run_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "errors": errors,
+    }
+
+
+async def main(args):
+    transport = httpx.ASGITransport(app=build_app(args.sleep_ms))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Warm up both pools
+        await run_load(client, "/sync", 20, 10)
+        await run_load(client, "/async", 20, 10)
+
+        print(f"{'handler':<8}{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for concurrency in args.concurrency:
+            for path in ("/sync", "/async"):
+                r = await run_load(client, path, args.requests, concurrency)
+                print(f"{path.strip('/'):<8}{concurrency:>6}{r['rps']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['errors']:>8}")
+
+    await dispose_async_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per handler and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--sleep-ms", type=int, default=0, help="simulated DB round trip per request")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,243 @@
+"""
+Synthetic fleet for the benchmarks: tanks with details, certificates,
+photos, inspections and checklists.
+
+Seeds the database the app is configured for (DATABASE_URL or the DB_*
+settings in .env). Against SQLite the tables are created first, including
+the inspection and lookup tables the app reads with raw SQL; against MySQL
+the schema from sql/backup.sql is expected.
+
+Seeded tanks are numbered BENCH000001, BENCH000002, ...; seeding again adds
+only the missing ones.
+
+Run from the Backend folder:
+    DATABASE_URL=sqlite:////tmp/isotank-bench.db UPLOAD_ROOT=/tmp/isotank-bench-uploads \\
+        python -m benchmarks.fleet --tanks 500
+"""
+import argparse
+import os
+import random
+from datetime import date, datetime, timedelta
+
+from PIL import Image
+from sqlalchemy import bindparam, func, insert, select, text
+
+import app.main  # noqa: F401 (registers every mapped table)
+from app.database import Base, SessionLocal, engine, is_sqlite, DATABASE_URL
+from app.models.tank_header import Tank
+from app.models.tank_details import TankDetails
+from app.models.tank_certificate import TankCertificate
+from app.models.tank_images import TankImage
+from app.models.user import User
+from app.routers.auth import generate_salt, hash_password_with_salt
+from app.routers.upload import UPLOAD_ROOT
+from app.services import lookups
+from app.utils.upload_utils import IMAGE_TYPES
+
+TANK_PREFIX = "BENCH"
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+BENCH_EMP_ID = 990001
+
+CHECKLIST_ITEMS = 12
+PHOTO_DAYS = 3  # photos per image type, one per day
+
+# Tables the app reads with raw SQL and has no model for (SQLite only)
+SQLITE_DDL = [
+    """CREATE TABLE IF NOT EXISTS tank_inspection_details (
+        inspection_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        inspection_date DATETIME NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        report_number VARCHAR(50) NOT NULL UNIQUE, tank_id INTEGER, tank_number VARCHAR(50) NOT NULL,
+        status_id INTEGER NOT NULL, product_id INTEGER NOT NULL, inspection_type_id INTEGER NOT NULL,
+        location_id INTEGER NOT NULL, working_pressure DECIMAL(12, 2), design_temperature VARCHAR(100),
+        frame_type VARCHAR(255), cabinet_type VARCHAR(255), mfgr VARCHAR(255),
+        safety_valve_brand_id INTEGER, safety_valve_model_id INTEGER, safety_valve_size_id INTEGER,
+        pi_next_inspection_date DATE, notes TEXT, lifter_weight VARCHAR(255), emp_id INTEGER,
+        operator_id INTEGER, ownership VARCHAR(16), created_by VARCHAR(100), updated_by VARCHAR(100),
+        lifter_weight_thumbnail VARCHAR(255))""",
+    "CREATE INDEX IF NOT EXISTS ix_tank_inspection_details_tank_id ON tank_inspection_details (tank_id)",
+    "CREATE INDEX IF NOT EXISTS ix_tank_inspection_details_tank_number ON tank_inspection_details (tank_number)",
+    """CREATE TABLE IF NOT EXISTS inspection_checklist (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, inspection_id INTEGER NOT NULL, tank_id INTEGER,
+        emp_id INTEGER, job_id INTEGER, job_name VARCHAR(255), sub_job_id INTEGER, sn VARCHAR(16) NOT NULL,
+        sub_job_description VARCHAR(512), status_id INTEGER NOT NULL, status VARCHAR(32), comment TEXT,
+        flagged TINYINT NOT NULL, created_at DATETIME, updated_at DATETIME)""",
+    "CREATE INDEX IF NOT EXISTS ix_inspection_checklist_inspection_id ON inspection_checklist (inspection_id)",
+    """CREATE TABLE IF NOT EXISTS to_do_list (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, checklist_id INTEGER NOT NULL, inspection_id INTEGER NOT NULL,
+        tank_id INTEGER, job_name VARCHAR(255), sub_job_description VARCHAR(512), sn VARCHAR(16) NOT NULL,
+        status_id INTEGER, comment TEXT, created_at DATETIME NOT NULL)""",
+]
+
+
+def tank_number(i: int) -> str:
+    return f"{TANK_PREFIX}{i:06d}"
+
+
+def create_schema() -> None:
+    Base.metadata.create_all(bind=engine)
+    if not is_sqlite(DATABASE_URL):
+        return
+    with engine.begin() as conn:
+        for ddl in SQLITE_DDL:
+            conn.execute(text(ddl))
+        # Lookup tables, five entries each
+        for table, id_col, name_col in lookups.LOOKUP_TABLES.values():
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table} ({id_col} INTEGER PRIMARY KEY, {name_col} VARCHAR(255))"))
+            if not conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar():
+                conn.execute(
+                    text(f"INSERT INTO {table} ({id_col}, {name_col}) VALUES (:id, :name)"),
+                    [{"id": k, "name": f"{table} {k}"} for k in range(1, 6)]
+                )
+    lookups.refresh()
+
+
+def sample_photo(upload_root: str) -> str:
+    """One 1600x1200 JPEG that every seeded photo is hard-linked to."""
+    path = os.path.join(upload_root, "bench_sample.jpg")
+    if not os.path.exists(path):
+        os.makedirs(upload_root, exist_ok=True)
+        # Gradients rather than a flat colour, so JPEG sizes are realistic
+        bands = [Image.linear_gradient("L"), Image.radial_gradient("L"), Image.linear_gradient("L").rotate(90)]
+        image = Image.merge("RGB", [band.resize((1600, 1200)) for band in bands])
+        image.save(path, "JPEG", quality=85)
+    return path
+
+
+def place_photo(sample: str, upload_root: str, image_type: str, number: str, day: date) -> str:
+    rel_path = f"{image_type}/{number}/{number}_{image_type}_{day.isoformat()}.jpg"
+    full_path = os.path.join(upload_root, rel_path)
+    if not os.path.exists(full_path):
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        try:
+            os.link(sample, full_path)
+        except OSError:
+            with open(sample, "rb") as src, open(full_path, "wb") as dst:
+                dst.write(src.read())
+    return rel_path
+
+
+def ensure_user(db) -> None:
+    if db.scalar(select(User.id).where(User.email == BENCH_EMAIL)):
+        return
+    salt = generate_salt()
+    db.add(User(
+        emp_id=BENCH_EMP_ID, name="Benchmark", email=BENCH_EMAIL,
+        password_hash=hash_password_with_salt(BENCH_PASSWORD, salt), password_salt=salt
+    ))
+    db.commit()
+
+
+def seed_fleet(tanks: int, upload_root: str = UPLOAD_ROOT, seed: int = 42, batch: int = 200) -> int:
+    """Creates tanks 1..tanks that do not exist yet. Returns how many were added."""
+    create_schema()
+    rnd = random.Random(seed)
+    sample = sample_photo(upload_root)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        ensure_user(db)
+        existing = set(db.scalars(select(Tank.tank_number).where(Tank.tank_number.like(f"{TANK_PREFIX}%"))))
+        missing = [i for i in range(1, tanks + 1) if tank_number(i) not in existing]
+
+        for start in range(0, len(missing), batch):
+            chunk = missing[start:start + batch]
+            db.execute(insert(Tank), [{"tank_number": tank_number(i), "status": "active", "created_by": "bench"} for i in chunk])
+            ids = dict(db.execute(select(Tank.tank_number, Tank.id).where(Tank.tank_number.in_([tank_number(i) for i in chunk]))).all())
+
+            details, certs, images, inspections = [], [], [], []
+            for i in chunk:
+                number = tank_number(i)
+                tank_id = ids[number]
+                details.append({
+                    "tank_id": tank_id, "tank_number": number,
+                    "status": rnd.choice(["active", "active", "active", "inactive"]),
+                    "mfgr": rnd.choice(["CIMC", "Singamas", "NTtank", "Welfit Oddy"]),
+                    "date_mfg": date(2010, 1, 1) + timedelta(days=rnd.randrange(5000)),
+                    "capacity_l": rnd.choice([21000.0, 24000.0, 25000.0, 26000.0]),
+                    "mawp": rnd.choice([4.0, 6.0]), "size": rnd.choice(["20", "40"]),
+                    "tare_weight_kg": 3600.0 + rnd.randrange(400), "mgw_kg": 36000.0,
+                    "lease": rnd.random() < 0.3, "remark": "Synthetic benchmark tank", "created_by": "bench",
+                })
+                for k in range(rnd.choice([1, 1, 2])):
+                    certs.append({
+                        "tank_id": tank_id, "tank_number": number, "certificate_number": f"{number}-C{k + 1}",
+                        "insp_2_5y_date": today - timedelta(days=rnd.randrange(900)),
+                        "next_insp_date": today + timedelta(days=rnd.randrange(900)),
+                        "inspection_agency": rnd.choice(["BV", "LR", "ABS"]), "created_by": "bench",
+                    })
+                for image_type in IMAGE_TYPES:
+                    for d in range(PHOTO_DAYS):
+                        day = today - timedelta(days=d * 30)
+                        images.append({
+                            "tank_number": number, "image_type": image_type, "emp_id": BENCH_EMP_ID,
+                            "image_path": place_photo(sample, upload_root, image_type, number, day), "created_date": day,
+                        })
+                now = datetime.now()
+                inspections.append({
+                    "report_number": f"{number}-R1", "tank_id": tank_id, "tank_number": number,
+                    "inspection_date": now - timedelta(days=rnd.randrange(365)), "created_at": now, "updated_at": now,
+                    "status_id": rnd.randint(1, 5), "product_id": rnd.randint(1, 5),
+                    "inspection_type_id": rnd.randint(1, 5), "location_id": rnd.randint(1, 5),
+                    "safety_valve_brand_id": rnd.randint(1, 5), "operator_id": rnd.randint(1, 5),
+                    "notes": "Synthetic inspection", "created_by": "bench",
+                })
+
+            db.execute(insert(TankDetails), details)
+            db.execute(insert(TankCertificate), certs)
+            db.execute(insert(TankImage), images)
+            insert_inspections(db, inspections)
+            db.commit()
+        return len(missing)
+    finally:
+        db.close()
+
+
+def insert_inspections(db, inspections: list) -> None:
+    columns = list(inspections[0])
+    db.execute(
+        text(f"INSERT INTO tank_inspection_details ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})"),
+        inspections
+    )
+    rows = db.execute(
+        text("SELECT inspection_id, tank_id FROM tank_inspection_details WHERE report_number IN :numbers")
+        .bindparams(bindparam("numbers", expanding=True)),
+        {"numbers": [i["report_number"] for i in inspections]}
+    ).all()
+    now = datetime.now()
+    checklist = [
+        {
+            "inspection_id": inspection_id, "tank_id": tank_id, "emp_id": BENCH_EMP_ID,
+            "job_name": f"Job {k // 4 + 1}", "sn": f"{k // 4 + 1}.{k % 4 + 1}",
+            "sub_job_description": f"Check item {k + 1}", "status_id": 1 if k % 5 else 2,
+            "status": "OK" if k % 5 else "Fail", "comment": "-", "flagged": 0 if k % 5 else 1,
+            "created_at": now, "updated_at": now,
+        }
+        for inspection_id, tank_id in rows
+        for k in range(CHECKLIST_ITEMS)
+    ]
+    db.execute(
+        text(
+            "INSERT INTO inspection_checklist (inspection_id, tank_id, emp_id, job_name, sn, sub_job_description,"
+            " status_id, status, comment, flagged, created_at, updated_at) VALUES (:inspection_id, :tank_id, :emp_id,"
+            " :job_name, :sn, :sub_job_description, :status_id, :status, :comment, :flagged, :created_at, :updated_at)"
+        ),
+        checklist
+    )
+
+
+def fleet_size() -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count(Tank.id)).where(Tank.tank_number.like(f"{TANK_PREFIX}%")))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tanks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for reproducible fleets")
+    args = parser.parse_args()
+    added = seed_fleet(args.tanks, seed=args.seed)
+    print(f"Added {added} tanks, fleet now has {fleet_size()} ({DATABASE_URL.split('@')[-1]}, photos under {os.path.abspath(UPLOAD_ROOT)})")
@@ -0,0 +1,114 @@
+"""
+TankImage loading strategies: queries and latency.
+
+Compares the old joined-by-default loading (TankImage.user / TankImage.tank,
+reproduced with with_relations()) against the lean queries the app now runs:
+  listing   latest image per type for one tank (GET /api/upload/{tank}/images)
+  fallback  tank uploads read by the PPT loader (column projection)
+  report    load_report_data_batch() for the sampled tanks, as a whole
+
+For every case it prints statements executed, rows and columns fetched, and
+median / p95 latency over --repeat runs.
+
+Run from the Backend folder against the database configured in .env:
+    python -m benchmarks.loading_strategies --tanks 50 --repeat 20
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event, func, select
+
+from app.database import SessionLocal, engine
+from app.models.tank_header import Tank
+from app.models.tank_images import TankImage, with_relations
+from app.models.user import User  # noqa: F401 (registers mappers)
+from app.routers.upload import latest_images_query
+from app.services.ppt_generator import load_report_data_batch
+
+
+class QueryCounter:
+    """Counts statements and result columns sent through the engine."""
+
+    def __init__(self):
+        self.statements = 0
+        self.columns = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if cursor.description:
+            self.columns = max(self.columns, len(cursor.description))
+
+
+def measure(run, repeat: int) -> dict:
+    counter = QueryCounter()
+    timings = []
+    rows = 0
+    for i in range(repeat):
+        db = SessionLocal()
+        try:
+            if i == 0:
+                event.listen(engine, "after_cursor_execute", counter)
+            started = time.perf_counter()
+            rows = run(db)
+            timings.append(time.perf_counter() - started)
+        finally:
+            if i == 0:
+                event.remove(engine, "after_cursor_execute", counter)
+            db.close()
+
+    timings.sort()
+    return {
+        "statements": counter.statements,
+        "columns": counter.columns,
+        "rows": rows,
+        "p50": statistics.median(timings) * 1000,
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+    }
+
+
+def pick_tanks(limit: int):
+    db = SessionLocal()
+    try:
+        # Tanks with the most photos first: they show the difference best
+        query = (
+            select(Tank.id, Tank.tank_number)
+            .join(TankImage, TankImage.tank_number == Tank.tank_number)
+            .group_by(Tank.id, Tank.tank_number)
+            .order_by(func.count(TankImage.id).desc())
+            .limit(limit)
+        )
+        return db.execute(query).all()
+    finally:
+        db.close()
+
+
+def main(args):
+    tanks = pick_tanks(args.tanks)
+    if not tanks:
+        print("No tanks with images found")
+        return
+    tank_ids = [t.id for t in tanks]
+    tank_numbers = [t.tank_number for t in tanks]
+    busiest = tank_numbers[0]
+
+    cases = [
+        ("listing", "joined", lambda db: len(db.execute(latest_images_query(busiest, eager=True)).unique().scalars().all())),
+        ("listing", "lean", lambda db: len(db.execute(latest_images_query(busiest)).scalars().all())),
+        ("fallback", "joined", lambda db: len(db.query(TankImage).options(*with_relations()).filter(TankImage.tank_number.in_(tank_numbers)).all())),
+        ("fallback", "lean", lambda db: len(db.query(TankImage.tank_number, TankImage.image_type, TankImage.image_path).filter(TankImage.tank_number.in_(tank_numbers)).all())),
+        ("report", "lean", lambda db: len(load_report_data_batch(db, tank_ids))),
+    ]
+
+    print(f"{len(tanks)} tanks, listing measured on {busiest}, {args.repeat} runs each\n")
+    print(f"{'case':<10}{'loading':<9}{'stmts':>7}{'cols':>7}{'rows':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, strategy, run in cases:
+        r = measure(run, args.repeat)
+        print(f"{name:<10}{strategy:<9}{r['statements']:>7}{r['columns']:>7}{r['rows']:>8}{r['p50']:>10.2f}{r['p95']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tanks", type=int, default=50, help="tanks sampled for the fallback and report cases")
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,273 @@
+"""
+PPT generator phases, timed one at a time.
+
+Builds a fixture tank in a scratch folder (--images photos of --image-size
+pixels, --checklist checklist rows, certificates, regulations, cargos) and
+times each phase of build_presentation() separately:
+  index        build the file-location index of the uploads folder
+  resolve      resolve every photo path through the warm index
+  layout       slides 1-3: key/value blocks and tables (add_summary_slides)
+  derivatives  render the slide-sized copy of every photo (cold cache)
+  embed        photo slides with warm derivatives (add_document_slides)
+  save         prs.save() of the finished deck
+  total        build_presentation() end to end, warm caches
+  load         load_report_data() from the database (--db only, on the
+               tanks seeded by benchmarks.fleet)
+
+For every phase it prints median / p95 / min over --repeat runs and the
+peak Python heap (tracemalloc, one extra run; memory allocated by Pillow's
+C code is not included). The deck size and slide count are reported too.
+
+--flamegraph PATH samples the call stacks of all the runs and writes them
+in collapsed-stack format ("phase;caller;callee count"), for flamegraph.pl
+or https://www.speedscope.app.
+
+Run from the Backend folder:
+    python -m benchmarks.ppt_phases --images 12 --image-size 4000x3000 --repeat 10 --flamegraph /tmp/ppt.folded
+    DATABASE_URL=sqlite:////tmp/isotank-bench.db python -m benchmarks.ppt_phases --db --repeat 10
+"""
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from PIL import Image
+from pptx import Presentation
+
+from app.models.tank_details import TankDetails
+from app.services.ppt_generator import (
+    add_document_slides, add_summary_slides, build_presentation, resolve_path, save_presentation
+)
+from app.utils.file_index import FileIndex, get_index
+from app.utils.image_derivatives import DERIVATIVE_DIR, get_derivative
+
+TANK_NUMBER = "FIXT0000001"
+
+
+# ==================== Fixture ====================
+
+def write_photo(path: str, size: tuple) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Gradients with sensor-like noise: compresses like a photo, unlike a flat colour
+    bands = [Image.linear_gradient("L"), Image.radial_gradient("L"), Image.linear_gradient("L").rotate(90)]
+    bands = [Image.blend(band.resize(size), Image.effect_noise(size, 48), 0.3) for band in bands]
+    Image.merge("RGB", bands).save(path, "JPEG", quality=90)
+
+
+def build_fixture(base_dir: str, images: int, size: tuple, checklist: int) -> SimpleNamespace:
+    """Report data shaped like load_report_data() output, with photos under base_dir/uploads."""
+    photos = []
+    for k in range(images):
+        rel_path = f"inspection/{TANK_NUMBER}/{TANK_NUMBER}_photo_{k + 1}.jpg"
+        write_photo(os.path.join(base_dir, "uploads", rel_path), size)
+        photos.append({"path": rel_path, "label": f"Photo {k + 1}"})
+
+    details = SimpleNamespace(**{c.name: None for c in TankDetails.__table__.columns})
+    details.__dict__.update(
+        tank_number=TANK_NUMBER, mfgr="CIMC", date_mfg=date(2015, 6, 1), lease=False, un_iso_code="22K7",
+        size="20", tare_weight_kg=3850.0, gross_kg=36000.0, mpl_kg=32150.0, capacity_l=25000.0, mawp=4.0,
+        working_pressure=4.0, design_temperature="-40/130", vesmat="SA 240 316L", frame_type="Beam",
+        cabinet_type="Rear", color_body_frame="Blue/Black", pump_type="None",
+    )
+    today = date.today()
+    inspection = {
+        "report_number": f"{TANK_NUMBER}-R1", "inspection_date": datetime.now(), "status_id": 1, "status_name": "Passed",
+        "inspection_type_id": 1, "inspection_type_name": "Periodic 2.5y", "created_by": "bench", "location_id": 1,
+        "location_name": "Singapore", "safety_valve_brand_id": 1, "safety_valve_brand_name": "Perolo",
+        "safety_valve_model_id": 1, "safety_valve_model_name": "PR-3", "pi_next_inspection_date": today + timedelta(days=900),
+        "notes": "Synthetic fixture inspection",
+    }
+    return SimpleNamespace(
+        tank=SimpleNamespace(id=1, tank_number=TANK_NUMBER),
+        details=details,
+        regs=[(SimpleNamespace(initial_approval_no=f"APP-{k}", imo_type="T11"), SimpleNamespace(regulation_name=f"Regulation {k}")) for k in range(4)],
+        cargos=[(SimpleNamespace(density=1.2, loading_parts="A"), SimpleNamespace(cargo_reference=f"CARGO-{k}")) for k in range(3)],
+        certs=[SimpleNamespace(certificate_number=f"{TANK_NUMBER}-C{k}", inspection_agency="BV", next_insp_date=today, certificate_file=None) for k in range(2)],
+        drawings=[],
+        valves=[],
+        inspection=inspection,
+        checklist_rows=[[f"Job {k // 4 + 1}", f"Check item {k + 1}", "OK", "-"] for k in range(checklist)],
+        todo_rows=[],
+        insp_images=photos,
+    )
+
+
+def clear_derivatives(base_dir: str) -> None:
+    for root, dirs, _ in os.walk(os.path.join(base_dir, "uploads")):
+        if DERIVATIVE_DIR in dirs:
+            shutil.rmtree(os.path.join(root, DERIVATIVE_DIR))
+            dirs.remove(DERIVATIVE_DIR)
+
+
+# ==================== Stack sampler ====================
+
+class StackSampler:
+    """Samples the main thread's stack every interval, keyed by the current phase."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.phase = None
+        self.stacks = Counter()
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            phase = self.phase
+            frame = sys._current_frames().get(self._thread_id)
+            if phase is None or frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join([phase] + names[::-1])] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+# ==================== Phases ====================
+
+def phases(data: SimpleNamespace, base_dir: str, db_session=None, tank_ids=None) -> dict:
+    """name -> (setup, run): setup prepares state outside the timed section, run returns a result."""
+    photo_paths = [item["path"] for item in data.insp_images]
+    resolved = [resolve_path(p, data.tank.tank_number, base_dir) for p in photo_paths]
+    state = {}
+
+    def fresh_layout():
+        prs = Presentation()
+        add_summary_slides(prs, data)
+        state["prs"] = prs
+
+    def embed_setup():
+        [get_derivative(path, "slide") for path in resolved if path]
+        fresh_layout()
+
+    def save_setup():
+        fresh_layout()
+        add_document_slides(state["prs"], data, base_dir)
+
+    table = {
+        "index": (None, lambda: FileIndex(base_dir).resolve(photo_paths[0], data.tank.tank_number) if photo_paths else None),
+        "resolve": (lambda: get_index(base_dir), lambda: [resolve_path(p, data.tank.tank_number, base_dir) for p in photo_paths]),
+        "layout": (None, lambda: add_summary_slides(Presentation(), data)),
+        "derivatives": (lambda: clear_derivatives(base_dir), lambda: [get_derivative(path, "slide") for path in resolved if path]),
+        "embed": (embed_setup, lambda: add_document_slides(state["prs"], data, base_dir)),
+        "save": (save_setup, lambda: save_presentation(state["prs"])),
+        "total": (embed_setup, lambda: build_presentation(data, base_dir)),
+    }
+    if db_session is not None:
+        from app.services.ppt_generator import load_report_data_batch
+        table["load"] = (None, lambda: load_report_data_batch(db_session, tank_ids))
+    return table
+
+
+def measure(setup, run, repeat: int, sampler: StackSampler, name: str) -> dict:
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        if sampler:
+            sampler.phase = name
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+        if sampler:
+            sampler.phase = None
+
+    # Separate run for memory: tracemalloc slows allocations down
+    if setup:
+        setup()
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "p50": statistics.median(timings) * 1000,
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        "min": timings[0] * 1000,
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def main(args):
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+    base_dir = tempfile.mkdtemp(prefix="ppt-phases-")
+    db_session = None
+    try:
+        data = build_fixture(base_dir, args.images, (width, height), args.checklist)
+        tank_ids = None
+        if args.db:
+            from sqlalchemy import select
+            from app.database import SessionLocal
+            from app.models.tank_header import Tank
+            from benchmarks.fleet import TANK_PREFIX
+            db_session = SessionLocal()
+            tank_ids = list(db_session.scalars(select(Tank.id).where(Tank.tank_number.like(f"{TANK_PREFIX}%")).limit(args.db_tanks)))
+            if not tank_ids:
+                raise SystemExit("No seeded tanks found; run python -m benchmarks.fleet first")
+
+        sampler = StackSampler() if args.flamegraph else None
+        if sampler:
+            sampler.start()
+
+        deck = build_presentation(data, base_dir)
+        deck_size = len(deck.getbuffer())
+        slides = len(Presentation(deck).slides)
+
+        print(f"Fixture: {args.images} photos of {width}x{height}, {args.checklist} checklist rows; {args.repeat} runs per phase")
+        print(f"Deck: {slides} slides, {deck_size / (1024 * 1024):.2f} MB"
+              + (f"; load phase on {len(tank_ids)} seeded tanks" if tank_ids else "") + "\n")
+        print(f"{'phase':<13}{'p50 ms':>10}{'p95 ms':>10}{'min ms':>10}{'peak MB':>10}")
+        for name, (setup, run) in phases(data, base_dir, db_session, tank_ids).items():
+            if args.phases and name not in args.phases:
+                continue
+            r = measure(setup, run, args.repeat, sampler, name)
+            print(f"{name:<13}{r['p50']:>10.2f}{r['p95']:>10.2f}{r['min']:>10.2f}{r['peak_mb']:>10.2f}")
+
+        # ru_maxrss is in KB on Linux
+        print(f"\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+        if sampler:
+            sampler.stop()
+            sampler.write(args.flamegraph)
+            print(f"Collapsed stacks ({sum(sampler.stacks.values())} samples) written to {args.flamegraph}")
+    finally:
+        if db_session is not None:
+            db_session.close()
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=8, help="inspection photos in the fixture deck")
+    parser.add_argument("--image-size", default="3000x2000", help="photo size, WIDTHxHEIGHT")
+    parser.add_argument("--checklist", type=int, default=24, help="checklist rows")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--phases", nargs="+", help="only these phases")
+    parser.add_argument("--flamegraph", metavar="PATH", help="write sampled stacks in collapsed format")
+    parser.add_argument("--db", action="store_true", help="also time load_report_data() on seeded tanks")
+    parser.add_argument("--db-tanks", type=int, default=20, help="tanks loaded per run with --db")
+    main(parser.parse_args())